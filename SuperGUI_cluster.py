@@ -1,14 +1,27 @@
 #!/usr/bin/python3
 
 import tkinter as tk
-from tkinter import StringVar, IntVar, ttk
-from collections import namedtuple
-import re, glob, yaml
+from tkinter import StringVar, IntVar, ttk, filedialog
+from itertools import islice
+import re, glob, yaml, sys
+import numpy as np
 from os.path import expanduser 
 import mods.plotbands as plot_mods
-import mods.Wyckoff as wyck
+import supermods.Wyckoff as wyck
+import supermods.supercell as sc
+import supermods.symmetry as sym
+import supermods.terminations as tm
+import supermods.output as printer
+import supermods.pwx as pwx
+import supermods.writers as writers
+import supermods.readers as readers
+import supermods.spacegroup as spacegroup
+import supermods.adsorb as placement
+from supermods.atoms import AtomStore
+from supermods.cell import Cell, as_cell
+from supermods.cache import CellCache
+from supermods.lattice import Lattice
 import mods.col_key as col
-from math import copysign
 from pathlib import Path
 import matplotlib
 import matplotlib.pyplot as plt
@@ -25,103 +38,116 @@ class CheckPrimitive:
     def __init__(self, params):
         self.cell = params[1]
         self.space_group = params[0][1]
-        self.param = namedtuple('Wyckoff_Parameter', ['atom', 'letter', 'x', 'y', 'z'])
 #--------------------------------------------------------------------------------------------------     
-    def constructPrim(self, validate):
-        if validate=='cell':
-            return self.cell
+    def constructPrim(self, validate, tol=1e-3):
+        """ Primitive cell wrapped into [0,1) with duplicate sites within tol merged """
+        if validate!='cell':
+            cell=Cell.from_arrays(*wyck.expand(self.space_group, self.cell, tol))
         else:
-            wyckoff_params = [self.param(*data) for data in self.cell]
-            self.cell.clear()
-            [wyck.get_wyckoff(self.cell, self.space_group, p.letter, p.atom, p.x, p.y, p.z) for p in wyckoff_params]
-            return self.cell
+            cell=Cell.from_rows(self.cell)
+        primitive, merged = sc.canonicalize(cell, tol)
+        if merged:
+            print(StringFormats.merge_notice.format(merged, tol))
+        return primitive
 class SuperCell:
-    def __init__(self, from_yaml, link, unit_cell, output, cell_dm, sort_keys, shifts, charges):
-        self.primitive = unit_cell[1]
+    def __init__(self, from_yaml, link, unit_cell, output, cell_dm, sort_keys, shifts, charges, sym_tol=1e-3, cache=None, lattice=None):
+        self.primitive = as_cell(unit_cell[1])
         self.name=unit_cell[0]
         self.format=output
         self.sort_by=sort_keys
         self.cell_dm=cell_dm
         self.shifts=shifts
         self.charges = charges
+        self.sym_tol = sym_tol
         self.invert = False
-        self.invert_key = False
+        self.inversion = None
         self.origin = False
         self.zero_key = False
         self.from_yaml=from_yaml
         self.bilbao = link
+        self.cache = cache
+        self.lattice = lattice
 #--------------------------------------------------------------------------------------------------
     def constructCell(self, X, Y, Z, x_shift, y_shift, z_shift):
         """ Input is self.primitive, dimensions X, Y, and Z, and the shifts for each dimension
-        Returns the unsorted bulk cell
+        Returns the unsorted bulk cell. Cells from cells.yaml are wrapped into [0,1); duplicate sites
+        were merged in the primitive cell, and their integer translations cannot coincide
         """
-        iterated_cell = []
-        # Core algorithm to produce supercell coordinate sets"""
-        for i in range(len(self.primitive)):
-            # Iterates individually upon values (atoms and coordinates) in self.primitive
-            prim = self.primitive[i]
-            atom = prim[0]
-            # Creation of supercell basis in XYZ
-            basis = [
-                prim[1] / X,
-                prim[2] / Y,
-                prim[3] / Z, 
-            ]
-            # Inner comprehension of all reduced coordinates in X
-            X_red = [ 
-                (
-                    basis[0] + i / X,
-                    basis[1],
-                    basis[2], 
-                )
-                for i in range(X)
-            ]
-            # Inner comprehension of all reduced coordinates in Y   
-            XY_red = [
-                (
-                    xred[0],
-                    xred[1] + i / Y,
-                    xred[2],
-                )
-                for xred in X_red
-                for i in range(Y)
-            ]
-            # Final comprehension, adds reduced Z coordinates and any shift parameters
-            XYZ_red = [
-                (
-                    atom,
-                    round(xred[0] + x_shift, 7),
-                    round(xred[1] + y_shift, 7),
-                    round(xred[2] + i / Z + z_shift, 7),
-                )
-                for xred in XY_red for i in range(Z)
-            ]
-            for xred in XYZ_red:
-            # Updates iterated_cell with expanded coordinate sets for each individual atom from self.primitive until the entire
-            # bulk cell is returned
-                iterated_cell.append(xred)
-        return iterated_cell
+        return sc.construct_cell(self.primitive, (X, Y, Z), (x_shift, y_shift, z_shift), wrap=self.from_yaml)
 #--------------------------------------------------------------------------------------------------
     def layerCell(self, *args):
-        """ Layer cell """
+        """ Layer cell. Cells built from cells.yaml are looked up in and stored to self.cache """
         if len(args)==0:
-            bulk_cell = self.constructCell(*self.cell_dm, *self.shifts)
+            build = lambda: sc.layer_cell(self.constructCell(*self.cell_dm, *self.shifts), self.sort_by)
+            if self.cacheKey():
+                layered_cell = self.cache.fetch(self.cacheKey(), lambda: self.updateCell() or build())
+            else:
+                layered_cell = build()
         if len(args)==1:
-            bulk_cell=args[0]
-        layered_cell = sorted(bulk_cell,
-            key = lambda x: tuple(x[self.sort_by[i]] for i in range(3)))
-        for idx, pos in enumerate(layered_cell):
-            if idx < len(layered_cell)-1 and ((list(layered_cell[idx+1])[self.sort_by[0]] == 1-pos[self.sort_by[0]] or list(layered_cell[idx+1]) == [pos[0], -pos[1], -pos[2], -pos[3]])):
-                    self.invert = True
-                    self.invert_key = idx+1
-                    print('ok')
-            elif idx < len(layered_cell)-1 and list(layered_cell[idx+1])[self.sort_by[0]] == -pos[self.sort_by[0]]:
-                    self.invert = True
-                    self.invert_key = idx+1
-            if pos[1:4] == [0]*3:
-                self.origin = True
-                self.zero_key = idx+1
+            layered_cell = sc.layer_cell(as_cell(args[0]), self.sort_by)
+        at_origin = np.flatnonzero(np.all(layered_cell.coords == 0, axis=1))
+        if at_origin.size:
+            self.origin = True
+            self.zero_key = int(at_origin[-1])+1
         return layered_cell
+#--------------------------------------------------------------------------------------------------
+    def cacheKey(self):
+        """ Key of the layered cell in self.cache, None when it is not cached """
+        if self.cache is None or not self.from_yaml:
+            return None
+        return ('layered', *self.name, tuple(self.cell_dm), tuple(self.shifts), tuple(self.sort_by), self.sym_tol)
+#--------------------------------------------------------------------------------------------------
+    def updateCell(self):
+        """ Layered cell derived from a cached cell of the same structure that differs in one dimension
+        or in the shifts. New images are merged into the cached order and shifted coordinates keep it
+        when it still holds. None when no such cell is cached
+        """
+        key = self.cacheKey()
+        for other, cell in self.cache.items():
+            if other[0] != key[0] or other[1:3] != key[1:3] or other[5:] != key[5:]:
+                continue
+            dims, shifts = other[3], other[4]
+            changed = [a for a in range(3) if dims[a] != key[3][a]]
+            if len(changed) == 1 and shifts == key[4]:
+                axis = changed[0]
+                return sc.resize_layered(cell, self.primitive, dims, axis, self.cell_dm[axis], self.shifts,
+                    self.sort_by, wrap=self.from_yaml)
+            if not changed:
+                return sc.reshift_layered(cell, self.primitive, dims, shifts, self.shifts, self.sort_by,
+                    wrap=self.from_yaml)
+        return None
+#--------------------------------------------------------------------------------------------------
+    def displayTerminations(self, layered, top=10, min_thickness=None):
+        """ Prints the cleave windows of whole layers along the primary sort axis, neutral and
+        lowest dipole first. min_thickness defaults to one primitive period
+        """
+        axis = self.sort_by[0]
+        if min_thickness is None:
+            min_thickness = 1/self.cell_dm[axis-1]
+        ranked = tm.rank_terminations(layered, self.charges, axis, min_thickness, top, self.sym_tol)
+        if ranked is None:
+            print('\nSurface charge not available. Update atomic charges in cells.yaml.')
+            return None
+        print(StringFormats.termination_header)
+        for t in ranked:
+            print(StringFormats.termination.format(t.first, t.last, t.n_atoms, t.thickness, t.net_charge, t.dipole))
+        return ranked
+#--------------------------------------------------------------------------------------------------
+    def findInversion(self, cell):
+        """ Inversion centres of the cell within self.sym_tol. Returns a mask of the atoms that
+        have an inversion partner
+        """
+        self.inversion = sym.find_inversion(cell, self.sym_tol)
+        self.invert = bool(len(self.inversion.centres))
+        return self.inversion.partners >= 0
+#--------------------------------------------------------------------------------------------------
+    def streamCell(self, first=1, last=None):
+        """ Generator mode of layerCell. Yields layered atoms first to last (1-based, inclusive)
+        while only building the images along the primary axis that overlap the window
+        """
+        layers = sc.iter_layers(self.primitive.species, self.primitive.coords, self.cell_dm, self.shifts, self.sort_by,
+            wrap=self.from_yaml)
+        return islice(layers, first-1, last)
 #--------------------------------------------------------------------------------------------------
     def displayParam(self, disp_id, X, Y, Z):
         name=[AnsiiCodes.cyan+str(s) for s in self.name]
@@ -141,50 +167,61 @@ class SuperCell:
             layered_supercell = self.layerCell()
         if len(args)==1:
             layered_supercell = self.layerCell(args[0])
+        paired = self.findInversion(layered_supercell)
         self.displayParam(1, *self.cell_dm)
         print('\n', StringFormats.header.format('X','Y','Z'))
-        for idx, position in enumerate(layered_supercell, 1):
-            if self.invert and idx in [self.invert_key, self.invert_key + 1]:
-                print(StringFormats.invert.format(idx, *position))
-            if not self.invert or (self.invert and idx not in [self.invert_key, self.invert_key + 1]):
-                print(StringFormats.main.format(idx, *position))
+        printer.emit(printer.position_blocks(layered_supercell, 'main', paired))
         if self.invert: 
-            print(StringFormats.invert_notice.format(self.invert_key, self.invert_key + 1))
+            centres = self.inversion.centres
+            print(StringFormats.invert_notice.format(len(centres), *centres[0]))
+            print(', '.join('{}-{}'.format(i+1, j+1) for i, j in self.inversion.pairs.tolist()))
         if self.origin: 
-            print(StringFormats.invert_notice.format(self.zero_key))
+            print(StringFormats.origin_notice.format(self.zero_key))
 #--------------------------------------------------------------------------------------------------
     def cleaveCell(self, surface, *args):
+        # Cleaving the whole supercell also lists candidate terminations
+        suggest = surface==False and len(args)==0
+        key = self.cacheKey()
+        if len(args)==0 and key is not None and key in self.cache:
+            # The layered cell is already built, slicing it is cheaper than streaming
+            args = (self.cache.get(key),)
         if len(args)==0:
-            layers = self.layerCell()
+            n_atoms = sc.count(self.primitive, self.cell_dm)
         if len(args)==1:
-            layers = args[0]
+            layers = as_cell(args[0])
+            n_atoms = len(layers)
         if surface==False:
-            surface=[1, len(layers)]
-        if max(surface) > len(layers):
+            surface=[1, n_atoms]
+        if max(surface) > n_atoms:
             print('Invalid index')
             return None
         self.displayParam(2, *self.cell_dm)
-        cleaved_surface = layers[surface[0]-1:surface[1]]
-        quantum_sort=sorted(cleaved_surface,
-            key = lambda x: tuple(x[self.sort_by[i]] for i in range(3)))
-        abi_sort=sorted(cleaved_surface,
-            key = lambda x:(x[0],x[self.sort_by[0]]))
-        for i in range(len(cleaved_surface)):
-            if self.format == 'ABINIT':
-                print(StringFormats.abinit.format(*abi_sort[i][1:4], abi_sort[i][0]))
-            if self.format == 'Quantum ESP.':
-                print(StringFormats.quantum.format(*quantum_sort[i]))
-        try:
-            net_charge = sum([self.charges.get(value[0], 'Null') for value in cleaved_surface])
-            if net_charge > 0:
-                print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.green, '+' + str(net_charge), AnsiiCodes.end))
-            elif net_charge == 0:
-                print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.cyan, net_charge, AnsiiCodes.end))
-            else:
-                print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.red, net_charge, AnsiiCodes.end))
-        except TypeError:
+        if len(args)==0:
+            # Only the cleaved window is materialized
+            cleaved_surface = Cell.from_rows(list(self.streamCell(*surface)))
+        else:
+            cleaved_surface = layers[surface[0]-1:surface[1]]
+        if self.format == 'ABINIT':
+            abi_sort = cleaved_surface.take(sc.species_order(cleaved_surface, self.sort_by[0]))
+            printer.emit(printer.position_blocks(abi_sort, 'abinit'))
+        if self.format == 'Quantum ESP.':
+            quantum_sort = sc.layer_cell(cleaved_surface, self.sort_by)
+            printer.emit(printer.position_blocks(quantum_sort, 'quantum'))
+        net_charge = cleaved_surface.net_charge(self.charges)
+        if net_charge is None:
             print('\nSurface charge not available. Update atomic charges in cells.yaml.')
-            pass
+        elif net_charge > 0:
+            print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.green, '+' + str(net_charge), AnsiiCodes.end))
+        elif net_charge == 0:
+            print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.cyan, net_charge, AnsiiCodes.end))
+        else:
+            print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.red, net_charge, AnsiiCodes.end))
+        symmetric = spacegroup.slab_symmetric(cleaved_surface, self.sort_by[0]-1,
+            None if self.lattice is None else self.lattice.scaled(self.cell_dm), self.sym_tol)
+        print(StringFormats.slab_symmetry.format(AnsiiCodes.bold, *((AnsiiCodes.cyan, 'Symmetric') if symmetric
+            else (AnsiiCodes.pink, 'Asymmetric')), AnsiiCodes.end))
+        if suggest and net_charge is not None:
+            self.displayTerminations(cleaved_surface)
 #--------------------------------------------------------------------------------------------------
 class DropDown(ttk.OptionMenu):
     def __init__(self, parent, options: list, initial_value: str=None, style: str=None, *command):
@@ -212,6 +249,96 @@ class DropDown(ttk.OptionMenu):
         for file in menu_ops:
             menu.add_command(label=file, command=tk._setit(self.var, file, self.set(file)))
 #--------------------------------------------------------------------------------------------------
+class VirtualTree(ttk.Frame):
+    """ Treeview that only holds the rows in view. order is the display order of the AtomStore ids;
+    rows are fetched from the store when the view scrolls, resizes or the store changes. Selection is
+    kept as an id set so it survives rows leaving the view
+    """
+    def __init__(self, parent, atoms, columns, height=10):
+        ttk.Frame.__init__(self, parent)
+        self.atoms = atoms
+        self.order = np.empty(0, dtype=np.int64)
+        self.selected = set()
+        self.top = 0
+        self.view = ttk.Treeview(self, columns=columns, selectmode='none', height=height, show='headings')
+        for header in columns:
+            self.view.column(header, stretch='yes', width=5, anchor='center')
+            self.view.heading(header, text=header)
+        self.view.tag_configure("red", foreground=('red2'))
+        self.view.tag_configure("blue", foreground=('blue'))
+        self.scroll = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.view.grid(row=0, column=0, sticky='nsew')
+        self.scroll.grid(row=0, column=1, sticky='ns')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.view.bind("<ButtonRelease-1>", self.toggle)
+        self.view.bind("<Configure>", lambda event: self.draw())
+        self.view.bind("<MouseWheel>", lambda event: self.yview('scroll', -1 if event.delta > 0 else 1, 'units'))
+        self.view.bind("<Button-4>", lambda event: self.yview('scroll', -1, 'units'))
+        self.view.bind("<Button-5>", lambda event: self.yview('scroll', 1, 'units'))
+        atoms.subscribe(self.update_rows)
+    def visible(self):
+        """ Number of rows that fit in the widget """
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        height = self.view.winfo_height()
+        if height <= 1:
+            return int(self.view['height'])
+        return max(1, height // int(rowheight))
+    def yview(self, *args):
+        n = self.visible()
+        if args[0] == 'moveto':
+            top = int(float(args[1])*len(self.order))
+        else:
+            top = self.top + int(args[1])*(n if args[2] == 'pages' else 1)
+        self.top = max(0, min(top, len(self.order) - n))
+        self.draw()
+    def draw(self):
+        """ Rebuilds the rows in view from the store """
+        n = self.visible()
+        self.top = max(0, min(self.top, len(self.order) - n))
+        self.view.delete(*self.view.get_children())
+        for idx in self.order[self.top:self.top+n].tolist():
+            atom = self.atoms.get(idx)
+            tags = ('red',) if idx in self.atoms.marked else ('blue',) if idx in self.atoms.added else ()
+            self.view.insert("", 'end', iid=idx, text=atom, values=(idx+1, *atom), tags=tags)
+        self.view.selection_set([idx for idx in self.order[self.top:self.top+n].tolist() if idx in self.selected])
+        total = max(len(self.order), 1)
+        self.scroll.set(self.top/total, min(1.0, (self.top+n)/total))
+    def update_rows(self, event, ids):
+        """ AtomStore listener. New atoms below the middle of the slab along the layer axis go to the top """
+        if event == 'reset':
+            self.order = np.asarray(ids, dtype=np.int64)
+            self.selected.clear()
+            self.top = 0
+        elif event == 'insert':
+            ids = np.asarray(ids, dtype=np.int64)
+            cell = self.atoms.cell
+            axis = self.atoms.layer_axis
+            middle = placement.midpoint(cell.coords[~np.isin(cell.ids, ids)], axis)
+            below = np.array([self.atoms.get(idx)[axis+1] < middle for idx in ids.tolist()], dtype=bool)
+            self.order = np.concatenate([ids[below][::-1], self.order, ids[~below]])
+        elif event == 'delete':
+            self.order = self.order[~np.isin(self.order, ids)]
+            self.selected.difference_update(ids)
+        self.draw()
+#--------------------------------------------------------------------------------------------------
+    def toggle(self, event):
+        row = self.view.identify_row(event.y)
+        if row:
+            self.selected.symmetric_difference_update({int(row)})
+            self.view.selection_toggle(row)
+    def selection(self):
+        """ Selected ids in display order """
+        if not self.selected:
+            return []
+        return self.order[np.isin(self.order, list(self.selected))].tolist()
+    def deselect(self, ids=None):
+        if ids is None:
+            self.selected.clear()
+        else:
+            self.selected.difference_update(ids)
+        self.draw()
+#--------------------------------------------------------------------------------------------------
 class SuperGui(tk.Tk):
     def __init__(self):
         tk.Tk.__init__(self)
@@ -221,7 +348,16 @@ class SuperGui(tk.Tk):
         self.charges = self.yaml_data['Charges']
         self.struct = [key for key in self.yaml_data if key.lower() != 'charges']
         self.key_map = {'x': 1, 'y': 2, 'z': 3 }
-        self.cell = []
+        # Tolerance (reduced units) used when matching atoms for symmetry
+        self.sym_tol = 1e-3
+        # ANSI codes only when printing to a terminal
+        printer.set_color(sys.stdout.isatty())
+        # Atoms of the Adsorbates tab; the tree only renders this store
+        self.atoms = AtomStore()
+        # Primitive and layered cells of recent structure/dimension/shift combinations
+        self.cell_cache = CellCache()
+        # Detected space group of each input file, by path, with the file's mtime and size
+        self.detected = {}
         #self.tk.call('tk', 'scaling', 4.0)
         self.title("SuperGUI.py v1.a")
         self.geometry('800x550')
@@ -410,7 +546,7 @@ class SuperGui(tk.Tk):
         self.create_cell = ttk.Button(self.adsorb, text='Construct cell', 
             width=12, style='TButton', command=lambda: self.validate_params(4)).grid(row=9, column=5, ipady=4)
 
-        self.create_file=ttk.Button(self.main, text='Create pw.x file', 
+        self.create_file=ttk.Button(self.main, text='Create pw.x file', command=lambda: self.validate_params(6),
             style = 'Make.TButton', width=16).grid(row=9, column=4, ipady=2)
         self.cleave_button=ttk.Button(self.main, text='Cleave surface', style = 'TButton', command=lambda: self.validate_params(2), width=14).grid(row=3, column=4, ipady=2)
         self.add_button=ttk.Button(self.adsorb, text='Add adsorbate(s)',
@@ -674,13 +810,9 @@ class SuperGui(tk.Tk):
         self.change_label=ttk.Button(self.plots, text='Add label', style = 'Col.TButton', width=10, 
             command=self.change_label).grid(row=4, rowspan=1, column=2, columnspan=1, ipady=3, padx=(0,0), sticky='')
 
-        self.tree = ttk.Treeview(self.adsorb, columns=('#', 'Atom','x','y','z'), selectmode='none')
-        for header in ['#', 'Atom', 'x', 'y', 'z']:
-            self.tree.column(header, stretch='yes', width=5, anchor='center')
-            self.tree.heading(header, text=header)
+        # Only the rows in view exist as Treeview items, the rest stay in self.atoms
+        self.tree = VirtualTree(self.adsorb, self.atoms, ('#', 'Atom','x','y','z'))
         self.tree.grid(row=0, column=0, columnspan=6, sticky="NSEW", padx=15, rowspan=8, pady=10)
-        self.tree['show'] = 'headings'
-        self.tree.bind("<ButtonRelease-1>", self.adsorb_select)
 
         self.ad_deselect=ttk.Button(self.adsorb, text='Deselect all',
             command=self.ad_deselect, style = 'TButton', width=12)
@@ -690,7 +822,7 @@ class SuperGui(tk.Tk):
             command=lambda: self.insert_dosmenu(), text='Load QE files', style="Col.TButton")
         self.find_dir.grid(row=0, column=5, ipady=3, columnspan=1, padx=(0,0), pady=(5,0), sticky='')
 
-        self.create_file=ttk.Button(self.adsorb, text='Create pw.x file', 
+        self.create_file=ttk.Button(self.adsorb, text='Create pw.x file', command=lambda: self.validate_params(7),
             style = 'Make.TButton', width=12).grid(row=10, column=5, ipady=4)
 
         self.del_atom=ttk.Button(self.adsorb, text='Delete atom(s)',
@@ -710,10 +842,8 @@ class SuperGui(tk.Tk):
         self.angs.grid(row=9, column=1, ipady=4)
         self.angs.insert(0, 1.0)
         self.xpa = ttk.Entry(self.adsorb, width=8, font=("dejavu sans", 11), justify="center", style='TEntry')
-        self.ad_index=[]
         self.xpa.grid(row=9, column=2, ipady=4)
         self.xpa.insert(0, 'auto')
-        self.retain=[]
         self.QE_sort=[]
         self.dos_col={}
         self.dos_dict={}
@@ -734,25 +864,17 @@ class SuperGui(tk.Tk):
         if event.widget.tab('current')['text'] == 'Quit':
             self.quit()
 
-    def adsorb_select(self, event):
-        self.tree.selection_toggle(self.tree.focus())
-        self.ad_index=max([self.tree.item(sel)['values'][0] for sel in self.tree.get_children()])
     def ad_deselect(self):
-        for sel in self.tree.selection():
-            self.tree.selection_remove(sel)
+        self.tree.deselect()
     def ad_delete(self):
-        for sel in self.tree.selection():
-            atom=self.tree.item(sel)['values'][1:]
-            atom=[atom[0], float(atom[1]), float(atom[2]), float(atom[3])]
-            self.tree.delete(sel)
-            self.cell.remove(atom)
-            if atom in self.retain:
-                self.retain.remove(atom)
-        self.N.set('N atoms: '+str(len(self.cell)))
+        # Tree iids are the stable atom ids of the store
+        self.atoms.delete([int(sel) for sel in self.tree.selection()])
+        self.N.set('N atoms: '+str(len(self.atoms)))
     def insert_admenu(self, cell):
-        self.cell=[[v[0], round(v[1],6), round(v[2],6), round(v[3],6)] for v in cell]
-        for atom in self.cell:
-            self.tree.insert("", 'end', iid=self.cell.index(atom), text=atom, values=(self.cell.index(atom)+1, *atom))
+        self.atoms.reset(Cell(cell.codes, np.round(cell.coords, 6), cell.symbols, cell.lattice))
+    @property
+    def cell(self):
+        return self.atoms.cell
 
     def clear_pdos(self):
         self.color_tree.delete(*self.color_tree.get_children())
@@ -925,72 +1047,122 @@ class SuperGui(tk.Tk):
             self.style.configure("Invert.Toolbutton", relief="sunken", background="seagreen2")
 #--------------------------------------------------------------------------------------------------
     def from_file(self, path: str=None):
-        expanded_path = expanduser(path)
-        cell_from_file=[[path, 0], []]
+        """ [path, space group] and cell of a pw.x input, or of a CIF, POSCAR or extended XYZ file.
+        The space group is detected from the cell, falling back to the one the file declares
+        """
         try:
-            with open(expanded_path, 'r+') as file:
-                natom=[int(line.split()[2].replace(",","")) for line in file if "nat" in line][0]
-                file.seek(0)
-                positions=[file.readline().split() for line in file for i in range(natom) if "ATOMIC_POSITIONS" in line]
-                for pos in positions:
-                    cell_from_file[1].append([pos[0], *[float(p) for p in pos[1:4]]])
-        except IndexError:
-            print('Error parsing file')
+            if readers.format_for(path):
+                structure=readers.read(path)
+                cell, declared=structure.cell, structure.space_group
+            else:
+                cell, declared=pwx.read_input(path).cell, 0
+        except (OSError, ValueError) as error:
+            print('Error parsing file: %s' %error)
             return None
-        return cell_from_file
+        return [[path, self.reportSymmetry(cell, path) or declared], cell]
+    def reportSymmetry(self, cell, path=None):
+        """ Prints the space group, the symmetry-unique atoms with their Wyckoff labels and the
+        Bilbao link of cell. Returns the space group number, 0 when none is identified. With a path
+        the detection is reused while the file's mtime and size are unchanged, as pwx.read_input does
+        """
+        found=None
+        if path is not None:
+            info=Path(path).expanduser().stat()
+            key, stamp=(str(Path(path).expanduser()), self.sym_tol), (info.st_mtime_ns, info.st_size)
+            cached=self.detected.get(key)
+            found=cached[1] if cached is not None and cached[0]==stamp else None
+        if found is None:
+            found=spacegroup.detect(cell, tol=self.sym_tol)
+            if path is not None:
+                self.detected[key]=(stamp, found)
+        unique=', '.join('{}{} {}'.format(cell[i][0], i+1, label).strip() for i, label in zip(found.unique.tolist(), found.wyckoff))
+        print(StringFormats.spacegroup_notice.format(found.number if found.number else 'not identified', len(found.rotations), unique))
+        if found.number:
+            print(AnsiiCodes.bold+"https://www.cryst.ehu.es/cgi-bin/cryst/programs/nph-wp-list?gnum="+str(found.number)+'\n'+AnsiiCodes.end)
+        return found.number
 #--------------------------------------------------------------------------------------------------
-    #Add option to create VASP/QE/xsf files?
-    def adsorbate(self, cell, prim_axis, ads, angs, xpa, sort_keys):
+    def adsorbate(self, cell, prim_axis, ads, angs, xpa, sort_keys, lattice=None):
         prim_axis=self.key_map.get(self.adsorb_dim.get()[0], 'Null')
         if prim_axis=='Null':
             self.style.configure("Dim.TMenubutton", foreground="red2")
             return None
         if not self.check_var.get():
-            xpa=xpa[prim_axis-1]
             self.xpa.delete(0, 'end')
-            self.xpa.insert(0, round(xpa,4))
-        self.cell=[list(atom) for atom in cell]
-        def add_to_cell(prim_axis, adsorb, xpa, angs):
-            def ad_index():
-                return max([self.tree.item(sel)['values'][0] for sel in self.tree.get_children()])+1
-            for sel in self.tree.selection():
-                    atom=self.tree.item(sel)['values'][1:]
-                    ad=[adsorb, float(atom[1]), float(atom[2]), float(atom[3])]
-                    ad[prim_axis]+=copysign(round(xpa*angs, 3), ad[prim_axis])
-                    ad[prim_axis]=round(ad[prim_axis], 5)
-                    if ad[prim_axis]<0:
-                        slot='0'
-                    else:
-                        slot='end'
-                    self.tree.item(sel, tags="red")
-                    self.tree.tag_configure("red", foreground=('red2'))
-                    if self.inv_var.get():
-                        for inv_sel in self.tree.get_children():
-                            inv_val = self.tree.item(inv_sel)['values']
-                            if (-float(inv_val[1:5][sort_keys[0]])==float(atom[sort_keys[0]]) and (-float(inv_val[1:5][sort_keys[1]])==float(atom[sort_keys[1]]))) or (-float(inv_val[1:5][sort_keys[0]])==float(atom[sort_keys[0]]) and (-float(inv_val[1:5][sort_keys[2]])==float(atom[sort_keys[2]]))):
-                                invert=True
-                                inv_val=[adsorb, *[float(v) for v in inv_val[2:5]]]
-                                inv_val[prim_axis]+=copysign(round(xpa*angs, 3), inv_val[prim_axis])
-                                inv_val[prim_axis]=round(inv_val[prim_axis], 5)
-                                self.tree.item(inv_sel, tags="red")
-                                self.tree.tag_configure("red", foreground=('red2'))
-                                if inv_val not in self.cell and inv_val not in self.retain and invert==True:
-                                    self.retain.append(inv_val)
-                                    self.cell.append(inv_val)
-                                    if inv_val[prim_axis]<0:
-                                        inv_slot='0'
-                                    else:
-                                        inv_slot='end'
-                                    self.tree.insert("", inv_slot, iid=ad_index(), text=inv_val, values=(ad_index(), *inv_val), tags=('blue'))
-                                    self.tree.tag_configure("blue", foreground=('blue'))
-                    self.tree.selection_remove(sel)
-                    if ad not in self.cell and ad not in self.retain:
-                        self.retain.append(ad)
-                        self.cell.append(ad)
-                        self.tree.insert("", slot, iid=ad_index(), text=ad, values=(ad_index(), *ad), tags=('blue'))
-                        self.tree.tag_configure("blue", foreground=('blue'))
-        add_to_cell(prim_axis, ads, xpa, angs)
+            self.xpa.insert(0, round(abs(xpa[prim_axis-1]),4))
+        if not len(self.atoms):
+            self.insert_admenu(as_cell(cell))
+        self.atoms.set_layer_axis(prim_axis-1)
+        inversion=None
+        if self.inv_var.get():
+            # The adsorption direction is treated as the non-periodic slab normal
+            slab=[axis != prim_axis-1 for axis in range(3)]
+            inversion=sym.find_inversion(self.cell, self.sym_tol, slab)
+        # xpa is the reduced step per Angstrom, placed outwards on the side of each selected atom
+        selected=self.tree.selection()
+        step=np.round(np.asarray(xpa, dtype=float)*angs, 5)
+        placed=placement.Placement(self.cell, prim_axis-1, inversion, next_id=self.atoms.next_id).place([int(sel) for sel in selected], ads, step)
+        self.tree.deselect(selected)
+        self.atoms.mark(placed.marked.tolist())
+        added=self.atoms.insert(placed.rows, placed.ids.tolist())
+        if lattice is not None and added:
+            self.checkContacts(len(added), angs, lattice, prim_axis)
+        if added:
+            symmetric=spacegroup.slab_symmetric(self.cell, prim_axis-1, lattice, self.sym_tol)
+            print(StringFormats.slab_symmetry.format(AnsiiCodes.bold, *((AnsiiCodes.cyan, 'Symmetric') if symmetric
+                else (AnsiiCodes.pink, 'Asymmetric')), AnsiiCodes.end))
+    def checkContacts(self, n_added, angs, lattice, prim_axis, cutoff=3.0):
+        """ Reports the newest n_added atoms that sit closer than angs to another atom. The neighbour
+        list is cached on the cell and extended as adsorbates are appended
+        """
+        slab=[axis != prim_axis-1 for axis in range(3)]
+        found=self.cell.neighbours(lattice, cutoff, slab)
+        new=np.arange(len(self.cell)-n_added, len(self.cell))
+        nearest, dist=found.closest(self.cell.coords[new], exclude=new)
+        for i in np.flatnonzero(dist < min(angs, cutoff)-1e-3):
+            atom, other=new[i], nearest[i]
+            print(StringFormats.contact_notice.format(self.cell[atom][0], self.cell.ids[atom]+1, dist[i],
+                self.cell[other][0], self.cell.ids[other]+1, angs))
 #--------------------------------------------------------------------------------------------------
+    def surfaceRange(self):
+        """ [first, last] atoms from the cleave entries, False when both are empty, None if invalid """
+        if self.cleave_a.get()==self.cleave_b.get()=='':
+            return False
+        try:
+            surface = [int(self.cleave_a.get()), int(self.cleave_b.get())]
+        except ValueError:
+            return None
+        if surface[0] > surface[1]:
+            return None
+        return surface
+    def exportCell(self, cell, lattice=None):
+        """ Writes cell to a file chosen in a dialog. pw.x inputs (.in) are filled into a template
+        chosen next, with its cell replaced by CELL_PARAMETERS when a lattice is given. Other files
+        go through the writer registry (POSCAR, XSF, extended XYZ, ABINIT)
+        """
+        filetypes=[('pw.x input', '*.in')] + [(name, ' '.join('*'+p if p.startswith('.') else p+'*'
+            for p in patterns)) for name, (_, patterns) in writers.registry.items()]
+        path=filedialog.asksaveasfilename(title='Save cell', defaultextension='.in', initialdir=expanduser('~'),
+            filetypes=filetypes)
+        if not path:
+            return None
+        try:
+            if path.endswith('.in'):
+                template=filedialog.askopenfilename(title='pw.x template', initialdir=str(Path(path).parent),
+                    filetypes=[('pw.x input', '*.in'), ('All files', '*')])
+                if not template:
+                    return None
+                pwx.write_inputs(template, [(path, cell, lattice)])
+            else:
+                writers.write(path, cell, lattice, comment='%d atoms' %len(cell))
+        except ValueError as error:
+            print(error)
+            return None
+        print('%d atoms written to %s' %(len(cell), path))
+        return path
+    def lattice(self):
+        """ Lattice of the primitive cell from the a, b, c, \u03B1, \u03B2, \u03B3 entries, angles left blank are 90 """
+        return Lattice.from_entries([self.alat.get(), self.blat.get(), self.clat.get()],
+            [self.alpha.get(), self.beta.get(), self.gamma.get()])
     def validate_params(self, button_id, *args):
         def set_dim(dim, sort, shift):
             try:
@@ -1031,32 +1203,46 @@ class SuperGui(tk.Tk):
             unit_cell = [
             [structure.split()[0], int(structure.split()[1])],
             [[*data[:-3], *(float(v) for v in data[-3::])] for data in split_cell]]
-            unit_cell[1]=CheckPrimitive(unit_cell).constructPrim(parser[1])
+            try:
+                unit_cell[1]=self.cell_cache.fetch(('primitive', structure, self.sym_tol),
+                    lambda: CheckPrimitive(unit_cell).constructPrim(parser[1], self.sym_tol))
+            except (KeyError, ValueError) as error:
+                print('Error in %s: %s' %(structure, error))
+                return None
+        if params is None or unit_cell is None:
+            return None
+        # Lattice of the primitive cell, from the file or the a, b, c, \u03B1, \u03B2, \u03B3 entries
+        lattice=unit_cell[1].lattice if self.check_var.get() else self.lattice()
+        supercell = SuperCell(source, bilbao_link, unit_cell, *params, self.charges, self.sym_tol, self.cell_cache, lattice)
         if button_id==1 and len(args)==0:
-            SuperCell(source, bilbao_link, unit_cell, *params, self.charges).displayCell()
+            supercell.displayCell()
         if button_id==1 and len(args)==1:
-            SuperCell(source, bilbao_link, self.cell, *params, self.charges).displayCell(self.cell)
-            SuperCell(source, bilbao_link, self.cell, *params, self.charges).cleaveCell(False, self.cell)
+            SuperCell(source, bilbao_link, [unit_cell[0], self.cell], *params, self.charges, self.sym_tol).displayCell(self.cell)
+            SuperCell(source, bilbao_link, [unit_cell[0], self.cell], *params, self.charges, self.sym_tol,
+                lattice=lattice).cleaveCell(False, self.cell)
         if button_id==4:# Construct cell for adsorbate menu
-            self.retain.clear()
-            self.cell.clear()
-            self.tree.delete(*self.tree.get_children())
             self.xpa.delete(0, '')
             self.xpa.insert(0,'auto')
-            self.insert_admenu(SuperCell(source, bilbao_link, unit_cell, *params, self.charges).layerCell())
+            self.insert_admenu(supercell.layerCell())
         if button_id==2:#cleave cell
-            if self.cleave_a.get()==self.cleave_b.get()=='':
-                surface=False
+            surface=self.surfaceRange()
+            if surface is None:
+                return None
+            supercell.cleaveCell(surface)
+        if button_id in [6, 7]:# pw.x input of the cleaved surface or the adsorbate cell
+            if button_id==7 and len(self.atoms):
+                cell=self.cell
             else:
-                try:
-                    surface = [int(self.cleave_a.get()), int(self.cleave_b.get())]
-                except ValueError:
-                    return None
-                if surface[0] > surface[1]:
+                cell=supercell.layerCell()
+                surface=self.surfaceRange() if button_id==6 else False
+                if surface is None or (surface and surface[1] > len(cell)):
                     return None
-            SuperCell(source, bilbao_link, unit_cell, *params, self.charges).cleaveCell(surface)
+                if surface:
+                    cell=sc.layer_cell(cell[surface[0]-1:surface[1]], params[2])
+            self.exportCell(cell, None if lattice is None else lattice.scaled(params[1]))
         if button_id==5: # Add to cell
-            if self.check_var.get():
+            file_lattice=unit_cell[1].lattice if self.check_var.get() else None
+            if self.check_var.get() and file_lattice is None:
                 try:
                     xpa=float(self.xpa.get())
                 except ValueError:
@@ -1065,25 +1251,24 @@ class SuperGui(tk.Tk):
                 try: 
                     angs = float(self.angs.get())
                     ads = self.enter_adsorb.get().upper()
-                    celldm=[float(self.alat.get()), float(self.blat.get()), float(self.clat.get())]
                 except ValueError:
                     return None
             prim_axis=self.key_map.get(self.adsorb_dim.get()[0], 'Null')
             if prim_axis=='Null':
                 self.style.configure("Dim.TMenubutton", foreground="red2")
                 return None
-            cell = SuperCell(source, bilbao_link, unit_cell, *params, self.charges).layerCell()
-            prim_axis=self.key_map.get(self.adsorb_dim.get()[0], 'Null')
-            def xpa_xyz(cell,i, dim):
-                xsort=sorted(cell, key = lambda x:(x[i]))
-                return (abs(xsort[0][i])+xsort[-1][i])/(float(celldm[i-1])*dim[i-1])
-            if not self.check_var.get():
-                xpa=[xpa_xyz(cell,i,params[1]) for i in range(1,4)]
-            if self.retain==[]:
-                self.adsorbate(SuperCell(source, bilbao_link, unit_cell, 
-                    *params, self.charges).layerCell(), prim_axis, ads, angs, xpa, params[2])
+            if self.check_var.get() and file_lattice is None:
+                lattice=None
+                xpa=[xpa if axis==prim_axis-1 else 0.0 for axis in range(3)]
             else:
-                self.adsorbate(self.cell, prim_axis, ads, angs, xpa, params[2])
+                lattice=self.lattice() if file_lattice is None else file_lattice
+                if lattice is None:
+                    return None
+                # One Angstrom along the surface normal of the supercell, in reduced coordinates
+                lattice=lattice.scaled(params[1])
+                xpa=lattice.displacement(prim_axis-1, 1.0).tolist()
+            cell = supercell.layerCell()
+            self.adsorbate(cell, prim_axis, ads, angs, xpa, params[2], lattice)
         self.N.set('N atoms: '+str(len(self.cell)))
     def bands(self, y_range, fermi_level, figure, save_key):
         plot_mods.plotbands(*[self.QE_files[self.QE_sort.index(i)] for i in range(0,3)], self.plot_bg.get(),
@@ -1114,7 +1299,14 @@ class StringFormats:
     quantum = '{:2}     {:12.9f}  {:12.9f}  {:12.9f}'
     charge = '\nNet charge of surface: {}{}{}{}\n'
     invert = AnsiiCodes.highlight + '{:^4}:  {:2}  | {:12.9f} | {:12.9f} | {:12.9f}' + AnsiiCodes.end
-    invert_notice = AnsiiCodes.bold + '\n***Possible inversion center found at {}-{}***\n' + AnsiiCodes.end
+    invert_notice = AnsiiCodes.bold + '\n***{} inversion center(s) found, pairs through {:.6f} {:.6f} {:.6f}:***\n' + AnsiiCodes.end
+    origin_notice = AnsiiCodes.bold + '\n***Atom found at the origin: {}***\n' + AnsiiCodes.end
+    termination_header = '\n{:>13}  {:>6}  {:>10}  {:>10}  {:>10}'.format('Atoms', 'N', 'Thickness', 'Charge', 'Dipole')
+    termination = '{:>6}-{:<6}  {:>6}  {:>10.4f}  {:>+10.3f}  {:>+10.4f}'
+    merge_notice = AnsiiCodes.bold + '\n***{} duplicate site(s) within {} merged***\n' + AnsiiCodes.end
+    spacegroup_notice = AnsiiCodes.bold + '\n***Space group {}, {} operation(s), symmetry-unique atoms: {}***\n' + AnsiiCodes.end
+    slab_symmetry = '{}{}{} slab{}\n'
+    contact_notice = AnsiiCodes.bold + '***{} {} is {:.3f} \u212B from {} {}, closer than the {} \u212B placement***' + AnsiiCodes.end
     header = '             {:^12}   {:^12}   {:^12}\n'
     cleaved_header ='      {:^10}    {:^10}    {:^10}\n'
     supercell_name = AnsiiCodes.cyan+AnsiiCodes.bold+'\n{} x {} x {} {} #{} supercell'+AnsiiCodes.end
@@ -1,104 +1,95 @@
-from collections import namedtuple
-import sys, re, glob, yaml
+from itertools import islice
+import sys, os, glob, yaml, argparse
 from os.path import expanduser 
-import supermods.Wyckoff as wyck
+import supermods.supercell as sc
+import supermods.symmetry as sym
+import supermods.terminations as tm
+import supermods.structures as structures
+import supermods.slab as slab
+import supermods.spacegroup as spacegroup
+import supermods.output as printer
+import supermods.pwx as pwx
+import supermods.writers as writers
+import supermods.readers as readers
+from supermods.lattice import Lattice
+from supermods.cell import as_cell
+import numpy as np
 
 class CheckPrimitive:
 	def __init__(self, params):
 		self.cell = params[1]
 		self.space_group = params[0][1]
-		self.param = namedtuple('Wyckoff_Parameter', ['atom', 'letter', 'x', 'y', 'z'])
 #--------------------------------------------------------------------------------------------------		
-	def constructPrim(self, validate):
-		if validate=='cell':
-			return self.cell
-		else:
-			wyckoff_params = [self.param(*data) for data in self.cell]
-			self.cell.clear()
-			[wyck.get_wyckoff(self.cell, self.space_group, p.letter, p.atom, p.x, p.y, p.z) for p in wyckoff_params]
-			return self.cell
+	def constructPrim(self, validate, tol=1e-3):
+		""" Primitive cell wrapped into [0,1) with duplicate sites within tol merged """
+		primitive, merged = structures.primitive_cell(self.cell, validate, self.space_group, tol)
+		if merged:
+			print(StringFormats.merge_notice.format(merged, tol))
+		return primitive
 class SuperCell:
-	def __init__(self, link, unit_cell, output, cell_dm, sort_keys, shifts, charges):
-		self.primitive = unit_cell[1]
+	def __init__(self, link, unit_cell, output, cell_dm, sort_keys, shifts, charges, sym_tol=1e-3, lattice=None):
+		self.primitive = as_cell(unit_cell[1])
 		self.name=unit_cell[0]
 		self.format=output
 		self.sort_by=sort_keys
 		self.cell_dm=cell_dm
 		self.shifts=shifts
 		self.charges = charges
+		self.sym_tol = sym_tol
 		self.invert = False
-		self.invert_key = False
+		self.inversion = None
 		self.origin = False
 		self.zero_key = False
 		self.bilbao = link
+		self.lattice = lattice
 #--------------------------------------------------------------------------------------------------
 	def constructCell(self, X, Y, Z, x_shift, y_shift, z_shift):
 		""" Input is self.primitive, dimensions X, Y, and Z, and the shifts for each dimension
-		Returns the unsorted bulk cell
+		Returns the unsorted bulk cell, wrapped into [0,1). Duplicate sites were merged in the
+		primitive cell, and their integer translations cannot coincide
 		"""
-		iterated_cell = []
-		# Core algorithm to produce supercell coordinate sets"""
-		for i in range(len(self.primitive)):
-			# Iterates individually upon values (atoms and coordinates) in self.primitive
-			prim = self.primitive[i]
-			atom = prim[0]
-			# Creation of supercell basis in XYZ
-			basis = [
-				prim[1] / X,
-				prim[2] / Y,
-				prim[3] / Z, 
-			]
-			# Inner comprehension of all reduced coordinates in X
-			X_red = [ 
-				(
-					basis[0] + i / X,
-					basis[1],
-					basis[2], 
-				)
-				for i in range(X)
-			]
-			# Inner comprehension of all reduced coordinates in Y   
-			XY_red = [
-				(
-					xred[0],
-					xred[1] + i / Y,
-					xred[2],
-				)
-				for xred in X_red
-				for i in range(Y)
-			]
-			# Final comprehension, adds reduced Z coordinates and any shift parameters
-			XYZ_red = [
-				(
-					atom,
-					round(xred[0] + x_shift, 7),
-					round(xred[1] + y_shift, 7),
-					round(xred[2] + i / Z + z_shift, 7),
-				)
-				for xred in XY_red for i in range(Z)
-			]
-			for xred in XYZ_red:
-			# Updates iterated_cell with expanded coordinate sets for each individual atom from self.primitive until the entire
-			# bulk cell is returned
-				iterated_cell.append(xred)
-		return iterated_cell
+		return sc.construct_cell(self.primitive, (X, Y, Z), (x_shift, y_shift, z_shift), wrap=True)
 #--------------------------------------------------------------------------------------------------
 	def layerCell(self, *args):
 		""" Layer cell """
 		bulk_cell = self.constructCell(*self.cell_dm, *self.shifts)
-		layered_cell = sorted(bulk_cell,
-			key = lambda x: tuple(x[self.sort_by[i]] for i in range(3)))
-		for idx, pos in enumerate(layered_cell):
-			if idx < len(layered_cell)-1 and ((list(layered_cell[idx+1])[self.sort_by[0]] == 1-pos[self.sort_by[0]] or list(layered_cell[idx+1]) == [pos[0], -pos[1], -pos[2], -pos[3]])):
-					self.invert = True
-					self.invert_key = idx+1
-			elif idx < len(layered_cell)-1 and list(layered_cell[idx+1])[self.sort_by[0]] == -pos[self.sort_by[0]]:
-					self.invert = True
-					self.invert_key = idx+1
-			if pos[1:4] == [0]*3:
-				self.origin = True
-				self.zero_key = idx+1
+		layered_cell = sc.layer_cell(bulk_cell, self.sort_by)
+		at_origin = np.flatnonzero(np.all(layered_cell.coords == 0, axis=1))
+		if at_origin.size:
+			self.origin = True
+			self.zero_key = int(at_origin[-1])+1
 		return layered_cell
+#--------------------------------------------------------------------------------------------------
+	def displayTerminations(self, layered, top=10, min_thickness=None):
+		""" Prints the cleave windows of whole layers along the primary sort axis, neutral and
+		lowest dipole first. min_thickness defaults to one primitive period
+		"""
+		axis = self.sort_by[0]
+		if min_thickness is None:
+			min_thickness = 1/self.cell_dm[axis-1]
+		ranked = tm.rank_terminations(layered, self.charges, axis, min_thickness, top, self.sym_tol)
+		if ranked is None:
+			print('\nSurface charge not available. Update atomic charges in cells.yaml.')
+			return None
+		print(StringFormats.termination_header)
+		for t in ranked:
+			print(StringFormats.termination.format(t.first, t.last, t.n_atoms, t.thickness, t.net_charge, t.dipole))
+		return ranked
+#--------------------------------------------------------------------------------------------------
+	def findInversion(self, cell):
+		""" Inversion centres of the cell within self.sym_tol. Returns a mask of the atoms that
+		have an inversion partner
+		"""
+		self.inversion = sym.find_inversion(cell, self.sym_tol)
+		self.invert = bool(len(self.inversion.centres))
+		return self.inversion.partners >= 0
+#--------------------------------------------------------------------------------------------------
+	def streamCell(self, first=1, last=None):
+		""" Generator mode of layerCell. Yields layered atoms first to last (1-based, inclusive)
+		while only building the images along the primary axis that overlap the window
+		"""
+		layers = sc.iter_layers(self.primitive.species, self.primitive.coords, self.cell_dm, self.shifts, self.sort_by, wrap=True)
+		return islice(layers, first-1, last)
 #--------------------------------------------------------------------------------------------------
 	def displayParam(self, disp_id, X, Y, Z):
 		name=[AnsiiCodes.cyan+str(s) for s in self.name]
@@ -113,96 +104,334 @@ class SuperCell:
 		if self.bilbao:
 			print('Cell constructed from Wyckoff positions using standard ITA settings:\n%s' %(self.bilbao))
 #--------------------------------------------------------------------------------------------------
-	def displayCell(self):
+	def displayCell(self, target=None):
+		""" Prints the layered supercell, to target ('pager' or a file path) if given, then
+		prompts for atom ranges to cleave
+		"""
 		layered_supercell = self.layerCell()
+		paired = self.findInversion(layered_supercell)
 		print(StringFormats.header.format('','','x','y','z'))
 		self.displayParam(1, *self.cell_dm)
 		print('\n', StringFormats.header.format('X','Y','Z'))
-		for idx, position in enumerate(layered_supercell, 1):
-			if self.invert and idx in [self.invert_key, self.invert_key + 1]:
-				print(StringFormats.invert.format(idx, *position))
-			if not self.invert or (self.invert and idx not in [self.invert_key, self.invert_key + 1]):
-				print(StringFormats.main.format(idx, *position))
+		with printer.stream(target) as out:
+			printer.emit(printer.position_blocks(layered_supercell, 'main', paired), out)
 		if self.invert: 
-			print(StringFormats.invert_notice.format(self.invert_key, self.invert_key + 1))
+			centres = self.inversion.centres
+			print(StringFormats.invert_notice.format(len(centres), *centres[0]))
+			print(', '.join('{}-{}'.format(i+1, j+1) for i, j in self.inversion.pairs.tolist()))
 		if self.origin: 
-			print(StringFormats.invert_notice.format(self.zero_key))
+			print(StringFormats.origin_notice.format(self.zero_key))
 
 		while True:
 			surface = input(StringFormats.cleave_surface).split('-')
 			print('\n')
 			if surface != [''] and (len(surface) == 2): 
-				cleaved_surface = layered_supercell[int(surface[0])-1:int(surface[1])]
-				quantum_sort=sorted(cleaved_surface,
-					key = lambda x: tuple(x[self.sort_by[i]] for i in range(3)))
-				abi_sort=sorted(cleaved_surface,
-					key = lambda x:(x[0],x[self.sort_by[0]]))
+				cleaved_surface = self.cleaveCell(self.windowCell([int(s) for s in surface], layered_supercell))
 			else: 
 				print('Exiting...\n')
 				raise SystemExit
-			for i in range(len(cleaved_surface)):
-				if self.format == 'a':
-					print(StringFormats.abinit.format(*abi_sort[i][1:4], abi_sort[i][0]))
-				if self.format == 'q':
-					print(StringFormats.quantum.format(*quantum_sort[i]))
-			try:
-				net_charge = sum([self.charges.get(value[0], 'Null') for value in cleaved_surface])
-				if net_charge > 0:
-					print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.green, '+' + str(net_charge), AnsiiCodes.end))
-				elif net_charge == 0:
-					print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.cyan, net_charge, AnsiiCodes.end))
-				else:
-					print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.red, net_charge, AnsiiCodes.end))
-			except TypeError:
+			printer.emit(self.positionBlocks(cleaved_surface))
+			net_charge = cleaved_surface.net_charge(self.charges)
+			if net_charge is None:
 				print('\nSurface charge not available. Update atomic charges in cells.yaml')
-				pass
+			elif net_charge > 0:
+				print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.green, '+' + str(net_charge), AnsiiCodes.end))
+			elif net_charge == 0:
+				print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.cyan, net_charge, AnsiiCodes.end))
+			else:
+				print(StringFormats.charge.format(AnsiiCodes.bold, AnsiiCodes.red, net_charge, AnsiiCodes.end))
+			self.displaySymmetry(cleaved_surface)
 			print('Press enter to exit')
 			self.cleaved = {}
+#--------------------------------------------------------------------------------------------------
+	def slabSymmetric(self, cleaved):
+		""" True if an operation of the cleaved slab maps its top surface onto its bottom one. The
+		slab is taken as orthogonal without a lattice
+		"""
+		lattice = None if self.lattice is None else self.lattice.scaled(self.cell_dm)
+		return spacegroup.slab_symmetric(cleaved, self.sort_by[0]-1, lattice, self.sym_tol)
+	def displaySymmetry(self, cleaved):
+		if self.slabSymmetric(cleaved):
+			print(StringFormats.slab_symmetry.format(AnsiiCodes.bold, AnsiiCodes.cyan, 'Symmetric', AnsiiCodes.end))
+		else:
+			print(StringFormats.slab_symmetry.format(AnsiiCodes.bold, AnsiiCodes.pink, 'Asymmetric', AnsiiCodes.end))
+#--------------------------------------------------------------------------------------------------
+	def windowCell(self, surface, layered=None):
+		""" Atoms surface[0] to surface[1] (1-based, inclusive) of the layered cell, sliced from
+		layered when it is already built and streamed with streamCell otherwise
+		"""
+		if layered is None:
+			return as_cell(list(self.streamCell(*surface)))
+		return layered[surface[0]-1:surface[1]]
+	def cleaveCell(self, cleaved):
+		""" A window of the layered cell (see windowCell) in ABINIT (species, then coordinate) or
+		Quantum ESPRESSO (layer) order
+		"""
+		if self.format == 'a':
+			return cleaved.take(sc.species_order(cleaved, self.sort_by[0]))
+		return sc.layer_cell(cleaved, self.sort_by)
+#--------------------------------------------------------------------------------------------------
+	def positionBlocks(self, cleaved):
+		""" Position block of a cleaved surface as text chunks, without terminal formatting """
+		if self.format not in StringFormats.styles:
+			return []
+		return printer.position_blocks(cleaved, StringFormats.styles[self.format])
+#--------------------------------------------------------------------------------------------------
+	def writeSurface(self, window, surface, out_dir):
+		""" Writes the position block of window, atoms surface[0] to surface[1] of the layered cell,
+		to out_dir. Returns the file path, number of atoms and net charge (None if a charge is missing)
+		"""
+		cleaved = self.cleaveCell(window)
+		net_charge = cleaved.net_charge(self.charges)
+		path = os.path.join(out_dir, StringFormats.surface_file.format(
+			*self.name, *self.cell_dm, *surface, StringFormats.extension.get(self.format, 'txt')))
+		with open(path, 'w') as out:
+			out.write(StringFormats.surface_comment.format(*self.cell_dm, *self.name, *surface,
+				'n/a' if net_charge is None else net_charge))
+			if self.format == 'a':
+				out.write('natom %d\nxred\n' %len(cleaved))
+			if self.format == 'q':
+				out.write('ATOMIC_POSITIONS crystal\n')
+			printer.emit(self.positionBlocks(cleaved), out)
+		return path, len(cleaved), net_charge
 #--------------------------------------------------------------------------------------------------
 class Yaml_Retrieve:
-	def __init__(self):
-		self.yaml_path=path=str(sys.argv[1])
+	def __init__(self, path=None, args=None):
+		self.yaml_path=path=str(sys.argv[1] if path is None else path)
 		with open(self.yaml_path) as yaml_file:
 			self.yaml_data = yaml.load(yaml_file, Loader = yaml.FullLoader)
+		self.args = args
 		self.charges = self.yaml_data['Charges']
 		self.struct = [key for key in self.yaml_data if key.lower() != 'charges']
 		self.key_map = {'x': 1, 'y': 2, 'z': 3 }
-	def validate_params(self):
-		def set_dim():
-			try:
+		self.sym_tol = float(self.yaml_data.get('Symmetry tolerance', 1e-3))
+		if args is not None and args.tol is not None:
+			self.sym_tol = args.tol
+	def set_dim(self):
+		""" Output format, dimensions, sort keys and shifts from cells.yaml, overridden by the
+		command line arguments when given
+		"""
+		args = self.args
+		try:
+			if args is not None and args.dims:
+				dim = [int(v) for v in args.dims]
+			else:
 				dim = [int(v) for v in self.yaml_data['Cell dimensions'].values()]
+			if args is not None and args.sort:
+				sort_by = args.sort
+			else:
 				sort_by = self.yaml_data['Sort priority'].strip(" ").split()
+			if args is not None and args.shifts:
+				shifts = [float(v) for v in args.shifts]
+			else:
 				shifts = [float(v) for v in self.yaml_data['Origin shifts'].values()]
-				sort_keys = [self.key_map.get(key, 'Null') for key in sort_by]
+			sort_keys = [self.key_map.get(key, 'Null') for key in sort_by]
+			if args is not None and args.format:
+				output_format = args.format[0].lower()
+			else:
 				output_format=self.yaml_data['Output format'][0].lower()
-				struct = self.yaml_data['Structure']
-			except ValueError:
-				print('Parameter error. Check cells.yaml')
-				return None
-			return output_format, dim, sort_keys, shifts
-		struct=self.yaml_data['Structure']
+		except (ValueError, KeyError, AttributeError):
+			print('Parameter error. Check cells.yaml')
+			return None
+		if 'Null' in sort_keys:
+			print('Parameter error. Check cells.yaml')
+			return None
+		if self.millerIndex() is not None and sort_keys[0] != 3:
+			# orient() stacks the (hkl) planes along z, so layers and cleaving have to follow z
+			sort_keys = [3] + [k for k in sort_keys if k != 3]
+			print('Miller index given: sorting by %s' %' '.join('xyz'[k-1] for k in sort_keys))
+		return output_format, dim, sort_keys, shifts
+	def unitCell(self, struct):
+		""" [name, space group] and primitive cell of a structure in cells.yaml, and the Bilbao link
+		for Wyckoff structures
+		"""
 		fmtd_struct=struct.strip(" ").split()
 		name = fmtd_struct
 		struct_a = self.yaml_data['Structures'][" ".join(fmtd_struct)]
-		params = set_dim()
 		spg = int(name[1])
-		unparsed_cell=(re.split(' |,', struct_a))
-		while '' in unparsed_cell:
-			unparsed_cell.remove('')
-		if True in [s.isalpha() for s in unparsed_cell[1]]:
-			parser=[5, 'wyckoff']
-			bilbao_link=AnsiiCodes.bold+"https://www.cryst.ehu.es/cgi-bin/"\
-			"cryst/programs/nph-wp-list?gnum="+str(spg)+'\n'+AnsiiCodes.end
+		rows, kind = structures.split_structure(struct_a)
+		if kind == 'wyckoff':
+			bilbao_link=AnsiiCodes.bold+structures.bilbao_link(spg)+'\n'+AnsiiCodes.end
 		else:
-			parser=[4, 'cell']
 			bilbao_link=False
-		split_cell = [
-			unparsed_cell[i:i + parser[0]] for i in range(0, len(unparsed_cell), parser[0])]
-		unit_cell = [
-		[name[0], int(name[1])],
-		[[*data[:-3], *(float(v) for v in data[-3::])] for data in split_cell]]
-		unit_cell[1]=CheckPrimitive(unit_cell).constructPrim(parser[1])
-		SuperCell(bilbao_link, unit_cell, *params, self.charges).displayCell()
+		unit_cell = [[name[0], spg], rows]
+		return unit_cell, kind, bilbao_link
+	def validate_params(self):
+		params = self.set_dim()
+		if params is None:
+			return None
+		unit_cell, kind, bilbao_link = self.unitCell(self.yaml_data['Structure'])
+		try:
+			unit_cell[1]=CheckPrimitive(unit_cell).constructPrim(kind, self.sym_tol)
+		except (KeyError, ValueError) as error:
+			print('%s: %s' %(self.yaml_data['Structure'], error))
+			return None
+		lattice = self.orient(unit_cell, self.latticeOf(self.yaml_data['Structure']))
+		SuperCell(bilbao_link, unit_cell, *params, self.charges, self.sym_tol, lattice).displayCell(
+			None if self.args is None else self.args.pager)
+	def millerIndex(self):
+		""" (h, k, l) from the command line or 'Miller index' in the input file, None if not given """
+		if self.args is not None and self.args.hkl:
+			return tuple(self.args.hkl)
+		if 'Miller index' in self.yaml_data:
+			return tuple(int(i) for i in str(self.yaml_data['Miller index']).split())
+		return None
+	def orient(self, unit_cell, lattice=None):
+		""" Re-expresses the primitive cell in the (hkl) surface basis when a Miller index is given, so
+		that the third axis (z) stacks (hkl) planes. The index is added to the structure name.
+		Returns the lattice in the same basis (None without one)
+		"""
+		hkl = self.millerIndex()
+		if hkl is not None:
+			P = slab.surface_basis(hkl, None if lattice is None else lattice.metric)
+			unit_cell[1] = slab.transform_cell(unit_cell[1], P)
+			unit_cell[0][0] = '{}_{}{}{}'.format(unit_cell[0][0], *hkl)
+			if lattice is not None:
+				lattice = Lattice.from_matrix(P @ lattice.matrix)
+		return lattice
+	def latticeOf(self, struct):
+		""" Lattice of a structure from the 'Lattice' section (a b c alpha beta gamma), or of the
+		structure file it names. None if absent
+		"""
+		values = self.yaml_data.get('Lattice', {}).get(struct)
+		if values is None:
+			path = structures.structure_file(self.yaml_data.get('Structures', {}).get(struct, ''))
+			return None if path is None else readers.read(path).lattice
+		values = str(values).split() if isinstance(values, str) else values
+		return Lattice(*[float(v) for v in values])
+	def batch(self):
+		""" Headless mode: writes the position block of every cleave range of every structure to
+		args.out without prompting or terminal formatting
+		"""
+		args = self.args
+		params = self.set_dim()
+		if params is None:
+			return 1
+		os.makedirs(args.out, exist_ok=True)
+		if args.all:
+			names = list(self.yaml_data['Structures'])
+		elif args.structure:
+			names = args.structure
+		elif 'Structure' in self.yaml_data:
+			names = self.yaml_data['Structure']
+			names = [names] if isinstance(names, str) else names
+		else:
+			print('No Structure in %s: give -s STRUCTURE or --all' %self.yaml_path)
+			return 1
+		ranges = args.cleave or self.yaml_data.get('Cleave', ['all'])
+		ranges = [ranges] if isinstance(ranges, str) else ranges
+		# The template is parsed once and filled for every cleaved surface
+		template = pwx.Template.read(args.pwx) if args.pwx else None
+		for struct in names:
+			try:
+				unit_cell, kind, _ = self.unitCell(struct)
+			except (KeyError, IndexError, ValueError):
+				print('%s: structure not found in %s' %(struct, self.yaml_path))
+				continue
+			try:
+				unit_cell[1], merged = structures.primitive_cell(unit_cell[1], kind, unit_cell[0][1], self.sym_tol)
+			except (KeyError, ValueError) as error:
+				print('%s: %s' %(struct, error))
+				continue
+			if merged:
+				print('%s: %d duplicate site(s) within %g merged' %(struct, merged, self.sym_tol))
+			if args.scan_hkl:
+				self.scanSurfaces(struct, unit_cell[1], args.scan_hkl)
+			lattice = self.orient(unit_cell, self.latticeOf(struct))
+			supercell = SuperCell(False, unit_cell, *params, self.charges, self.sym_tol, lattice)
+			if lattice is not None:
+				lattice = lattice.scaled(params[1])
+			elif args.export:
+				print('%s: no Lattice entry, skipping %s export' %(struct, ', '.join(args.export)))
+			# The full layered cell is only built for the termination listing; cleave windows are streamed
+			layered = supercell.layerCell() if args.terminations else None
+			n_atoms = sc.count(supercell.primitive, supercell.cell_dm)
+			for cleave in ranges:
+				surface = cleave_range(cleave, n_atoms)
+				if surface is None:
+					print('%s: invalid cleave range %s for %d atoms' %(struct, cleave, n_atoms))
+					continue
+				window = supercell.windowCell(surface, layered)
+				path, n_cleaved, net_charge = supercell.writeSurface(window, surface, args.out)
+				cleaved = sc.layer_cell(window, supercell.sort_by)
+				print('%s\t%d atoms\tnet charge %s\t%s' %(path, n_cleaved, 'n/a' if net_charge is None else net_charge,
+					'symmetric' if supercell.slabSymmetric(cleaved) else 'asymmetric'))
+				if template is not None:
+					path = os.path.join(args.out, StringFormats.surface_file.format(*supercell.name,
+						*supercell.cell_dm, *surface, 'in'))
+					try:
+						pwx.write_inputs(template, [(path, cleaved, lattice)])
+						print(path)
+					except ValueError as error:
+						print('%s: %s' %(struct, error))
+				for fmt in (args.export or []) if lattice is not None else []:
+					extension = [p for p in writers.registry[fmt][1] if p.startswith('.')][-1][1:]
+					path = os.path.join(args.out, StringFormats.surface_file.format(*supercell.name,
+						*supercell.cell_dm, *surface, extension))
+					writers.write(path, cleaved, lattice, fmt, StringFormats.surface_comment.format(*supercell.cell_dm,
+						*supercell.name, *surface, 'n/a' if net_charge is None else net_charge).strip('# \n'))
+					print(path)
+			if args.terminations:
+				print('%s terminations:' %struct)
+				supercell.displayTerminations(layered, args.terminations, args.min_thickness)
+		return 0
+
+	def scanSurfaces(self, struct, primitive, max_index):
+		""" Prints the layers and best termination of every plane up to max_index """
+		print('%s surfaces up to index %d:' %(struct, max_index))
+		print(StringFormats.surface_header)
+		lattice = self.latticeOf(struct)
+		metric = None if lattice is None else lattice.metric
+		for surface in slab.scan_surfaces(primitive, self.charges, max_index, metric=metric, tol=self.sym_tol):
+			t = surface.termination
+			best = 'n/a' if t is None else StringFormats.termination.format(t.first, t.last, t.n_atoms,
+				t.thickness, t.net_charge, t.dipole)
+			print(StringFormats.surface_row.format(*surface.hkl, surface.n_atoms, surface.n_layers, best))
+
+def cleave_range(text, n_atoms):
+	""" [first, last] from 'first-last' (1-based, inclusive) or 'all', None if out of range """
+	if str(text).strip().lower() == 'all':
+		return [1, n_atoms]
+	try:
+		surface = [int(v) for v in str(text).split('-')]
+	except ValueError:
+		return None
+	if len(surface) != 2 or not 1 <= surface[0] <= surface[1] <= n_atoms:
+		return None
+	return surface
+
+def parse_args(argv=None):
+	parser = argparse.ArgumentParser(description='Supercells from the primitive cells in a cells.yaml file')
+	parser.add_argument('yaml', help='input file, see cells.yaml')
+	parser.add_argument('-b', '--batch', action='store_true',
+		help='write cleaved position blocks to files instead of prompting')
+	parser.add_argument('-s', '--structure', action='append',
+		help='structure key, e.g. "PbO 129" (repeatable; default: Structure in the input file)')
+	parser.add_argument('-a', '--all', action='store_true', help='every structure in the input file')
+	parser.add_argument('-c', '--cleave', action='append',
+		help='atom range first-last or "all" (repeatable; default: Cleave in the input file or all)')
+	parser.add_argument('-d', '--dims', nargs=3, metavar=('X', 'Y', 'Z'))
+	parser.add_argument('--sort', nargs=3, choices=['x', 'y', 'z'], help='sort priority (z is moved first with --hkl)')
+	parser.add_argument('--shifts', nargs=3, metavar=('x', 'y', 'z'))
+	parser.add_argument('-f', '--format', choices=['ABINIT', 'QE', 'abinit', 'qe', 'a', 'q'])
+	parser.add_argument('--tol', type=float, help='symmetry and duplicate tolerance (reduced units)')
+	parser.add_argument('-t', '--terminations', type=int, metavar='N',
+		help='list the N neutral, lowest-dipole cleave windows along the primary sort axis')
+	parser.add_argument('--min-thickness', type=float,
+		help='minimum window thickness in reduced units (default: one primitive period)')
+	parser.add_argument('--hkl', nargs=3, type=int, metavar=('H', 'K', 'L'),
+		help='orient the cell so that z is normal to the (hkl) plane')
+	parser.add_argument('--scan-hkl', type=int, metavar='N',
+		help='list layers and the best termination of every plane with indices up to N')
+	parser.add_argument('-o', '--out', default='.', help='output directory in batch mode')
+	parser.add_argument('--pwx', metavar='TEMPLATE',
+		help='also write a pw.x input per cleave range, filling nat, ntyp, species and positions into TEMPLATE')
+	parser.add_argument('-e', '--export', action='append', choices=sorted(writers.registry),
+		help='also write each cleave range in this format (repeatable); needs a Lattice entry for the structure')
+	parser.add_argument('--pager', action='store_const', const='pager',
+		help='show the supercell table in $PAGER (less -R by default)')
+	parser.add_argument('--no-color', action='store_true', help='plain output without ANSI codes')
+	return parser.parse_args(argv)
 #--------------------------------------------------------------------------------------------------
 class AnsiiCodes:
     cyan = '\033[96m'
@@ -218,13 +447,29 @@ class StringFormats:
     quantum = '{:2}     {:12.9f}  {:12.9f}  {:12.9f}'
     charge = '\nNet charge of surface: {}{}{}{}\n'
     invert = AnsiiCodes.highlight + '{:^4}:  {:2}  | {:12.9f} | {:12.9f} | {:12.9f}' + AnsiiCodes.end
-    invert_notice = AnsiiCodes.bold + '\n***Possible inversion center found at {}-{}***\n' + AnsiiCodes.end
+    invert_notice = AnsiiCodes.bold + '\n***{} inversion center(s) found, pairs through {:.6f} {:.6f} {:.6f}:***\n' + AnsiiCodes.end
+    origin_notice = AnsiiCodes.bold + '\n***Atom found at the origin: {}***\n' + AnsiiCodes.end
+    termination_header = '\n{:>13}  {:>6}  {:>10}  {:>10}  {:>10}'.format('Atoms', 'N', 'Thickness', 'Charge', 'Dipole')
+    termination = '{:>6}-{:<6}  {:>6}  {:>10.4f}  {:>+10.3f}  {:>+10.4f}'
+    surface_header = '{:>9}  {:>6}  {:>6}  {:>13}  {:>6}  {:>10}  {:>10}  {:>10}'.format(
+        'hkl', 'Atoms', 'Layers', 'Best window', 'N', 'Thickness', 'Charge', 'Dipole')
+    surface_row = '({:>2} {:>2} {:>2})  {:>6}  {:>6}  {}'
+    merge_notice = AnsiiCodes.bold + '\n***{} duplicate site(s) within {} merged***\n' + AnsiiCodes.end
+    slab_symmetry = '{}{}{} slab{}\n'
     header = '             {:^12}   {:^12}   {:^12}\n'
     cleaved_header ='      {:^10}    {:^10}    {:^10}\n'
     supercell_name = AnsiiCodes.cyan+AnsiiCodes.bold+'\n{} x {} x {} {} #{} supercell'+AnsiiCodes.end
     cell_name= AnsiiCodes.bold+ '\n{} #{} cell' +AnsiiCodes.end
+    surface_file = '{}_{}_{}x{}x{}_{}-{}.{}'
+    surface_comment = '# {} x {} x {} {} #{} supercell, atoms {}-{}, net charge {}\n'
+    extension = {'a': 'abi', 'q': 'qe'}
+    styles = {'a': 'abinit', 'q': 'quantum'}
     cleave_surface = '\nEnter two numbers e.g. "10-20" corresponding to the atomic'\
     				' positions you would like to cleave a surface between:\n\n'
 
 if __name__ == '__main__':
-	Yaml_Retrieve().validate_params()
+	args = parse_args()
+	printer.set_color(not args.no_color and sys.stdout.isatty())
+	if args.batch:
+		sys.exit(Yaml_Retrieve(args.yaml, args).batch())
+	Yaml_Retrieve(args.yaml, args).validate_params()
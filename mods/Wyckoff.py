@@ -1,583 +0,0 @@
-
-
-def get_wyckoff(unit_cell, space_group, letter, atom, x, y, z):
-	wyckoff = {
-		1:  {
-			'1a': [[x,y,z]]
-		}, 
-		2:  {
-			'1a': [[0,0,0]], 
-			'1b': [[0,0,1/2]], 
-			'1c': [[0,1/2,0]], 
-			'1d': [[1/2,0,0]], 
-			'1e': [[1/2,1/2,0]], 
-			'1f': [[1/2,0,1/2]], 
-			'1g': [[0,1/2,1/2]], 
-			'1h': [[1/2,1/2,1/2]], 
-			'2i': [[-x,-y,-z], [x,y,z]]
-		}, 
-		3:  {
-			'1a': [[0,y,0]], 
-			'1b': [[0,y,1/2]], 
-			'1c': [[1/2,y,0]], 
-			'1d': [[1/2,y,1/2]], 
-			'2e': [[-x,y,-z], [x,y,z]]
-		}, 
-		4:  {
-			'2a': [[-x,y+1/2,-z], [x,y,z]]
-		}, 
-		5:  {
-			'2a': [[0,y,0]], 
-			'2b': [[0,y,1/2]], 
-			'4c': [[-x,y,-z], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		6:  {
-			'1a': [[x,0,z]], 
-			'1b': [[x,1/2,z]], 
-			'2c': [[x,-y,z], [x,y,z]]
-		}, 
-		7:  {
-			'2a': [[x,-y,z+1/2], [x,y,z]]
-		}, 
-		8:  {
-			'2a': [[x,0,z]], 
-			'4b': [[x,-y,z], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		9:  {
-			'4a': [[x,y,z], [x,-y,z+1/2]],
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		10: {
-			'1a': [[0,0,0]], 
-			'1b': [[0,1/2,0]], 
-			'1c': [[0,0,1/2]], 
-			'1d': [[1/2,0,0]], 
-			'1e': [[1/2,1/2,0]], 
-			'1f': [[0,1/2,1/2]], 
-			'1g': [[1/2,0,1/2]], 
-			'1h': [[1/2,1/2,1/2]], 
-			'2i': [[0,-y,0], [0,y,0]], 
-			'2j': [[1/2,-y,0], [1/2,y,0]], 
-			'2k': [[0,-y,1/2], [0,y,1/2]], 
-			'2l': [[1/2,-y,1/2], [1/2,y,1/2]], 
-			'2m': [[-x,0,-z], [x,0,z]], 
-			'2n': [[-x,1/2,-z], [x,1/2,z]], 
-			'4o': [[x,-y,z], [-x,-y,-z], [-x,y,-z], [x,y,z]]
-		}, 
-		11: {
-			'2a': [[0,1/2,0], [0,0,0]], 
-			'2b': [[1/2,1/2,0], [1/2,0,0]], 
-			'2c': [[0,1/2,1/2], [0,0,1/2]], 
-			'2d': [[1/2,1/2,1/2], [1/2,0,1/2]], 
-			'2e': [[-x,3/4,-z], [x,1/4,z]], 
-			'4f': [[x,-y+1/2,z], [-x,-y,-z], [-x,y+1/2,-z], [x,y,z]]
-		}, 
-		12: {
-			'2a': [[0,0,0]], 
-			'2b': [[0,1/2,0]], 
-			'2c': [[0,0,1/2]], 
-			'2d': [[0,1/2,1/2]], 
-			'4e': [[3/4,1/4,0], [1/4,1/4,0]], 
-			'4f': [[3/4,1/4,1/2], [1/4,1/4,1/2]], 
-			'4g': [[0,-y,0], [0,y,0]], 
-			'4h': [[0,-y,1/2], [0,y,1/2]], 
-			'4i': [[-x,0,-z], [x,0,z]], 
-			'8j': [[x,-y,z], [-x,-y,-z], [-x,y,-z], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		13: {
-			'2a': [[0,0,1/2], [0,0,0]], 
-			'2b': [[1/2,1/2,1/2], [1/2,1/2,0]], 
-			'2c': [[0,1/2,1/2], [0,1/2,0]], 
-			'2d': [[1/2,0,1/2], [1/2,0,0]], 
-			'2e': [[0,-y,3/4], [0,y,1/4]], 
-			'2f': [[1/2,-y,3/4], [1/2,y,1/4]], 
-			'4g': [[x,-y,z+1/2], [-x,-y,-z], [-x,y,-z+1/2], [x,y,z]]
-		}, 
-		14: {
-			'2a': [[0,1/2,1/2], [0,0,0]], 
-			'2b': [[1/2,1/2,1/2], [1/2,0,0]], 
-			'2c': [[0,1/2,0], [0,0,1/2]], 
-			'2d': [[1/2,1/2,0], [1/2,0,1/2]], 
-			'4e': [[x,-y+1/2,z+1/2], [-x,-y,-z], [-x,y+1/2,-z+1/2], [x,y,z]]
-		}, 
-		15: {
-			'4a': [[0,0,1/2], [0,0,0]], 
-			'4b': [[0,1/2,1/2], [0,1/2,0]], 
-			'4c': [[3/4,1/4,1/2], [1/4,1/4,0]], 
-			'4d': [[3/4,1/4,0], [1/4,1/4,1/2]], 
-			'4e': [[0,-y,3/4], [0,y,1/4]], 
-			'8f': [[x,-y,z+1/2], [-x,-y,-z], [-x,y,-z+1/2], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		16: {
-			'1a': [[0,0,0]], 
-			'1b': [[1/2,0,0]], 
-			'1c': [[0,1/2,0]], 
-			'1d': [[0,0,1/2]], 
-			'1e': [[1/2,1/2,0]], 
-			'1f': [[1/2,0,1/2]], 
-			'1g': [[0,1/2,1/2]], 
-			'1h': [[1/2,1/2,1/2]], 
-			'2i': [[-x,0,0], [x,0,0]], 
-			'2j': [[-x,0,1/2], [x,0,1/2]], 
-			'2k': [[-x,1/2,0], [x,1/2,0]], 
-			'2l': [[-x,1/2,1/2], [x,1/2,1/2]], 
-			'2m': [[0,-y,0], [0,y,0]], 
-			'2n': [[0,-y,1/2], [0,y,1/2]], 
-			'2o': [[1/2,-y,0], [1/2,y,0]], 
-			'2p': [[1/2,-y,1/2], [1/2,y,1/2]], 
-			'2q': [[0,0,-z], [0,0,z]], 
-			'2r': [[1/2,0,-z], [1/2,0,z]], 
-			'2s': [[0,1/2,-z], [0,1/2,z]], 
-			'2t': [[1/2,1/2,-z], [1/2,1/2,z]], 
-			'4u': [[x,-y,-z], [-x,y,-z], [-x,-y,z], [x,y,z]]
-		}, 
-		17: {
-			'2a': [[-x,0,1/2], [x,0,0]], 
-			'2b': [[-x,1/2,1/2], [x,1/2,0]], 
-			'2c': [[0,-y,3/4], [0,y,1/4]], 
-			'2d': [[1/2,-y,3/4], [1/2,y,1/4]], 
-			'4e': [[x,-y,-z], [-x,y,-z+1/2], [-x,-y,z+1/2], [x,y,z]]
-		}, 
-		18: {
-			'2a': [[1/2,1/2,-z], [0,0,z]], 
-			'2b': [[1/2,0,-z], [0,1/2,z]], 
-			'4c': [[x+1/2,-y+1/2,-z], [-x+1/2,y+1/2,-z], [-x,-y,z], [x,y,z]]
-		}, 
-		19: {
-			'4a': [[x+1/2,-y+1/2,-z], [-x,y+1/2,-z+1/2], [-x+1/2,-y,z+1/2], [x,y,z]]
-		}, 
-		20: {
-			'4a': [[-x,0,1/2], [x,0,0]], 
-			'4b': [[0,-y,3/4], [0,y,1/4]], 
-			'8c': [[x,-y,-z], [-x,y,-z+1/2], [-x,-y,z+1/2], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		},
-		21: {
-			'2a': [[0,0,0]], 
-			'2b': [[0,1/2,0]], 
-			'2c': [[1/2,0,1/2]], 
-			'2d': [[0,0,1/2]], 
-			'4e': [[-x,0,0], [x,0,0]], 
-			'4f': [[-x,0,1/2], [x,0,1/2]], 
-			'4g': [[0,-y,0], [0,y,0]], 
-			'4h': [[0,-y,1/2], [0,y,1/2]], 
-			'4i': [[0,0,-z], [0,0,z]], 
-			'4j': [[0,1/2,-z], [0,1/2,z]], 
-			'4k': [[3/4,1/4,-z], [1/4,1/4,z]], 
-			'8l': [[x,-y,-z], [-x,y,-z], [-x,-y,z], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		22: {
-			'4a': [[0,0,0]], 
-			'4b': [[0,0,1/2]], 
-			'4c': [[1/4,1/4,1/4]], 
-			'4d': [[1/4,1/4,3/4]], 
-			'8e': [[-x,0,0], [x,0,0]], 
-			'8f': [[0,-y,0], [0,y,0]], 
-			'8g': [[0,0,-z], [0,0,z]], 
-			'8h': [[3/4,1/4,-z], [1/4,1/4,z]], 
-			'8i': [[3/4,-y,1/4], [1/4,y,1/4]], 
-			'8j': [[-x,3/4,1/4], [x,1/4,1/4]], 
-			'16k': [[x,-y,-z], [-x,y,-z], [-x,-y,z], [x,y,z]], 
-			'translation': [[1/2,1/2,0], [1/2,0,1/2], [0,1/2,1/2], [0,0,0]]
-		},
-		23: {
-			'2a': [[0,0,0]], 
-			'2b': [[1/2,0,0]], 
-			'2c': [[0,0,1/2]], 
-			'2d': [[0,1/2,0]], 
-			'4e': [[-x,0,0], [x,0,0]], 
-			'4f': [[-x,0,1/2], [x,0,1/2]], 
-			'4g': [[0,-y,0], [0,y,0]], 
-			'4h': [[1/2,-y,0], [1/2,y,0]], 
-			'4i': [[0,0,-z], [0,0,z]], 
-			'4j': [[0,1/2,-z], [0,1/2,z]], 
-			'8k': [[x,-y,-z], [-x,y,-z], [-x,-y,z], [x,y,z]], 
-			'translation': [[1/2,1/2,1/2], [0,0,0]]
-		}, 
-		24: {
-			'4a': [[-x+1/2,0,3/4], [x,0,1/4]], 
-			'4b': [[1/4,-y,1/2], [1/4,y,0]], 
-			'4c': [[0,3/4,-z+1/2], [0,1/4,z]], 
-			'8d': [[x+1/2,-y+1/2,-z], [-x,y+1/2,-z+1/2], [-x+1/2,-y,z+1/2], [x,y,z]], 
-			'translation': [[1/2,1/2,1/2], [0,0,0]]
-		}, 
-		25: {
-			'1a': [[0,0,z]], 
-			'1b': [[0,1/2,z]], 
-			'1c': [[1/2,0,z]], 
-			'1d': [[1/2,1/2,z]], 
-			'2e': [[-x,0,z], [x,0,z]], 
-			'2f': [[-x,1/2,z], [x,1/2,z]], 
-			'2g': [[0,-y,z], [0,y,z]], 
-			'2h': [[1/2,-y,z], [1/2,y,z]], 
-			'4i': [[-x,y,z], [x,-y,z], [-x,-y,z], [x,y,z]]
-		}, 
-		26: {
-			'2a': [[0,-y,z+1/2], [0,y,z]], 
-			'2b': [[1/2,-y,z+1/2], [1/2,y,z]], 
-			'4c': [[-x,y,z], [x,-y,z+1/2], [-x,-y,z+1/2], [x,y,z]]
-		}, 
-		27: {
-			'2a': [[0,0,z+1/2], [0,0,z]], 
-			'2b': [[0,1/2,z+1/2], [0,1/2,z]], 
-			'2c': [[1/2,0,z+1/2], [1/2,0,z]], 
-			'2d': [[1/2,1/2,z+1/2], [1/2,1/2,z]], 
-			'4e': [[-x,y,z+1/2], [x,-y,z+1/2], [-x,-y,z], [x,y,z]]
-		}, 
-		28: {
-			'2a': [[1/2,0,z], [0,0,z]], 
-			'2b': [[1/2,1/2,z], [0,1/2,z]], 
-			'2c': [[3/4,-y,z], [1/4,y,z]], 
-			'4d': [[-x+1/2,y,z], [x+1/2,-y,z], [-x,-y,z], [x,y,z]]
-		}, 
-		29: {
-			'4a': [[-x+1/2,y,z+1/2], [x+1/2,-y,z], [-x,-y,z+1/2], [x,y,z]]
-		}, 
-		30: {
-			'2a': [[0,1/2,z+1/2], [0,0,z]], 
-			'2b': [[1/2,1/2,z+1/2], [1/2,0,z]], 
-			'4c': [[-x,y+1/2,z+1/2], [x,-y+1/2,z+1/2], [-x,-y,z], [x,y,z]]
-		}, 
-		31: {
-			'2a': [[1/2,-y,z+1/2], [0,y,z]], 
-			'4b': [[-x,y,z], [x+1/2,-y,z+1/2], [-x+1/2,-y,z+1/2], [x,y,z]]
-		}, 
-		32: {
-			'2a': [[1/2,1/2,z], [0,0,z]], 
-			'2b': [[1/2,0,z], [0,1/2,z]], 
-			'4c': [[-x+1/2,y+1/2,z], [x+1/2,-y+1/2,z], [-x,-y,z], [x,y,z]]
-		}, 
-		33: {
-			'4a': [[-x+1/2,y+1/2,z+1/2], [x+1/2,-y+1/2,z], [-x,-y,z+1/2], [x,y,z]]
-		}, 
-		34: {
-			'2a': [[1/2,1/2,z+1/2], [0,0,z]], 
-			'2b': [[1/2,0,z+1/2], [0,1/2,z]], 
-			'4c': [[-x+1/2,y+1/2,z+1/2], [x+1/2,-y+1/2,z+1/2], [-x,-y,z], [x,y,z]]
-		}, 
-		35: {
-			'2a': [[0,0,z]], 
-			'2b': [[0,1/2,z]], 
-			'4c': [[1/4,3/4,z], [1/4,1/4,z]], 
-			'4d': [[-x,0,z], [x,0,z]], 
-			'4e': [[0,-y,z], [0,y,z]], 
-			'8f': [[-x,y,z], [x,-y,z], [-x,-y,z], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		36: {
-			'4a': [[0,-y,z+1/2], [0,y,z]], 
-			'8b': [[-x,y,z], [x,-y,z+1/2], [-x,-y,z+1/2], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		37: {
-			'4a': [[0,0,z+1/2], [0,0,z]], 
-			'4b': [[0,1/2,z+1/2], [0,1/2,z]], 
-			'4c': [[1/4,3/4,z+1/2], [1/4,1/4,z]], 
-			'8d': [[-x,y,z+1/2], [x,-y,z+1/2], [-x,-y,z], [x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,0]]
-		}, 
-		38: {
-			'2a': [[0,0,z]], 
-			'2b': [[1/2,0,z]], 
-			'4c': [[-x,0,z], [x,0,z]], 
-			'4d': [[0,-y,z], [0,y,z]], 
-			'4e': [[1/2,-y,z], [1/2,y,z]], 
-			'8f': [[-x,y,z], [x,-y,z], [-x,-y,z], [x,y,z]], 
-			'translation': [[0,1/2,1/2], [0,0,0]]
-		}, 
-		39: {
-			'4a': [[0,1/2,z], [0,0,z]], 
-			'4b': [[1/2,1/2,z], [1/2,0,z]], 
-			'4c': [[-x,3/4,z], [x,1/4,z]], 
-			'8d': [[-x,y+1/2,z], [x,-y+1/2,z], [-x,-y,z], [x,y,z]], 
-			'translation': [[0,1/2,1/2], [0,0,0]]
-		}, 
-		40: {
-			'4a': [[1/2,0,z], [0,0,z]], 
-			'4b': [[3/4,-y,z], [1/4,y,z]], 
-			'8c': [[-x+1/2,y,z], [x+1/2,-y,z], [-x,-y,z], [x,y,z]], 
-			'translation': [[0,1/2,1/2], [0,0,0]]
-		},
-		40: {
-			'4a': [[0,0,z], [1/2,0,z]], 
-			'4b': [[1/4,y,z], [3/4,-y,z]], 
-			'8c': [[x,y,z], [-x,-y,z], [x+1/2,-y,z], [-x+1/2,y,z]], 
-			'translation': [[0,0,0], [0,1/2,1/2]]
-		}, 
-		41: {
-			'4a': [[0,0,z], [1/2,1/2,z]], 
-			'8b': [[x,y,z], [-x,-y,z], [x+1/2,-y+1/2,z], [-x+1/2,y+1/2,z]], 
-			'translation': [[0,0,0], [0,1/2,1/2]]
-		}, 
-		42: {
-			'4a': [[0,0,z]], 
-			'8b': [[1/4,1/4,z], [1/4,3/4,z]], 
-			'8c': [[0,y,z], [0,-y,z]], 
-			'8d': [[x,0,z], [-x,0,z]], 
-			'16e': [[x,y,z], [-x,-y,z], [x,-y,z], [-x,y,z]], 
-			'translation': [[0,0,0], [0,1/2,1/2], [1/2,0,1/2], [1/2,1/2,0]]
-		}, 
-		43: {
-			'8a': [[0,0,z], [1/4,1/4,z+1/4]], 
-			'16b': [[x,y,z], [-x,-y,z], [x+1/4,-y+1/4,z+1/4], [-x+1/4,y+1/4,z+1/4]], 
-			'translation': [[0,0,0], [1/2,0,1/2], [0,1/2,1/2], [1/2,1/2,0]]
-		}, 
-		44: {
-			'2a': [[0,0,z]], 
-			'2b': [[0,1/2,z]], 
-			'4c': [[x,0,z], [-x,0,z]], 
-			'4d': [[0,y,z], [0,-y,z]], 
-			'8e': [[x,y,z], [-x,-y,z], [x,-y,z], [-x,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,1/2]]
-		}, 
-		45: {
-			'4a': [[0,0,z], [1/2,1/2,z]], 
-			'4b': [[0,1/2,z], [1/2,0,z]], 
-			'8c': [[x,y,z], [-x,-y,z], [x+1/2,-y+1/2,z], [-x+1/2,y+1/2,z]], 
-			'translation': [[0,0,0], [1/2,1/2,1/2]]
-		}, 
-		46: {
-			'4a': [[0,0,z], [1/2,0,z]], 
-			'4b': [[1/4,y,z], [3/4,-y,z]], 
-			'8c': [[x,y,z], [-x,-y,z], [x+1/2,-y,z], [-x+1/2,y,z]], 
-			'translation': [[0,0,0], [1/2,1/2,1/2]]
-		}, 
-		47: {
-			'1a': [[0,0,0]], 
-			'1b': [[1/2,0,0]], 
-			'1c': [[0,0,1/2]], 
-			'1d': [[1/2,0,1/2]], 
-			'1e': [[0,1/2,0]], 
-			'1f': [[1/2,1/2,0]], 
-			'1g': [[0,1/2,1/2]], 
-			'1h': [[1/2,1/2,1/2]], 
-			'2i': [[x,0,0], [-x,0,0]], 
-			'2j': [[x,0,1/2], [-x,0,1/2]], 
-			'2k': [[x,1/2,0], [-x,1/2,0]], 
-			'2l': [[x,1/2,1/2], [-x,1/2,1/2]], 
-			'2m': [[0,y,0], [0,-y,0]], 
-			'2n': [[0,y,1/2], [0,-y,1/2]], 
-			'2o': [[1/2,y,0], [1/2,-y,0]], 
-			'2p': [[1/2,y,1/2], [1/2,-y,1/2]], 
-			'2q': [[0,0,z], [0,0,-z]], 
-			'2r': [[0,1/2,z], [0,1/2,-z]], 
-			'2s': [[1/2,0,z], [1/2,0,-z]], 
-			'2t': [[1/2,1/2,z], [1/2,1/2,-z]], 
-			'4u': [[0,y,z], [0,-y,z], [0,y,-z], [0,-y,-z]], 
-			'4v': [[1/2,y,z], [1/2,-y,z], [1/2,y,-z], [1/2,-y,-z]], 
-			'4w': [[x,0,z], [-x,0,z], [-x,0,-z], [x,0,-z]], 
-			'4x': [[x,1/2,z], [-x,1/2,z], [-x,1/2,-z], [x,1/2,-z]], 
-			'4y': [[x,y,0], [-x,-y,0], [-x,y,0], [x,-y,0]], 
-			'4z': [[x,y,1/2], [-x,-y,1/2], [-x,y,1/2], [x,-y,1/2]], 
-			'8A': [[x,y,z], [-x,-y,z], [-x,y,-z], [x,-y,-z], [-x,-y,-z], [x,y,-z], [x,-y,z], [-x,y,z]]
-		}, 
-		48: {
-			'2a': [[1/4,1/4,1/4], [3/4,3/4,3/4]], 
-			'2b': [[3/4,1/4,1/4], [1/4,3/4,3/4]], 
-			'2c': [[1/4,1/4,3/4], [3/4,3/4,1/4]], 
-			'2d': [[1/4,3/4,1/4], [3/4,1/4,3/4]], 
-			'4e': [[1/2,1/2,1/2], [0,0,1/2], [0,1/2,0], [1/2,0,0]], 
-			'4f': [[0,0,0], [1/2,1/2,0], [1/2,0,1/2], [0,1/2,1/2]], 
-			'4g': [[x,1/4,1/4], [-x+1/2,1/4,1/4], [-x,3/4,3/4], [x+1/2,3/4,3/4]], 
-			'4h': [[x,1/4,3/4], [-x+1/2,1/4,3/4], [-x,3/4,1/4], [x+1/2,3/4,1/4]], 
-			'4i': [[1/4,y,1/4], [1/4,-y+1/2,1/4], [3/4,-y,3/4], [3/4,y+1/2,3/4]], 
-			'4j': [[3/4,y,1/4], [3/4,-y+1/2,1/4], [1/4,-y,3/4], [1/4,y+1/2,3/4]], 
-			'4k': [[1/4,1/4,z], [1/4,1/4,-z+1/2], [3/4,3/4,-z], [3/4,3/4,z+1/2]], 
-			'4l': [[1/4,3/4,z], [1/4,3/4,-z+1/2], [3/4,1/4,-z], [3/4,1/4,z+1/2]], 
-			'8m': [[x,y,z], [-x+1/2,-y+1/2,z], [-x+1/2,y,-z+1/2], [x,-y+1/2,-z+1/2], [-x,-y,-z], [x+1/2,y+1/2,-z], [x+1/2,-y,z+1/2], [-x,y+1/2,z+1/2]]
-		}, 
-		49: {
-			'2a': [[0,0,0], [0,0,1/2]], 
-			'2b': [[1/2,1/2,0], [1/2,1/2,1/2]], 
-			'2c': [[0,1/2,0], [0,1/2,1/2]], 
-			'2d': [[1/2,0,0], [1/2,0,1/2]], 
-			'2e': [[0,0,1/4], [0,0,3/4]], 
-			'2f': [[1/2,0,1/4], [1/2,0,3/4]], 
-			'2g': [[0,1/2,1/4], [0,1/2,3/4]], 
-			'2h': [[1/2,1/2,1/4], [1/2,1/2,3/4]], 
-			'4i': [[x,0,1/4], [-x,0,1/4], [-x,0,3/4], [x,0,3/4]], 
-			'4j': [[x,1/2,1/4], [-x,1/2,1/4], [-x,1/2,3/4], [x,1/2,3/4]], 
-			'4k': [[0,y,1/4], [0,-y,1/4], [0,-y,3/4], [0,y,3/4]], 
-			'4l': [[1/2,y,1/4], [1/2,-y,1/4], [1/2,-y,3/4], [1/2,y,3/4]], 
-			'4m': [[0,0,z], [0,0,-z+1/2], [0,0,-z], [0,0,z+1/2]], 
-			'4n': [[1/2,1/2,z], [1/2,1/2,-z+1/2], [1/2,1/2,-z], [1/2,1/2,z+1/2]], 
-			'4o': [[0,1/2,z], [0,1/2,-z+1/2], [0,1/2,-z], [0,1/2,z+1/2]], 
-			'4p': [[1/2,0,z], [1/2,0,-z+1/2], [1/2,0,-z], [1/2,0,z+1/2]], 
-			'4q': [[x,y,0], [-x,-y,0], [-x,y,1/2], [x,-y,1/2]], 
-			'8r': [[x,y,z], [-x,-y,z], [-x,y,-z+1/2], [x,-y,-z+1/2], [-x,-y,-z], [x,y,-z], [x,-y,z+1/2], [-x,y,z+1/2]]
-		}, 
-		50: {
-			'2a': [[1/4,1/4,0], [3/4,3/4,0]], 
-			'2b': [[3/4,1/4,0], [1/4,3/4,0]], 
-			'2c': [[3/4,1/4,1/2], [1/4,3/4,1/2]], 
-			'2d': [[1/4,1/4,1/2], [3/4,3/4,1/2]], 
-			'4e': [[0,0,0], [1/2,1/2,0], [1/2,0,0], [0,1/2,0]], 
-			'4f': [[0,0,1/2], [1/2,1/2,1/2], [1/2,0,1/2], [0,1/2,1/2]], 
-			'4g': [[x,1/4,0], [-x+1/2,1/4,0], [-x,3/4,0], [x+1/2,3/4,0]], 
-			'4h': [[x,1/4,1/2], [-x+1/2,1/4,1/2], [-x,3/4,1/2], [x+1/2,3/4,1/2]], 
-			'4i': [[1/4,y,0], [1/4,-y+1/2,0], [3/4,-y,0], [3/4,y+1/2,0]], 
-			'4j': [[1/4,y,1/2], [1/4,-y+1/2,1/2], [3/4,-y,1/2], [3/4,y+1/2,1/2]], 
-			'4k': [[1/4,1/4,z], [1/4,1/4,-z], [3/4,3/4,-z], [3/4,3/4,z]], 
-			'4l': [[1/4,3/4,z], [1/4,3/4,-z], [3/4,1/4,-z], [3/4,1/4,z]], 
-			'8m': [[x,y,z], [-x+1/2,-y+1/2,z], [-x+1/2,y,-z], [x,-y+1/2,-z], [-x,-y,-z], [x+1/2,y+1/2,-z], [x+1/2,-y,z], [-x,y+1/2,z]]
-		},
-		57: {
-			'4a': [[0,0,0], [0,0,1/2], [0,1/2,1/2], [0,1/2,0]], 
-			'4b': [[1/2,0,0], [1/2,0,1/2], [1/2,1/2,1/2], [1/2,1/2,0]], 
-			'4c': [[x,1/4,0], [-x,3/4,1/2], [-x,3/4,0], [x,1/4,1/2]], 
-			'4d': [[x,y,1/4], [-x,-y,3/4], [-x,y+1/2,1/4], [x,-y+1/2,3/4]], 
-			'8e': [[x,y,z], [-x,-y,z+1/2], [-x,y+1/2,-z+1/2], [x,-y+1/2,-z], [-x,-y,-z], [x,y,-z+1/2], [x,-y+1/2,z+1/2], [-x,y+1/2,z]]
-		},
-		51: {
-            '2a': [[0,0,0], [1/2,0,0]],
-            '2b': [[0,1/2,0], [1/2,1/2,0]],
-            '2c': [[0,0,1/2], [1/2,0,1/2]],
-            '2d': [[0,1/2,1/2], [1/2,1/2,1/2]],
-            '2e': [[1/4,0,z], [3/4,0,-z]],
-            '2f': [[1/4,1/2,z], [3/4,1/2,-z]],
-            '4g': [[0,y,0], [1/2,-y,0], [0,-y,0], [1/2,y,0]],
-            '4h': [[0,y,1/2], [1/2,-y,1/2], [0,-y,1/2], [1/2,y,1/2]],
-            '4i': [[x,0,z], [-x+1/2,0,z], [-x,0,-z], [x+1/2,0,-z]],
-            '4j': [[x,1/2,z], [-x+1/2,1/2,z], [-x,1/2,-z], [x+1/2,1/2,-z]],
-            '4k': [[1/4,y,z], [1/4,-y,z], [3/4,y,-z], [3/4,-y,-z]],
-            '8l': [[x,y,z], [-x+1/2,-y,z], [-x,y,-z], [x+1/2,-y,-z], [-x,-y,-z], [x+1/2,y,-z], [x,-y,z], [-x+1/2,y,z]],
-    },
-            52: {
-            '4a': [[0,0,0], [1/2,0,0], [1/2,1/2,1/2], [0,1/2,1/2]],
-            '4b': [[0,0,1/2], [1/2,0,1/2], [1/2,1/2,0], [0,1/2,0]],
-            '4c': [[1/4,0,z], [1/4,1/2,-z+1/2], [3/4,0,-z], [3/4,1/2,z+1/2]],
-            '4d': [[x,1/4,1/4], [-x+1/2,3/4,1/4], [-x,3/4,3/4], [x+1/2,1/4,3/4]],
-            '8e': [[x,y,z], [-x+1/2,-y,z], [-x+1/2,y+1/2,-z+1/2], [x,-y+1/2,-z+1/2], [-x,-y,-z], [x+1/2,y,-z], [x+1/2,-y+1/2,z+1/2], [-x,y+1/2,z+1/2]],
-    },
-        	53: {
-            '2a': [[0,0,0], [1/2,0,1/2]],
-            '2b': [[1/2,0,0], [0,0,1/2]],
-            '2c': [[1/2,1/2,0], [0,1/2,1/2]],
-            '2d': [[0,1/2,0], [1/2,1/2,1/2]],
-            '4e': [[x,0,0], [-x+1/2,0,1/2], [-x,0,0], [x+1/2,0,1/2]],
-            '4f': [[x,1/2,0], [-x+1/2,1/2,1/2], [-x,1/2,0], [x+1/2,1/2,1/2]],
-            '4g': [[1/4,y,1/4], [1/4,-y,3/4], [3/4,-y,3/4], [3/4,y,1/4]],
-            '4h': [[0,y,z], [1/2,-y,z+1/2], [1/2,y,-z+1/2], [0,-y,-z]],
-            '8i': [[x,y,z], [-x+1/2,-y,z+1/2], [-x+1/2,y,-z+1/2], [x,-y,-z], [-x,-y,-z], [x+1/2,y,-z+1/2], [x+1/2,-y,z+1/2], [-x,y,z]],
-    },
-        	54: {
-            '4a': [[0,0,0], [1/2,0,0], [0,0,1/2], [1/2,0,1/2]],
-            '4b': [[0,1/2,0], [1/2,1/2,0], [0,1/2,1/2], [1/2,1/2,1/2]],
-            '4c': [[0,y,1/4], [1/2,-y,1/4], [0,-y,3/4], [1/2,y,3/4]],
-            '4d': [[1/4,0,z], [3/4,0,-z+1/2], [3/4,0,-z], [1/4,0,z+1/2]],
-            '4e': [[1/4,1/2,z], [3/4,1/2,-z+1/2], [3/4,1/2,-z], [1/4,1/2,z+1/2]],
-            '8f': [[x,y,z], [-x+1/2,-y,z], [-x,y,-z+1/2], [x+1/2,-y,-z+1/2], [-x,-y,-z], [x+1/2,y,-z], [x,-y,z+1/2], [-x+1/2,y,z+1/2]],
-    },
-        	55: {
-            '2a': [[0,0,0], [1/2,1/2,0]],
-            '2b': [[0,0,1/2], [1/2,1/2,1/2]],
-            '2c': [[0,1/2,0], [1/2,0,0]],
-            '2d': [[0,1/2,1/2], [1/2,0,1/2]],
-            '4e': [[0,0,z], [1/2,1/2,-z], [0,0,-z], [1/2,1/2,z]],
-            '4f': [[0,1/2,z], [1/2,0,-z], [0,1/2,-z], [1/2,0,z]],
-            '4g': [[x,y,0], [-x,-y,0], [-x+1/2,y+1/2,0], [x+1/2,-y+1/2,0]],
-            '4h': [[x,y,1/2], [-x,-y,1/2], [-x+1/2,y+1/2,1/2], [x+1/2,-y+1/2,1/2]],
-            '8i': [[x,y,z], [-x,-y,z], [-x+1/2,y+1/2,-z], [x+1/2,-y+1/2,-z], [-x,-y,-z], [x,y,-z], [x+1/2,-y+1/2,z], [-x+1/2,y+1/2,z]],
-    },
-        	56: {
-            '4a': [[0,0,0], [1/2,1/2,0], [0,1/2,1/2], [1/2,0,1/2]],
-            '4b': [[0,0,1/2], [1/2,1/2,1/2], [0,1/2,0], [1/2,0,0]],
-            '4c': [[1/4,1/4,z], [3/4,3/4,-z+1/2], [3/4,3/4,-z], [1/4,1/4,z+1/2]],
-            '4d': [[1/4,3/4,z], [3/4,1/4,-z+1/2], [3/4,1/4,-z], [1/4,3/4,z+1/2]],
-            '8e': [[x,y,z], [-x+1/2,-y+1/2,z], [-x,y+1/2,-z+1/2], [x+1/2,-y,-z+1/2], [-x,-y,-z], [x+1/2,y+1/2,-z], [x,-y+1/2,z+1/2], [-x+1/2,y,z+1/2]],
-    },
-        	57: {
-            '4a': [[0,0,0], [0,0,1/2], [0,1/2,1/2], [0,1/2,0]],
-            '4b': [[1/2,0,0], [1/2,0,1/2], [1/2,1/2,1/2], [1/2,1/2,0]],
-            '4c': [[x,1/4,0], [-x,3/4,1/2], [-x,3/4,0], [x,1/4,1/2]],
-            '4d': [[x,y,1/4], [-x,-y,3/4], [-x,y+1/2,1/4], [x,-y+1/2,3/4]],
-            '8e': [[x,y,z], [-x,-y,z+1/2], [-x,y+1/2,-z+1/2], [x,-y+1/2,-z], [-x,-y,-z], [x,y,-z+1/2], [x,-y+1/2,z+1/2], [-x,y+1/2,z]],
-    },
-        	58: {
-            '2a': [[0,0,0], [1/2,1/2,1/2]],
-            '2b': [[0,0,1/2], [1/2,1/2,0]],
-            '2c': [[0,1/2,0], [1/2,0,1/2]],
-            '2d': [[0,1/2,1/2], [1/2,0,0]],
-            '4e': [[0,0,z], [1/2,1/2,-z+1/2], [0,0,-z], [1/2,1/2,z+1/2]],
-            '4f': [[0,1/2,z], [1/2,0,-z+1/2], [0,1/2,-z], [1/2,0,z+1/2]],
-            '4g': [[x,y,0], [-x,-y,0], [-x+1/2,y+1/2,1/2], [x+1/2,-y+1/2,1/2]],
-            '8h': [[x,y,z], [-x,-y,z], [-x+1/2,y+1/2,-z+1/2], [x+1/2,-y+1/2,-z+1/2], [-x,-y,-z], [x,y,-z], [x+1/2,-y+1/2,z+1/2], [-x+1/2,y+1/2,z+1/2]],
-    },
-        	59: {
-            '2a': [[1/4,1/4,z], [3/4,3/4,-z]],
-            '2b': [[1/4,3/4,z], [3/4,1/4,-z]],
-            '4c': [[0,0,0], [1/2,1/2,0], [0,1/2,0], [1/2,0,0]],
-            '4d': [[0,0,1/2], [1/2,1/2,1/2], [0,1/2,1/2], [1/2,0,1/2]],
-            '4e': [[1/4,y,z], [1/4,-y+1/2,z], [3/4,y+1/2,-z], [3/4,-y,-z]],
-            '4f': [[x,1/4,z], [-x+1/2,1/4,z], [-x,3/4,-z], [x+1/2,3/4,-z]],
-            '8g': [[x,y,z], [-x+1/2,-y+1/2,z], [-x,y+1/2,-z], [x+1/2,-y,-z], [-x,-y,-z], [x+1/2,y+1/2,-z], [x,-y+1/2,z], [-x+1/2,y,z]],
-    },
-        	60: {
-            '4a': [[0,0,0], [1/2,1/2,1/2], [0,0,1/2], [1/2,1/2,0]],
-            '4b': [[0,1/2,0], [1/2,0,1/2], [0,1/2,1/2], [1/2,0,0]],
-            '4c': [[0,y,1/4], [1/2,-y+1/2,3/4], [0,-y,3/4], [1/2,y+1/2,1/4]],
-            '8d': [[x,y,z], [-x+1/2,-y+1/2,z+1/2], [-x,y,-z+1/2], [x+1/2,-y+1/2,-z], [-x,-y,-z], [x+1/2,y+1/2,-z+1/2], [x,-y,z+1/2], [-x+1/2,y+1/2,z]],
-    },
-        	61: {
-            '4a': [[0,0,0], [1/2,0,1/2], [0,1/2,1/2], [1/2,1/2,0]],
-            '4b': [[0,0,1/2], [1/2,0,0], [0,1/2,0], [1/2,1/2,1/2]],
-            '8c': [[x,y,z], [-x+1/2,-y,z+1/2], [-x,y+1/2,-z+1/2], [x+1/2,-y+1/2,-z], [-x,-y,-z], [x+1/2,y,-z+1/2], [x,-y+1/2,z+1/2], [-x+1/2,y+1/2,z]],
-    },
-        	62: {
-            '4a': [[0,0,0], [1/2,0,1/2], [0,1/2,0], [1/2,1/2,1/2]],
-            '4b': [[0,0,1/2], [1/2,0,0], [0,1/2,1/2], [1/2,1/2,0]],
-            '4c': [[x,1/4,z], [-x+1/2,3/4,z+1/2], [-x,3/4,-z], [x+1/2,1/4,-z+1/2]],
-            '8d': [[x,y,z], [-x+1/2,-y,z+1/2], [-x,y+1/2,-z], [x+1/2,-y+1/2,-z+1/2], [-x,-y,-z], [x+1/2,y,-z+1/2], [x,-y+1/2,z], [-x+1/2,y+1/2,z+1/2]],
-    },
-        	63: {
-            '4a': [[0,0,0], [0,0,1/2]],
-            '4b': [[0,1/2,0], [0,1/2,1/2]],
-            '4c': [[0,y,1/4], [0,-y,3/4]],
-            '8d': [[1/4,1/4,0], [3/4,3/4,1/2], [3/4,1/4,1/2], [1/4,3/4,0]],
-            '8e': [[x,0,0], [-x,0,1/2], [-x,0,0], [x,0,1/2]],
-            '8f': [[0,y,z], [0,-y,z+1/2], [0,y,-z+1/2], [0,-y,-z]],
-            '8g': [[x,y,1/4], [-x,-y,3/4], [-x,y,1/4], [x,-y,3/4]],
-            '16h': [[x,y,z], [-x,-y,z+1/2], [-x,y,-z+1/2], [x,-y,-z], [-x,-y,-z], [x,y,-z+1/2], [x,-y,z+1/2], [-x,y,z]],
-            'translation': [[1/2,1/2,0, 0,0,0]],
-    },
-        	64: {
-            '4a': [[0,0,0], [0,1/2,1/2]],
-            '4b': [[1/2,0,0], [1/2,1/2,1/2]],
-            '8c': [[1/4,1/4,0], [3/4,1/4,1/2], [3/4,3/4,1/2], [1/4,3/4,0]],
-            '8d': [[x,0,0], [-x,1/2,1/2], [-x,0,0], [x,1/2,1/2]],
-            '8e': [[1/4,y,1/4], [3/4,-y+1/2,3/4], [3/4,-y,3/4], [1/4,y+1/2,1/4]],
-            '8f': [[0,y,z], [0,-y+1/2,z+1/2], [0,y+1/2,-z+1/2], [0,-y,-z]],
-            '16g': [[x,y,z], [-x,-y+1/2,z+1/2], [-x,y+1/2,-z+1/2], [x,-y,-z], [-x,-y,-z], [x,y+1/2,-z+1/2], [x,-y+1/2,z+1/2], [-x,y,z]],
-            'translation': [[1/2,1/2,0, 0,0,0]],
-    },
-        	65: {
-            '2a': [[0,0,0]],
-            '2b': [[1/2,0,0]],
-            '2c': [[1/2,0,1/2]],
-            '2d': [[0,0,1/2]],
-            '4e': [[1/4,1/4,0], [3/4,1/4,0]],
-            '4f': [[1/4,1/4,1/2], [3/4,1/4,1/2]],
-            '4g': [[x,0,0], [-x,0,0]],
-            '4h': [[x,0,1/2], [-x,0,1/2]],
-            '4i': [[0,y,0], [0,-y,0]],
-            '4j': [[0,y,1/2], [0,-y,1/2]],
-            '4k': [[0,0,z], [0,0,-z]],
-            '4l': [[0,1/2,z], [0,1/2,-z]],
-            '8m': [[1/4,1/4,z], [3/4,1/4,-z], [3/4,3/4,-z], [1/4,3/4,z]],
-            '8n': [[0,y,z], [0,-y,z], [0,y,-z], [0,-y,-z]],
-            '8o': [[x,0,z], [-x,0,z], [-x,0,-z], [x,0,-z]],
-            '8p': [[x,y,0], [-x,-y,0], [-x,y,0], [x,-y,0]],
-            '8q': [[x,y,1/2], [-x,-y,1/2], [-x,y,1/2], [x,-y,1/2]],
-            '16r': [[x,y,z], [-x,-y,z], [-x,y,-z], [x,-y,-z], [-x,-y,-z], [x,y,-z], [x,-y,z], [-x,y,z]],
-            'translation': [[1/2,1/2,0, 0,0,0]],
-    },
-}
-	for pos in wyckoff[space_group][letter]:
-		unit_cell.append([atom, *pos])
-	return unit_cell
-#--------------------------------------------------------------------------------------------------
\ No newline at end of file
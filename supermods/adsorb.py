@@ -0,0 +1,62 @@
+"""Batch placement of adsorbates on selected atoms of a cell"""
+
+from collections import namedtuple
+import numpy as np
+
+Placed = namedtuple('Placed', ['rows', 'ids', 'marked'])
+
+def site_keys(species, coords, decimals=5):
+    """ Hashable (atom, x, y, z) keys of rounded positions """
+    return zip(species, *np.round(np.reshape(coords, (-1, 3)), decimals).T.tolist())
+
+def midpoint(coords, axis):
+    """ Middle of the occupied range of coords along axis, (min+max)/2; 0 when there are none """
+    along = np.reshape(coords, (-1, 3))[:, axis]
+    return (along.min() + along.max())/2 if len(along) else 0.0
+
+class Placement:
+    """ Places adsorbates on atoms of cell given by stable id. Occupied sites are a set of rounded
+    (atom, x, y, z) keys, inversion partners come from the partner table of symmetry.find_inversion()
+    and new atoms are numbered from a running id counter, so a batch is linear in the cell size plus
+    the number of adsorbates. next_id should come from the AtomStore holding cell, so that ids of
+    deleted atoms are not reused; it defaults to one above the highest id in cell
+    """
+    def __init__(self, cell, axis, inversion=None, decimals=5, next_id=None):
+        self.cell = cell
+        self.axis = axis
+        self.partners = None if inversion is None else inversion.partners
+        self.decimals = decimals
+        self.occupied = set(site_keys(cell.species.tolist(), cell.coords, decimals))
+        self.next_id = cell.next_id() if next_id is None else int(next_id)
+        # Wrapped cells lie in [0,1), so the outward side is taken from the slab's middle
+        self.middle = midpoint(cell.coords, axis)
+#--------------------------------------------------------------------------------------------------
+    def place(self, ids, adsorbate, step):
+        """ Adsorbate atoms step (a reduced vector) away from the atoms with the given ids, outwards
+        on the side of each atom along axis (below or above the middle of the slab), plus the inversion image through each atom's partner.
+        Sites already occupied are skipped. Returns the new [atom, x, y, z] rows, their ids and the
+        ids of the anchor and partner atoms, in placement order (partner image before the adsorbate)
+        """
+        at = self.cell.index_of(ids)
+        xyz = self.cell.coords[at]
+        sign = np.where(xyz[:, self.axis] < self.middle, -1.0, 1.0)
+        shift = sign[:, None]*np.asarray(step, dtype=float)
+        sites = np.round(xyz + shift, self.decimals)
+        marked = self.cell.ids[at]
+        if self.partners is not None and len(at):
+            partner = self.partners[at]
+            has = partner >= 0
+            images = np.round(self.cell.coords[np.maximum(partner, 0)] - shift, self.decimals)
+            # Interleave so each partner image comes just before its adsorbate
+            sites = np.stack([images, sites], axis=1).reshape(-1, 3)
+            valid = np.stack([has, np.ones(len(at), dtype=bool)], axis=1).reshape(-1)
+            sites = sites[valid]
+            marked = np.concatenate([marked, self.cell.ids[partner[has]]])
+        rows = []
+        for key in site_keys([adsorbate]*len(sites), sites, self.decimals):
+            if key not in self.occupied:
+                self.occupied.add(key)
+                rows.append(list(key))
+        new = np.arange(self.next_id, self.next_id + len(rows), dtype=np.int32)
+        self.next_id += len(rows)
+        return Placed(rows, new, marked)
@@ -0,0 +1,147 @@
+"""Indexed, editable atom store with change notifications"""
+
+import numpy as np
+from supermods.cell import Cell
+
+class AtomStore:
+    """ Atoms kept in growable code, coordinate and id arrays with a dict from stable id to slot and
+    id sets per species and per layer (coordinate along layer_axis rounded to tol). Insert, delete
+    and lookup by id are O(1) per atom; deleted slots are dropped when they outnumber live ones.
+    Listeners registered with subscribe() are called as listener(event, ids) for the events
+    'reset', 'insert', 'delete' and 'mark'. cell is a Cell of the live atoms in slot order
+    """
+    def __init__(self, cell=None, layer_axis=2, tol=1e-3):
+        self.listeners = []
+        self.tol = tol
+        self.reset(Cell.empty() if cell is None else cell, layer_axis)
+#--------------------------------------------------------------------------------------------------
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+    def _notify(self, event, ids):
+        for listener in self.listeners:
+            listener(event, ids)
+    def _layer(self, coords):
+        return np.rint(np.asarray(coords)[..., self.layer_axis] / self.tol).astype(np.int64)
+    def _grow(self, n):
+        if self.size + n <= len(self.codes):
+            return
+        capacity = max(2*len(self.codes), self.size + n, 16)
+        self.codes = np.resize(self.codes, capacity)
+        self.coords = np.resize(self.coords, (capacity, 3))
+        self.ids = np.resize(self.ids, capacity)
+        self.alive = np.resize(self.alive, capacity)
+        self.alive[self.size:] = False
+#--------------------------------------------------------------------------------------------------
+    def reset(self, cell, layer_axis=None):
+        """ Replaces the contents with cell, keeping its stable ids """
+        if layer_axis is not None:
+            self.layer_axis = layer_axis
+        self.symbols = list(cell.symbols)
+        self.codes = cell.codes.copy()
+        self.coords = cell.coords.copy()
+        self.ids = cell.ids.copy()
+        self.alive = np.ones(len(cell), dtype=bool)
+        self.size = len(cell)
+        self.slot = dict(zip(self.ids.tolist(), range(self.size)))
+        self.next_id = cell.next_id()
+        self.added, self.marked = set(), set()
+        self._index()
+        self._cell = None
+        self._notify('reset', self.ids.tolist())
+    def _index(self):
+        live = np.flatnonzero(self.alive[:self.size])
+        self.species, self.layers = {}, {}
+        for idx, code, layer in zip(self.ids[live].tolist(), self.codes[live].tolist(), self._layer(self.coords[live]).tolist()):
+            self.species.setdefault(code, set()).add(idx)
+            self.layers.setdefault(layer, set()).add(idx)
+    def set_layer_axis(self, axis):
+        """ Re-indexes the layers along axis (0: x, 1: y, 2: z) if it changed """
+        if axis != self.layer_axis:
+            self.layer_axis = axis
+            self._index()
+#--------------------------------------------------------------------------------------------------
+    def insert(self, rows, ids=None, added=True):
+        """ Appends [atom, x, y, z] rows with fresh ids (or the given ones). added marks them as
+        user edits rather than atoms of the constructed cell. Returns the ids
+        """
+        if len(rows) == 0:
+            return []
+        ids = list(range(self.next_id, self.next_id + len(rows))) if ids is None else [int(i) for i in ids]
+        self._grow(len(rows))
+        start, stop = self.size, self.size + len(rows)
+        for s in {row[0] for row in rows} - set(self.symbols):
+            self.symbols.append(s)
+        self.codes[start:stop] = [self.symbols.index(row[0]) for row in rows]
+        self.coords[start:stop] = [row[1:4] for row in rows]
+        self.ids[start:stop] = ids
+        self.alive[start:stop] = True
+        self.size = stop
+        self.next_id = max(self.next_id, max(ids) + 1)
+        for slot, idx in enumerate(ids, start):
+            self.slot[idx] = slot
+            self.species.setdefault(int(self.codes[slot]), set()).add(idx)
+            self.layers.setdefault(int(self._layer(self.coords[slot])), set()).add(idx)
+        if added:
+            self.added.update(ids)
+        self._notify('insert', ids)
+        return ids
+    def delete(self, ids):
+        """ Removes the atoms with the given ids, ignoring unknown ones. Returns the removed ids """
+        removed = []
+        for idx in ids:
+            slot = self.slot.pop(int(idx), None)
+            if slot is None:
+                continue
+            self.alive[slot] = False
+            self.species[int(self.codes[slot])].discard(int(idx))
+            self.layers[int(self._layer(self.coords[slot]))].discard(int(idx))
+            self.added.discard(int(idx))
+            self.marked.discard(int(idx))
+            removed.append(int(idx))
+        if removed:
+            self._cell = None
+            if 2*len(self.slot) < self.size:
+                self._compact()
+            self._notify('delete', removed)
+        return removed
+    def _compact(self):
+        live = np.flatnonzero(self.alive[:self.size])
+        self.codes, self.coords, self.ids = self.codes[live], self.coords[live], self.ids[live]
+        self.alive = np.ones(len(live), dtype=bool)
+        self.size = len(live)
+        self.slot = dict(zip(self.ids.tolist(), range(self.size)))
+    def mark(self, ids):
+        """ Flags atoms (e.g. adsorption sites) for the view """
+        ids = [int(i) for i in ids if int(i) in self.slot]
+        self.marked.update(ids)
+        self._notify('mark', ids)
+#--------------------------------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.slot)
+    def __contains__(self, idx):
+        return idx in self.slot
+    def get(self, idx):
+        """ (atom, x, y, z) of the atom with stable id idx """
+        slot = self.slot[idx]
+        return (self.symbols[self.codes[slot]], *self.coords[slot].tolist())
+    def by_species(self, symbol):
+        return set(self.species.get(self.symbols.index(symbol), ())) if symbol in self.symbols else set()
+    def by_layer(self, value):
+        """ Ids of the atoms in the layer at coordinate value along layer_axis """
+        return set(self.layers.get(int(np.rint(value / self.tol)), ()))
+    @property
+    def cell(self):
+        """ Cell of the live atoms. Without deletions it is a view of the store arrays, and a cell
+        built before a batch of inserts passes its cached neighbour lists on
+        """
+        if self._cell is not None and len(self._cell) == len(self.slot):
+            return self._cell
+        if len(self.slot) == self.size:
+            cell = Cell(self.codes[:self.size], self.coords[:self.size], self.symbols, None, self.ids[:self.size])
+        else:
+            live = np.flatnonzero(self.alive[:self.size])
+            cell = Cell(self.codes[live], self.coords[live], self.symbols, None, self.ids[live])
+        if self._cell is not None:
+            cell._lists = {key: found.extend(cell.coords[len(self._cell):]) for key, found in self._cell._lists.items()}
+        self._cell = cell
+        return cell
@@ -0,0 +1,99 @@
+"""Batch enumeration of supercells over grids of dimensions and origin shifts"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, product
+import numpy as np
+import supermods.supercell as sc
+import supermods.output as printer
+
+Result = namedtuple('Result', ['name', 'space_group', 'dims', 'shifts', 'n_atoms', 'net_charge', 'path'])
+
+table_header = '#{:>5}  {:2}  {:>12}  {:>12}  {:>12}\n'.format('N', 'At', 'X', 'Y', 'Z')
+table_row = '%6d  %-2s  %12.9f  %12.9f  %12.9f\n'
+
+def grid(values):
+    """ Accepts a single value, a list of values or a (start, stop, step) range dict for one axis """
+    if isinstance(values, dict):
+        start, stop, step = (float(values[k]) for k in ('start', 'stop', 'step'))
+        return np.round(np.arange(start, stop + step/2, step), 7).tolist()
+    if isinstance(values, (list, tuple, range)):
+        return list(values)
+    return [values]
+
+def combinations(dims, shifts):
+    """ Every (dims, shifts) pair from per-axis dimension and shift grids. Dimensions vary fastest
+    so jobs sharing shifts can extend the same cell
+    """
+    dims = list(product(*(map(int, grid(d)) for d in dims)))
+    shifts = list(product(*(map(float, grid(s)) for s in shifts)))
+    return [(d, s) for s in shifts for d in dims]
+
+def file_name(name, space_group, dims, shifts):
+    return '{}_{}_{}x{}x{}_{:g}_{:g}_{:g}.dat'.format(name, space_group, *dims, *shifts)
+
+def write_table(path, cell, header):
+    """ Writes the layered cell as a numbered table below the header lines """
+    with open(path, 'w') as out:
+        out.writelines('# %s\n' %line for line in header)
+        out.write(table_header)
+        printer.emit(printer.format_rows(table_row, [np.arange(1, len(cell)+1), cell.species, *cell.coords.T]), out)
+
+def _run(job):
+    """ Worker: builds the layered cells of one shift setting, extending the previous cell when the
+    dimensions change along a single axis, and writes one table per cell
+    """
+    structure, primitive, shifts, dims_list, sort_keys, charges, out_dir, wrap = job
+    results, layered, previous = [], None, None
+    for dims in dims_list:
+        changed = [a for a in range(3) if previous is not None and dims[a] != previous[a]]
+        if layered is not None and len(changed) == 1:
+            layered = sc.resize_layered(layered, primitive, previous, changed[0], dims[changed[0]],
+                shifts, sort_keys, wrap=wrap)
+        else:
+            bulk = sc.construct_cell(primitive, dims, shifts, wrap=wrap)
+            layered = sc.layer_cell(bulk, sort_keys)
+        previous = dims
+        net_charge = layered.net_charge(charges)
+        path = os.path.join(out_dir, file_name(*structure, dims, shifts))
+        header = ['{} #{} {} x {} x {} supercell'.format(*structure, *dims),
+            'Origin shifts: {:g} {:g} {:g}'.format(*shifts),
+            'Atoms: {}'.format(len(layered)),
+            'Net charge: {}'.format('n/a' if net_charge is None else net_charge)]
+        write_table(path, layered, header)
+        results.append(Result(*structure, dims, shifts, len(layered), net_charge, path))
+    return results
+
+def enumerate_supercells(structure, primitive, dims, shifts, sort_keys, charges, out_dir,
+        tol=1e-3, wrap=True, processes=None):
+    """ Builds every combination of the dims and shifts grids (see combinations()) of the primitive Cell
+    in a process pool and writes the layer table of each to out_dir. structure is (name, space group).
+    Jobs are runs of dimensions with one shift setting, so each worker extends one cell through its run.
+    Returns a Result per combination, in combination order, and writes them to summary.tsv.
+    With wrap, duplicate sites within tol are merged in the primitive cell, where tol is in its
+    own reduced units
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if wrap:
+        primitive = sc.canonicalize(primitive, tol)[0]
+    todo = combinations(dims, shifts)
+    # Contiguous runs of dimensions, about two per worker so that a single shift setting still spreads out
+    size = max(1, -(-len(todo) // (2*(processes or os.cpu_count() or 1))))
+    jobs = []
+    for s, group in groupby(todo, key=lambda c: c[1]):
+        group = [d for d, _ in group]
+        jobs += [(structure, primitive, s, group[i:i+size], sort_keys, charges, out_dir, wrap)
+            for i in range(0, len(group), size)]
+    if processes == 1 or len(jobs) == 1:
+        batches = map(_run, jobs)
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            batches = list(pool.map(_run, jobs))
+    results = [r for batch in batches for r in batch]
+    with open(os.path.join(out_dir, 'summary.tsv'), 'w') as out:
+        out.write('name\tspace_group\tX\tY\tZ\tx_shift\ty_shift\tz_shift\tn_atoms\tnet_charge\tfile\n')
+        for r in results:
+            out.write('\t'.join(map(str, [r.name, r.space_group, *r.dims, *r.shifts, r.n_atoms,
+                'n/a' if r.net_charge is None else r.net_charge, os.path.basename(r.path)])) + '\n')
+    return results
@@ -0,0 +1,61 @@
+"""Bounded LRU cache of constructed and layered cells"""
+
+from collections import OrderedDict
+
+class CellCache:
+    """ Least-recently-used store of Cells bounded by a number of entries and a memory budget in bytes.
+    Cached arrays are made read-only, so a cell handed out twice cannot be edited through either copy
+    (Cell.delete, append and concat already return new cells)
+    """
+    def __init__(self, max_items=32, max_bytes=64*2**20):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cells = OrderedDict()
+#--------------------------------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._cells)
+    def __contains__(self, key):
+        return key in self._cells
+    def get(self, key):
+        """ Cached cell for key, None on a miss """
+        cell = self._cells.get(key)
+        if cell is None:
+            self.misses += 1
+            return None
+        self._cells.move_to_end(key)
+        self.hits += 1
+        return cell
+    def put(self, key, cell):
+        """ Stores cell under key and evicts the least recently used cells until both budgets hold.
+        A cell larger than the whole memory budget is not stored
+        """
+        self.discard(key)
+        size = cell.codes.nbytes + cell.coords.nbytes + cell.ids.nbytes
+        if size > self.max_bytes:
+            return cell
+        for array in (cell.codes, cell.coords, cell.ids):
+            array.flags.writeable = False
+        self._cells[key] = cell
+        self.nbytes += size
+        while len(self._cells) > self.max_items or self.nbytes > self.max_bytes:
+            self.nbytes -= self._cells.popitem(last=False)[1].nbytes
+        return cell
+    def items(self):
+        """ (key, cell) pairs from the most to the least recently used, without touching the order """
+        return list(reversed(self._cells.items()))
+    def fetch(self, key, build):
+        """ Cached cell for key, calling build() and storing the result on a miss """
+        cell = self.get(key)
+        if cell is None:
+            cell = self.put(key, build())
+        return cell
+    def discard(self, key):
+        cell = self._cells.pop(key, None)
+        if cell is not None:
+            self.nbytes -= cell.nbytes
+    def clear(self):
+        self._cells.clear()
+        self.nbytes = 0
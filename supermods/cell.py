@@ -0,0 +1,144 @@
+"""Compact array-backed cell shared by every stage of the supercell pipeline"""
+
+import numpy as np
+
+class Cell:
+    """ Atoms stored as an int16 species-code array, a float64 (N,3) array of reduced
+    coordinates and an int32 array of stable atom ids (about 30 bytes per atom).
+    symbols maps codes to atomic symbols; lattice holds optional lattice metadata.
+    Integer indexing returns an (atom, x, y, z) tuple, slicing returns a view
+    """
+    __slots__ = ('codes', 'coords', 'symbols', 'lattice', '_ids', '_lists', '__weakref__')
+
+    def __init__(self, codes, coords, symbols, lattice=None, ids=None):
+        self.codes = np.asarray(codes, dtype=np.int16).reshape(-1)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.symbols = list(symbols)
+        self.lattice = lattice
+        self._ids = None if ids is None else np.asarray(ids, dtype=np.int32).reshape(-1)
+        self._lists = {}
+#--------------------------------------------------------------------------------------------------
+    @classmethod
+    def from_arrays(cls, species, coords, lattice=None, ids=None):
+        """ Builds a cell from an array of atomic symbols and an (N,3) coordinate array """
+        symbols, codes = np.unique(np.asarray(species, dtype=str), return_inverse=True)
+        return cls(codes, coords, symbols.tolist(), lattice, ids)
+    @classmethod
+    def from_rows(cls, rows, lattice=None):
+        """ Builds a cell from [atom, x, y, z] lists or tuples """
+        if isinstance(rows, Cell):
+            return rows
+        if len(rows) == 0:
+            return cls([], np.empty((0, 3)), [], lattice)
+        return cls.from_arrays([row[0] for row in rows], [row[1:4] for row in rows], lattice)
+    @classmethod
+    def empty(cls, symbols=(), lattice=None):
+        return cls([], np.empty((0, 3)), symbols, lattice)
+#--------------------------------------------------------------------------------------------------
+    @property
+    def ids(self):
+        """ Stable atom ids. Created on first use as 0..N-1 and carried through views and edits """
+        if self._ids is None:
+            self._ids = np.arange(len(self.codes), dtype=np.int32)
+        return self._ids
+    @property
+    def species(self):
+        """ Array of atomic symbols, one per atom """
+        return np.asarray(self.symbols, dtype=str)[self.codes] if self.symbols else np.array([], dtype=str)
+    @property
+    def nbytes(self):
+        ids = 0 if self._ids is None else self._ids.nbytes
+        return self.codes.nbytes + self.coords.nbytes + ids
+    def __len__(self):
+        return len(self.codes)
+    def __iter__(self):
+        return iter(self.rows())
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return (self.symbols[self.codes[key]], *self.coords[key].tolist())
+        return self.take(key)
+    def __contains__(self, row):
+        return bool(self.find(row).size)
+    def __repr__(self):
+        return 'Cell(%d atoms, species=%s)' %(len(self), self.symbols)
+#--------------------------------------------------------------------------------------------------
+    def code(self, symbol):
+        """ Species code for symbol, extending the symbol table if needed """
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+        return self.symbols.index(symbol)
+    def take(self, key):
+        """ Cell of the atoms selected by a slice (a view), index array or boolean mask """
+        ids = None if self._ids is None else self._ids[key]
+        return Cell(self.codes[key], self.coords[key], self.symbols, self.lattice, ids)
+    def copy(self):
+        ids = None if self._ids is None else self._ids.copy()
+        return Cell(self.codes.copy(), self.coords.copy(), list(self.symbols), self.lattice, ids)
+    def rows(self):
+        """ (atom, x, y, z) tuples, only built at the output stage """
+        return list(zip(self.species.tolist(), *self.coords.T.tolist()))
+    def find(self, row, decimals=6):
+        """ Indices of atoms matching an [atom, x, y, z] row after rounding """
+        if row[0] not in self.symbols:
+            return np.empty(0, dtype=int)
+        hit = (self.codes == self.symbols.index(row[0])) & np.all(
+            np.round(self.coords, decimals) == np.round(np.asarray(row[1:4], dtype=float), decimals), axis=1)
+        return np.flatnonzero(hit)
+    def net_charge(self, charges):
+        """ Sum of the atomic charges from cells.yaml over the cell, None if a species has no charge """
+        counts = np.bincount(self.codes, minlength=len(self.symbols))
+        present = [(s, int(n)) for s, n in zip(self.symbols, counts) if n]
+        if any(charges.get(s) is None for s, n in present):
+            return None
+        return sum(charges[s]*n for s, n in present)
+    def index_of(self, ids):
+        """ Positions of the atoms with the given stable ids, in the order given. Unknown ids are skipped """
+        ids = np.asarray(ids, dtype=np.int32).reshape(-1)
+        if not len(self) or not len(ids):
+            return np.empty(0, dtype=int)
+        sorter = np.argsort(self.ids, kind='stable')
+        found = sorter[np.minimum(np.searchsorted(self.ids, ids, sorter=sorter), len(self)-1)]
+        return found[self.ids[found] == ids]
+    def next_id(self):
+        return int(self.ids.max())+1 if len(self) else 0
+    def neighbours(self, lattice=None, cutoff=3.0, periodic=(True, True, True)):
+        """ Linked-cell neighbour list (neighbours.CellList) of the cell, cached on the cell so edits
+        that append atoms extend it instead of rebuilding. Uses self.lattice if lattice is not given.
+        Coordinates must not be changed in place once a list exists
+        """
+        from supermods.neighbours import CellList
+        lattice = self.lattice if lattice is None else lattice
+        key = (lattice.parameters, float(cutoff), tuple(bool(p) for p in periodic))
+        if key not in self._lists:
+            self._lists[key] = CellList(self.coords, lattice, cutoff, periodic)
+        return self._lists[key]
+#--------------------------------------------------------------------------------------------------
+    def delete(self, ids):
+        """ New cell without the atoms with the given stable ids, removed in one pass """
+        keep = ~np.isin(self.ids, np.asarray(ids, dtype=np.int32))
+        return self.take(keep)
+    def append(self, rows):
+        """ New cell with [atom, x, y, z] rows appended in one batch and given fresh ids """
+        if len(rows) == 0:
+            return self
+        return self.concat(Cell.from_rows(rows))
+    def concat(self, other, ids=None):
+        """ New cell with the atoms of other appended. Species codes of other are remapped onto
+        this symbol table and its atoms get fresh ids unless ids are given
+        """
+        symbols = list(self.symbols)
+        for s in other.symbols:
+            if s not in symbols:
+                symbols.append(s)
+        remap = np.array([symbols.index(s) for s in other.symbols], dtype=np.int16)
+        codes = np.concatenate([self.codes, remap[other.codes] if len(other) else other.codes])
+        coords = np.concatenate([self.coords, other.coords])
+        if ids is None:
+            ids = np.arange(self.next_id(), self.next_id()+len(other), dtype=np.int32)
+        joined = Cell(codes, coords, symbols, self.lattice, np.concatenate([self.ids, ids]))
+        joined._lists = {key: found.extend(other.coords) for key, found in self._lists.items()}
+        return joined
+
+def as_cell(cell):
+    """ Accepts a Cell or a list of [atom, x, y, z] rows """
+    return cell if isinstance(cell, Cell) else Cell.from_rows(cell)
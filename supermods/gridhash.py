@@ -0,0 +1,98 @@
+"""Spatial grid hashing of reduced coordinates for tolerance-aware matching"""
+
+import numpy as np
+
+def wrap(xyz, periodic=(True, True, True)):
+    """ Wraps reduced coordinates into [0,1) along the periodic axes """
+    xyz = np.array(xyz, dtype=float, copy=True).reshape(-1, 3)
+    axes = np.asarray(periodic, dtype=bool)
+    xyz[:, axes] -= np.floor(xyz[:, axes])
+    # Values a rounding error below 1 would otherwise stay on the far side of the boundary
+    xyz[:, axes] = np.where(xyz[:, axes] >= 1.0, 0.0, xyz[:, axes])
+    return xyz
+
+class GridHash:
+    """ Points bucketed on a grid with cells at least 2*tol wide. Lookups visit the at most 8 cells
+    overlapping the tol box around a query point, so matching is linear in the number of points apart from one sort
+    of the integer cell keys. Periodic axes wrap with period 1 and use minimum-image distances.
+    labels (e.g. species codes) must match for two points to match
+    """
+    def __init__(self, xyz, labels=None, tol=1e-3, periodic=(False, False, False)):
+        self.tol = float(tol)
+        self.periodic = np.asarray(periodic, dtype=bool)
+        self.xyz = wrap(xyz, self.periodic)
+        self.labels = np.zeros(len(self.xyz), dtype=int) if labels is None else np.asarray(labels)
+        # Cells are at least 2*tol wide so the points within tol of a query span at most 2 cells per axis
+        n = max(1, int(1/(2*self.tol)))
+        self.n_cells = np.where(self.periodic, n, 0)
+        self.size = np.where(self.periodic, 1/n, 2*self.tol)
+        cells = self._cells(self.xyz)
+        self.lo = np.where(self.periodic, 0, cells.min(axis=0) if len(cells) else 0)
+        self.span = np.where(self.periodic, self.n_cells, (cells.max(axis=0) if len(cells) else 0) - self.lo + 1)
+        keys, _ = self._keys(cells)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.offsets = np.indices((2, 2, 2)).reshape(3, -1).T
+#--------------------------------------------------------------------------------------------------
+    def _cells(self, xyz):
+        cells = np.floor(xyz / self.size).astype(np.int64)
+        return np.where(self.periodic, np.minimum(cells, np.maximum(self.n_cells-1, 0)), cells)
+    def _keys(self, cells):
+        keys = np.zeros(len(cells), dtype=np.int64)
+        valid = np.ones(len(cells), dtype=bool)
+        for a in range(3):
+            c = cells[:, a] % self.n_cells[a] if self.periodic[a] else cells[:, a] - self.lo[a]
+            if not self.periodic[a]:
+                valid &= (c >= 0) & (c < self.span[a])
+            keys = keys*self.span[a] + c
+        return keys, valid
+    def delta(self, a, b):
+        """ Minimum-image difference a - b """
+        d = a - b
+        d[:, self.periodic] -= np.round(d[:, self.periodic])
+        return d
+#--------------------------------------------------------------------------------------------------
+    def candidates(self, xyz, labels=None):
+        """ (query index, point index, distance) of every point within tol of the query points """
+        xyz = wrap(xyz, self.periodic)
+        first = np.floor((xyz - self.tol) / self.size).astype(np.int64)
+        last = np.floor((xyz + self.tol) / self.size).astype(np.int64)
+        q_idx, p_idx = [], []
+        for offset in self.offsets:
+            # A box that wraps around a periodic axis with a single cell would visit it twice
+            if np.any(self.periodic & (offset > 0) & (self.n_cells == 1)):
+                continue
+            cells = first + offset
+            keys, valid = self._keys(cells)
+            valid &= np.all(cells <= last, axis=1)
+            lo = np.searchsorted(self.keys, keys, 'left')
+            hi = np.searchsorted(self.keys, keys, 'right')
+            counts = np.where(valid, hi-lo, 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Expand the [lo, hi) runs into flat index arrays
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            q_idx.append(np.repeat(np.arange(len(xyz)), counts))
+            p_idx.append(self.order[starts + np.arange(total)])
+        if not q_idx:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+        q_idx, p_idx = np.concatenate(q_idx), np.concatenate(p_idx)
+        dist = np.linalg.norm(self.delta(xyz[q_idx], self.xyz[p_idx]), axis=1)
+        keep = dist <= self.tol
+        if labels is not None:
+            keep &= self.labels[p_idx] == np.asarray(labels)[q_idx]
+        return q_idx[keep], p_idx[keep], dist[keep]
+    def match(self, xyz, labels=None):
+        """ Index of the closest point within tol of every query point, -1 where there is none """
+        q_idx, p_idx, dist = self.candidates(xyz, labels)
+        found = np.full(len(np.reshape(xyz, (-1, 3))), -1, dtype=int)
+        order = np.lexsort([dist, q_idx])
+        queries, first = np.unique(q_idx[order], return_index=True)
+        found[queries] = p_idx[order][first]
+        return found
+    def pairs(self):
+        """ (i, j) pairs with i < j of points within tol of each other """
+        q_idx, p_idx, _ = self.candidates(self.xyz, self.labels)
+        keep = q_idx < p_idx
+        return np.unique(np.stack([q_idx[keep], p_idx[keep]], axis=1), axis=0)
@@ -0,0 +1,116 @@
+"""Lattice parameters, metric tensor and reduced/Cartesian conversion"""
+
+from itertools import product
+import numpy as np
+
+class Lattice:
+    """ Lattice from a, b, c (Angstrom) and alpha, beta, gamma (degrees). The Cartesian vectors follow
+    the usual convention (a along x, b in the xy plane) and are the rows of matrix, so whole cells
+    convert with one matrix multiply: cartesian = reduced @ matrix
+    """
+    __slots__ = ('parameters', '_matrix', '_inverse', '_metric')
+
+    def __init__(self, a, b, c, alpha=90.0, beta=90.0, gamma=90.0):
+        self.parameters = tuple(float(v) for v in (a, b, c, alpha, beta, gamma))
+        if min(self.parameters[:3]) <= 0:
+            raise ValueError('Lattice lengths must be positive')
+        self._matrix = self._inverse = self._metric = None
+#--------------------------------------------------------------------------------------------------
+    @classmethod
+    def from_entries(cls, lengths, angles=(90.0, 90.0, 90.0)):
+        """ Lattice from entry strings, angles that are not numbers default to 90. None if a length
+        is not a positive number or the angles do not form a cell
+        """
+        try:
+            lengths = [float(v) for v in lengths]
+        except ValueError:
+            return None
+        values = []
+        for v in angles:
+            try:
+                values.append(float(v))
+            except ValueError:
+                values.append(90.0)
+        try:
+            lattice = cls(*lengths, *values)
+            lattice.matrix
+        except ValueError:
+            return None
+        return lattice
+    @classmethod
+    def from_matrix(cls, matrix):
+        """ Lattice from Cartesian row vectors, keeping their orientation """
+        matrix = np.asarray(matrix, dtype=float).reshape(3, 3)
+        a, b, c = np.linalg.norm(matrix, axis=1)
+        angle = lambda u, w: np.degrees(np.arccos(np.dot(u, w) / np.linalg.norm(u) / np.linalg.norm(w)))
+        lattice = cls(a, b, c, angle(matrix[1], matrix[2]), angle(matrix[0], matrix[2]), angle(matrix[0], matrix[1]))
+        lattice._matrix = matrix
+        return lattice
+#--------------------------------------------------------------------------------------------------
+    @property
+    def matrix(self):
+        """ Cartesian lattice vectors as rows, built on first use """
+        if self._matrix is None:
+            a, b, c, alpha, beta, gamma = self.parameters
+            # Right angles are exact so orthogonal cells have exact zeros
+            ca, cb, cg = [0.0 if v == 90 else np.cos(np.radians(v)) for v in (alpha, beta, gamma)]
+            sg = 1.0 if gamma == 90 else np.sin(np.radians(gamma))
+            cz = 1 - ca**2 - cb**2 - cg**2 + 2*ca*cb*cg
+            if cz <= 0 or sg == 0:
+                raise ValueError('Lattice angles do not form a cell')
+            self._matrix = np.array([
+                [a, 0.0, 0.0],
+                [b*cg, b*sg, 0.0],
+                [c*cb, c*(ca - cb*cg)/sg, c*np.sqrt(cz)/sg]])
+        return self._matrix
+    @property
+    def inverse(self):
+        if self._inverse is None:
+            self._inverse = np.linalg.inv(self.matrix)
+        return self._inverse
+    @property
+    def metric(self):
+        """ Metric tensor G = M M^T, so that |r|^2 = x G x for reduced x """
+        if self._metric is None:
+            self._metric = self.matrix @ self.matrix.T
+        return self._metric
+    @property
+    def volume(self):
+        return float(abs(np.linalg.det(self.matrix)))
+    def __repr__(self):
+        return 'Lattice(%.4f, %.4f, %.4f, %.2f, %.2f, %.2f)' %self.parameters
+#--------------------------------------------------------------------------------------------------
+    def scaled(self, dims):
+        """ Lattice of an X x Y x Z supercell """
+        return Lattice.from_matrix(self.matrix * np.asarray(dims, dtype=float)[:, None])
+    def to_cartesian(self, xyz):
+        return np.asarray(xyz, dtype=float) @ self.matrix
+    def to_reduced(self, cart):
+        return np.asarray(cart, dtype=float) @ self.inverse
+    def normal(self, axis):
+        """ Unit Cartesian normal of the plane spanned by the two lattice vectors other than axis
+        (0: x, 1: y, 2: z), pointing to the same side as that vector
+        """
+        u, w = [self.matrix[i] for i in range(3) if i != axis]
+        n = np.cross(u, w)
+        n *= np.sign(np.dot(n, self.matrix[axis]))
+        return n / np.linalg.norm(n)
+    def displacement(self, axis, distance):
+        """ Reduced vector that moves an atom distance Angstrom along normal(axis) """
+        return self.to_reduced(self.normal(axis)*distance)
+    def distances(self, a, b, periodic=(True, True, True)):
+        """ Minimum-image Cartesian distances between reduced coordinates a and b (broadcast).
+        Differences are wrapped into [-1/2, 1/2) and the 27 neighbouring images are compared, which is
+        exact for skewed cells as well
+        """
+        d = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+        axes = np.asarray(periodic, dtype=bool)
+        d[..., axes] -= np.round(d[..., axes])
+        images = np.array([s for s in product([-1, 0, 1], repeat=3) if all(p or not i for p, i in zip(axes, s))])
+        cart = (d[..., None, :] + images) @ self.matrix
+        return np.sqrt(np.min(np.einsum('...ij,...ij->...i', cart, cart), axis=-1))
+    def neighbours(self, cell, xyz, periodic=(True, True, True)):
+        """ Index and distance of the closest atom of cell to every reduced position in xyz """
+        dist = self.distances(np.asarray(xyz, dtype=float).reshape(-1, 1, 3), cell.coords[None, :, :], periodic)
+        nearest = np.argmin(dist, axis=1)
+        return nearest, dist[np.arange(len(nearest)), nearest]
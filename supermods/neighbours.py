@@ -0,0 +1,132 @@
+"""Linked-cell neighbour search in Angstrom over periodic and slab cells"""
+
+from itertools import product
+import numpy as np
+from supermods.gridhash import wrap
+
+class CellList:
+    """ Atoms binned on a grid whose bins are at least cutoff wide perpendicular to their faces, so the
+    neighbours of a point within cutoff lie in the adjacent bins. Bins are filled with a counting sort
+    (linear in the number of atoms) and queries visit each stencil offset for all query points at once.
+    Periodic axes wrap with period 1, with the lattice image of every neighbour kept, so cells narrower
+    than cutoff still give each image within reach. Non-periodic (slab) axes are not wrapped
+    """
+    chunk = 8192
+
+    def __init__(self, xyz, lattice, cutoff, periodic=(True, True, True)):
+        if cutoff <= 0:
+            raise ValueError('Cutoff must be positive')
+        self.lattice = lattice
+        self.cutoff = float(cutoff)
+        self.periodic = np.asarray(periodic, dtype=bool)
+        self.xyz = wrap(xyz, self.periodic)
+        # Spacing of the lattice planes normal to each axis, from the reciprocal vectors
+        widths = 1/np.linalg.norm(lattice.inverse, axis=0)
+        n = np.maximum(1, np.floor(widths/self.cutoff)).astype(np.int64)
+        self.n_bins = np.where(self.periodic, n, 0)
+        self.size = np.where(self.periodic, 1/n, self.cutoff/widths)
+        self.reach = np.where(self.periodic, np.ceil(self.cutoff/(self.size*widths) - 1e-9), 1).astype(np.int64)
+        bins = self._bins(self.xyz)
+        self.lo = np.where(self.periodic, 0, bins.min(axis=0) if len(bins) else 0)
+        self.span = np.where(self.periodic, self.n_bins, (bins.max(axis=0) if len(bins) else 0) - self.lo + 1)
+        keys, _, _ = self._keys(bins)
+        counts = np.bincount(keys, minlength=int(np.prod(self.span)))
+        self.starts = np.concatenate([[0], np.cumsum(counts)])
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.stencil = np.array(list(product(*(range(-r, r+1) for r in self.reach))))
+#--------------------------------------------------------------------------------------------------
+    def _bins(self, xyz):
+        bins = np.floor(xyz / self.size).astype(np.int64)
+        return np.where(self.periodic, np.minimum(bins, np.maximum(self.n_bins-1, 0)), bins)
+    def _keys(self, bins):
+        """ Flat bin key, validity and lattice image of (possibly out of range) bins """
+        keys = np.zeros(len(bins), dtype=np.int64)
+        valid = np.ones(len(bins), dtype=bool)
+        image = np.zeros(bins.shape, dtype=np.int64)
+        for a in range(3):
+            if self.periodic[a]:
+                image[:, a], b = np.divmod(bins[:, a], self.n_bins[a])
+            else:
+                b = bins[:, a] - self.lo[a]
+                valid &= (b >= 0) & (b < self.span[a])
+            keys = keys*self.span[a] + np.clip(b, 0, self.span[a]-1)
+        return keys, valid, image
+    def extend(self, xyz):
+        """ New CellList with the points xyz appended after the current ones. Points inside the
+        current bins are merged into the sorted bins without re-binning the existing atoms
+        """
+        xyz = wrap(xyz, self.periodic)
+        keys, valid, _ = self._keys(self._bins(xyz))
+        if not valid.all():
+            return CellList(np.concatenate([self.xyz, xyz]), self.lattice, self.cutoff, self.periodic)
+        grown = object.__new__(CellList)
+        for name in ('lattice', 'cutoff', 'periodic', 'n_bins', 'size', 'reach', 'lo', 'span', 'stencil'):
+            setattr(grown, name, getattr(self, name))
+        grown.xyz = np.concatenate([self.xyz, xyz])
+        new = np.argsort(keys, kind='stable')
+        at = np.searchsorted(self.keys, keys[new], 'right')
+        grown.order = np.insert(self.order, at, new + len(self.xyz))
+        grown.keys = np.insert(self.keys, at, keys[new])
+        grown.starts = self.starts + np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=len(self.starts)-1))])
+        return grown
+#--------------------------------------------------------------------------------------------------
+    def within(self, xyz, r=None):
+        """ (query index, atom index, distance, image) of every atom within r (at most cutoff) of the
+        reduced query points. image is the lattice translation added to the atom
+        """
+        r = self.cutoff if r is None else min(float(r), self.cutoff)
+        xyz = wrap(xyz, self.periodic)
+        if len(xyz) > self.chunk:
+            # Blocks of query points keep the candidate arrays to a bounded size
+            parts = [self.within(xyz[i:i+self.chunk], r) for i in range(0, len(xyz), self.chunk)]
+            for i, part in zip(range(0, len(xyz), self.chunk), parts):
+                part[0][:] += i
+            return tuple(np.concatenate(a) for a in zip(*parts))
+        bins = self._bins(xyz)
+        q_idx, p_idx, images = [], [], []
+        for offset in self.stencil:
+            keys, valid, image = self._keys(bins + offset)
+            lo, hi = self.starts[keys], self.starts[keys+1]
+            counts = np.where(valid, hi-lo, 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Expand the [lo, hi) runs into flat index arrays
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            query = np.repeat(np.arange(len(xyz)), counts)
+            q_idx.append(query)
+            p_idx.append(self.order[starts + np.arange(total)])
+            images.append(image[query])
+        if not q_idx:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0), np.empty((0, 3), dtype=int)
+        q_idx, p_idx, images = np.concatenate(q_idx), np.concatenate(p_idx), np.concatenate(images)
+        cart = (self.xyz[p_idx] + images - xyz[q_idx]) @ self.lattice.matrix
+        dist = np.sqrt(np.einsum('ij,ij->i', cart, cart))
+        keep = dist <= r
+        return q_idx[keep], p_idx[keep], dist[keep], images[keep]
+    def pairs(self, r=None):
+        """ (i, j, distance) of atom pairs with i < j within r, once per lattice image """
+        q_idx, p_idx, dist, _ = self.within(self.xyz, r)
+        keep = q_idx < p_idx
+        return q_idx[keep], p_idx[keep], dist[keep]
+    def coordination(self, r=None):
+        """ Number of neighbours within r of every atom, not counting the atom itself """
+        q_idx, p_idx, dist, images = self.within(self.xyz, r)
+        own = (q_idx == p_idx) & ~images.any(axis=1)
+        return np.bincount(q_idx[~own], minlength=len(self.xyz))
+    def closest(self, xyz, exclude=None):
+        """ Index and distance of the closest atom within cutoff of every query point (-1 and inf
+        where there is none). exclude optionally gives an atom index to skip per query point
+        """
+        q_idx, p_idx, dist, _ = self.within(xyz)
+        if exclude is not None:
+            keep = p_idx != np.asarray(exclude)[q_idx]
+            q_idx, p_idx, dist = q_idx[keep], p_idx[keep], dist[keep]
+        n = len(np.reshape(xyz, (-1, 3)))
+        found, nearest = np.full(n, -1, dtype=int), np.full(n, np.inf)
+        order = np.lexsort([dist, q_idx])
+        queries, first = np.unique(q_idx[order], return_index=True)
+        found[queries] = p_idx[order][first]
+        nearest[queries] = dist[order][first]
+        return found, nearest
@@ -0,0 +1,47 @@
+"""Affine symmetry operators (integer rotation plus fractional translation) parsed from x, y, z
+expressions such as '-x, y+1/2, -z'
+"""
+
+import re
+from fractions import Fraction
+import numpy as np
+
+term = re.compile(r'([+-]?)(\d+(?:\.\d+)?(?:/\d+)?)?\*?([xyz])?')
+axes = {'x': 0, 'y': 1, 'z': 2}
+
+def parse(text):
+    """ Rotation (3,3) int array and translation (3,) float array of one operator, so that
+    image = rotation @ xyz + translation. Raises ValueError on a malformed expression
+    """
+    parts = text.lower().replace(' ', '').strip('\'"').split(',')
+    if len(parts) != 3:
+        raise ValueError('Expected three comma separated components in %r' %text)
+    rotation = np.zeros((3, 3), dtype=np.int64)
+    translation = [Fraction(0)]*3
+    for i, part in enumerate(parts):
+        at = 0
+        while at < len(part):
+            match = term.match(part, at)
+            if match is None or match.end() == at or not (match.group(2) or match.group(3)):
+                raise ValueError('Cannot parse %r in %r' %(part[at:], text))
+            sign = -1 if match.group(1) == '-' else 1
+            value = Fraction(match.group(2)) if match.group(2) else Fraction(1)
+            if match.group(3):
+                if value.denominator != 1:
+                    raise ValueError('Non-integer coefficient of %s in %r' %(match.group(3), text))
+                rotation[i, axes[match.group(3)]] += sign*int(value)
+            else:
+                translation[i] += sign*value
+            at = match.end()
+    return rotation, np.array([float(t) for t in translation])
+
+def parse_all(texts):
+    """ Stacked rotations (K,3,3) and translations (K,3) of a list of operators """
+    ops = [parse(t) for t in texts]
+    if not ops:
+        return np.zeros((0, 3, 3), dtype=np.int64), np.zeros((0, 3))
+    return np.stack([r for r, _ in ops]), np.stack([t for _, t in ops])
+
+def apply(rotations, translations, xyz):
+    """ Images (K,N,3) of the (N,3) positions xyz under K operators, in one batched product """
+    return np.einsum('kij,nj->kni', rotations, np.reshape(xyz, (-1, 3))) + np.asarray(translations)[:, None, :]
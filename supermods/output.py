@@ -0,0 +1,99 @@
+"""Bulk fixed-width formatting of coordinate tables, streamed in chunks"""
+
+import os, re, subprocess, sys
+from contextlib import contextmanager
+from itertools import chain
+import numpy as np
+
+# printf counterparts of StringFormats.main, abinit and quantum, one row each
+row_formats = {
+    'main': '%s:  %-2s  | %12.9f | %12.9f | %12.9f\n',
+    'abinit': '  %12.9f  %12.9f  %12.9f  #%-3s\n',
+    'quantum': '%-2s     %12.9f  %12.9f  %12.9f\n',
+}
+highlight = ('\033[01;97;105m', '\033[0m')
+chunk = 8192
+ansi = re.compile('\033\\[[0-9;]*m')
+_color = True
+
+def set_color(enabled):
+    """ Turns ANSI codes on or off. Off, highlighting is skipped in the bulk tables and sys.stdout
+    is wrapped so other output has its codes stripped
+    """
+    global _color
+    _color = bool(enabled)
+    if not _color and not isinstance(sys.stdout, Plain):
+        sys.stdout = Plain(sys.stdout)
+    if _color and isinstance(sys.stdout, Plain):
+        sys.stdout = sys.stdout.raw
+
+class Plain:
+    """ Text stream that drops ANSI escape codes before writing """
+    def __init__(self, raw):
+        self.raw = raw
+    def write(self, text):
+        return self.raw.write(ansi.sub('', text))
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+#--------------------------------------------------------------------------------------------------
+def format_rows(fmt, columns, size=None):
+    """ Yields text blocks of size rows. Every block is one printf operation over the interleaved
+    column values, so no string is built per line in Python
+    """
+    size = size or chunk
+    columns = [c.tolist() if isinstance(c, np.ndarray) else list(c) for c in columns]
+    n = len(columns[0]) if columns else 0
+    for start in range(0, n, size):
+        part = [c[start:start+size] for c in columns]
+        yield (fmt*len(part[0])) % tuple(chain.from_iterable(zip(*part)))
+
+def position_blocks(cell, style, marked=None, size=None):
+    """ Text blocks of the position table of cell in one of row_formats. main rows are numbered
+    from 1 and rows where marked is True are highlighted when colour is on
+    """
+    fmt = row_formats[style]
+    xyz = list(cell.coords.T)
+    if style == 'main':
+        index = np.char.center(np.arange(1, len(cell)+1).astype(str), 4)
+        columns = [index, cell.species, *xyz]
+        if _color and marked is not None and np.any(marked):
+            fmt = '%s' + fmt[:-1] + '%s\n'
+            columns = [np.where(marked, highlight[0], ''), *columns, np.where(marked, highlight[1], '')]
+    elif style == 'abinit':
+        columns = [*xyz, cell.species]
+    else:
+        columns = [cell.species, *xyz]
+    return format_rows(fmt, columns, size)
+
+def emit(blocks, out=None):
+    """ Writes text blocks to out (sys.stdout by default), bypassing the Plain wrapper since
+    the blocks carry no codes of their own when colour is off
+    """
+    out = sys.stdout if out is None else out
+    out = out.raw if isinstance(out, Plain) else out
+    for block in blocks:
+        out.write(block)
+    out.flush()
+
+@contextmanager
+def stream(target=None):
+    """ Output stream for target: sys.stdout when None, the $PAGER (less -R by default) when
+    'pager', otherwise a file path
+    """
+    if target is None:
+        yield sys.stdout
+    elif target == 'pager':
+        pager = subprocess.Popen(os.environ.get('PAGER', 'less -R').split(), stdin=subprocess.PIPE, text=True)
+        try:
+            yield pager.stdin
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            pager.wait()
+    else:
+        with open(target, 'w') as out:
+            yield out
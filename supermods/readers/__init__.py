@@ -0,0 +1,66 @@
+"""Registry of structure file readers. Format modules are imported on first use and provide
+read(lines, name) streaming over the lines of an open file and returning a Structure
+"""
+
+import hashlib, os
+from collections import namedtuple
+from importlib import import_module
+from supermods.writers import elements
+
+# cell holds reduced coordinates and carries lattice as its lattice metadata; space_group is 0 if unknown
+Structure = namedtuple('Structure', ['cell', 'lattice', 'name', 'space_group'])
+registry = {}
+_parsed = {}
+
+def register(name, module, patterns):
+    """ Adds a format. patterns are file extensions ('.cif') or names contained in the file name ('POSCAR') """
+    registry[name] = (module, tuple(patterns))
+
+register('cif', 'supermods.readers.cif', ('.cif',))
+register('poscar', 'supermods.readers.poscar', ('POSCAR', 'CONTCAR', '.vasp', '.poscar'))
+register('extxyz', 'supermods.readers.extxyz', ('.xyz', '.extxyz'))
+
+def symbol(text):
+    """ Element symbol at the start of a label or type such as 'Pb2+', 'O1' or 'OW' """
+    text = text.strip()
+    if text[:2].capitalize() in elements:
+        return text[:2].capitalize()
+    if text[:1].upper() in elements:
+        return text[:1].upper()
+    raise ValueError('No element symbol in %r' %text)
+
+def format_for(path):
+    """ Registered format of a file name, None if no pattern matches """
+    name = os.path.basename(path)
+    for fmt, (_, patterns) in registry.items():
+        if any(name.lower().endswith(p) if p.startswith('.') else p in name for p in patterns):
+            return fmt
+    return None
+
+def reader(fmt):
+    if fmt not in registry:
+        raise ValueError('Unknown format %s, expected one of %s' %(fmt, ', '.join(registry)))
+    return import_module(registry[fmt][0])
+
+def read(path, fmt=None):
+    """ Structure in the file at path, in fmt or the format matching the file name. Results are
+    cached by a hash of the file contents, so re-opening an unchanged file (or a copy) skips the
+    parse; cached arrays are read-only. Raises ValueError on malformed files, or OSError
+    """
+    fmt = fmt or format_for(path)
+    if fmt is None:
+        raise ValueError('No format registered for %s' %path)
+    path = os.path.expanduser(path)
+    with open(path, 'rb') as data:
+        key = (fmt, hashlib.file_digest(data, 'sha256').hexdigest())
+    if key in _parsed:
+        return _parsed[key]
+    with open(path) as lines:
+        try:
+            structure = reader(fmt).read(lines, os.path.splitext(os.path.basename(path))[0])
+        except (ValueError, IndexError, StopIteration) as error:
+            raise ValueError('%s: %s' %(path, error or 'unexpected end of file')) from None
+    for array in (structure.cell.codes, structure.cell.coords, structure.cell.ids):
+        array.flags.writeable = False
+    _parsed[key] = structure
+    return structure
@@ -0,0 +1,123 @@
+"""CIF (first data block): cell, space group, atom sites and their expansion by the symmetry
+operations. Without a symmetry operation loop the general position and centring vectors of the
+declared space group (ITA standard setting) are used. Occupancies are not used, so every site is
+taken as fully occupied
+"""
+
+import re
+import numpy as np
+import supermods.operators as operators
+import supermods.Wyckoff as wyck
+import supermods.supercell as sc
+from supermods.cell import Cell
+from supermods.lattice import Lattice
+from supermods.readers import Structure, symbol
+
+token = re.compile(r"""'(.*?)'(?=\s|$)|"(.*?)"(?=\s|$)|(\S+)""")
+cell_tags = ('_cell_length_a', '_cell_length_b', '_cell_length_c',
+    '_cell_angle_alpha', '_cell_angle_beta', '_cell_angle_gamma')
+operation_tags = ('_space_group_symop_operation_xyz', '_symmetry_equiv_pos_as_xyz')
+number_tags = ('_space_group_it_number', '_symmetry_int_tables_number')
+site_tags = ('_atom_site_fract_x', '_atom_site_fract_y', '_atom_site_fract_z')
+
+def general_position(space_group):
+    """ Rotations and translations of the general position of space_group with every centring
+    vector added. Raises ValueError for a number outside 1-230
+    """
+    try:
+        R, t = wyck.site_operators(space_group, wyck.letters(space_group)[-1])
+        centring = wyck.centring(space_group)
+    except KeyError as error:
+        raise ValueError(error.args[0]) from None
+    return np.repeat(R, len(centring), axis=0), (t[:, None, :] + centring[None, :, :]).reshape(-1, 3)
+
+def tokens(lines):
+    """ Yields the tokens of a CIF one line at a time. A ;-delimited text field is one token """
+    text = None
+    for line in lines:
+        if text is not None:
+            if line.startswith(';'):
+                yield '\n'.join(text)
+                text = None
+            else:
+                text.append(line.rstrip('\n'))
+            continue
+        if line.startswith(';'):
+            text = [line[1:].rstrip('\n')]
+            continue
+        for match in token.finditer(line):
+            word = next(g for g in match.groups() if g is not None)
+            # Comments start with an unquoted #
+            if match.group(3) is not None and word.startswith('#'):
+                break
+            yield word
+
+def number(text):
+    """ Float of a CIF number, dropping the standard uncertainty in brackets: 5.4310(2) """
+    return float(text.split('(')[0])
+
+def read(lines, name, tol=1e-3):
+    """ Structure of the first data block. Only the cell, space group number, symmetry operations
+    and atom site loops are kept while streaming, other loops are skipped
+    """
+    values, loops = {}, []
+    stream = tokens(lines)
+    word = next(stream, None)
+    block = None
+    while word is not None:
+        low = word.lower()
+        if low.startswith('data_'):
+            if block is not None:
+                break
+            block = word[5:] or name
+            word = next(stream, None)
+        elif low == 'loop_':
+            tags = []
+            word = next(stream, None)
+            while word is not None and word.startswith('_'):
+                tags.append(word.lower())
+                word = next(stream, None)
+            keep = any(t in operation_tags or t in site_tags for t in tags)
+            rows = []
+            while word is not None and not word.startswith('_') and word.lower() != 'loop_' and not word.lower().startswith('data_'):
+                if keep:
+                    rows.append(word)
+                word = next(stream, None)
+            if keep:
+                if len(rows) % len(tags):
+                    raise ValueError('loop of %s has %d values, not a multiple of %d' %(tags[0], len(rows), len(tags)))
+                loops.append((tags, rows))
+        elif low.startswith('_'):
+            values[low] = next(stream)
+            word = next(stream, None)
+        else:
+            word = next(stream, None)
+    try:
+        lattice = Lattice(*[number(values[t]) for t in cell_tags])
+    except KeyError as missing:
+        raise ValueError('missing %s' %missing.args[0]) from None
+    space_group = next((int(number(values[t])) for t in number_tags if t in values), 0)
+    texts, sites = [], None
+    for tags, rows in loops:
+        columns = {t: rows[i::len(tags)] for i, t in enumerate(tags)}
+        for t in operation_tags:
+            texts = texts or columns.get(t, [])
+        if all(t in columns for t in site_tags) and sites is None:
+            labels = columns.get('_atom_site_type_symbol', columns.get('_atom_site_label'))
+            if labels is None:
+                raise ValueError('atom sites have no _atom_site_type_symbol or _atom_site_label')
+            sites = ([symbol(s) for s in labels], np.array([[number(v) for v in columns[t]] for t in site_tags]).T)
+    if sites is None:
+        raise ValueError('no _atom_site_fract_x/y/z loop')
+    if texts:
+        rotations, translations = operators.parse_all(texts)
+    elif space_group > 1:
+        rotations, translations = general_position(space_group)
+    else:
+        rotations, translations = operators.parse_all(['x,y,z'])
+    species, xyz = sites
+    # Site-major order, so the images of a site stay together
+    images = operators.apply(rotations, translations, xyz).transpose(1, 0, 2).reshape(-1, 3)
+    cell = Cell.from_arrays(np.repeat(species, len(rotations)), images, lattice)
+    cell, _ = sc.canonicalize(cell, tol)
+    return Structure(cell, lattice, block or name, space_group)
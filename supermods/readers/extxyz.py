@@ -0,0 +1,35 @@
+"""Extended XYZ (first frame) with Lattice="..." and Properties=species:S:1:pos:R:3 in the comment line"""
+
+import re
+from itertools import islice
+import numpy as np
+from supermods.cell import Cell
+from supermods.lattice import Lattice
+from supermods.readers import Structure, symbol
+
+def properties(text):
+    """ Column of species and of the first of the three pos columns from a Properties value """
+    fields = text.split(':')
+    column, found = 0, {}
+    for name, kind, width in zip(fields[0::3], fields[1::3], fields[2::3]):
+        found[name.lower()] = column
+        column += int(width)
+    if 'species' not in found or 'pos' not in found:
+        raise ValueError('Properties=%s has no species or pos column' %text)
+    return found['species'], found['pos']
+
+def read(lines, name):
+    n = int(next(lines).split()[0])
+    info = dict(re.findall(r'(\w+)=("[^"]*"|\S+)', next(lines)))
+    info = {k.lower(): v.strip('"') for k, v in info.items()}
+    if 'lattice' not in info:
+        raise ValueError('no Lattice="..." in the comment line, the cell is needed for reduced coordinates')
+    lattice = Lattice.from_matrix(np.array(info['lattice'].split(), dtype=float).reshape(3, 3))
+    species, pos = properties(info.get('properties', 'species:S:1:pos:R:3'))
+    columns = np.loadtxt(islice(lines, n), dtype=str, usecols=(species, pos, pos+1, pos+2), ndmin=2)
+    if len(columns) != n:
+        raise ValueError('%d atoms for a count of %d' %(len(columns), n))
+    names, inverse = np.unique(columns[:, 0], return_inverse=True)
+    symbols = np.array([symbol(s) for s in names.tolist()])[inverse]
+    coords = lattice.to_reduced(columns[:, 1:].astype(float))
+    return Structure(Cell.from_arrays(symbols, coords, lattice), lattice, name, 0)
@@ -0,0 +1,39 @@
+"""VASP POSCAR/CONTCAR (VASP 5 species line or VASP 4 with the species in the comment)"""
+
+from itertools import islice
+import numpy as np
+from supermods.cell import Cell
+from supermods.lattice import Lattice
+from supermods.readers import Structure, symbol
+
+def read(lines, name):
+    comment = next(lines).strip()
+    scale = float(next(lines).split()[0])
+    matrix = np.loadtxt(islice(lines, 3), usecols=(0, 1, 2), ndmin=2)
+    if matrix.shape != (3, 3):
+        raise ValueError('expected three lattice vectors')
+    # A negative scale is the cell volume
+    if scale < 0:
+        scale = (-scale/abs(np.linalg.det(matrix)))**(1/3)
+    matrix *= scale
+    words = next(lines).split()
+    if words[0].isdigit():
+        counts, words = [int(w) for w in words], comment.split()
+    else:
+        counts = [int(w) for w in next(lines).split()]
+    if len(words) < len(counts):
+        raise ValueError('species names missing for %d counts' %len(counts))
+    symbols = [symbol(w) for w in words[:len(counts)]]
+    mode = next(lines).strip()
+    if mode[:1] in 'sS':
+        mode = next(lines).strip()
+    n = sum(counts)
+    # Selective dynamics flags and trailing labels are ignored
+    coords = np.loadtxt(islice(lines, n), usecols=(0, 1, 2), ndmin=2)
+    if len(coords) != n:
+        raise ValueError('%d positions for %d atoms' %(len(coords), n))
+    lattice = Lattice.from_matrix(matrix)
+    if mode[:1] in 'cCkK':
+        coords = lattice.to_reduced(coords*scale)
+    species = np.repeat(symbols, counts)
+    return Structure(Cell.from_arrays(species, coords, lattice), lattice, name, 0)
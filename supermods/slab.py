@@ -0,0 +1,124 @@
+"""Miller-index (hkl) oriented cells and slabs"""
+
+from collections import namedtuple
+from itertools import product
+from math import gcd
+import numpy as np
+import supermods.supercell as sc
+import supermods.terminations as tm
+from supermods.cell import Cell
+
+Surface = namedtuple('Surface', ['hkl', 'n_atoms', 'n_layers', 'd_spacing', 'termination'])
+
+def _unimodular(hkl):
+    """ Integer matrix U with det +-1 and hkl @ U = (g, 0, 0), by Euclid's algorithm on the columns """
+    v = [int(i) for i in hkl]
+    U = np.eye(3, dtype=np.int64)
+    while sum(1 for i in v if i) > 1:
+        p = min((i for i in range(3) if v[i]), key=lambda i: abs(v[i]))
+        for j in range(3):
+            if j != p and v[j]:
+                q = v[j] // v[p]
+                v[j] -= q*v[p]
+                U[:, j] -= q*U[:, p]
+    p = next(i for i in range(3) if v[i])
+    order = [p] + [i for i in range(3) if i != p]
+    U = U[:, order]
+    if v[p] < 0:
+        U[:, 0] *= -1
+    return U
+
+def surface_basis(hkl, metric=None):
+    """ Integer matrix whose rows are lattice vectors a1, a2 in the (hkl) plane and a3 out of it, in
+    units of the original lattice vectors, with det +1. a1 and a2 are Gauss-reduced and a3 is made as
+    perpendicular to the plane as an integer shift allows, using metric (the lattice metric tensor;
+    the identity if not given). The reduced coordinate along a3 then counts (hkl) planes
+    """
+    hkl = np.asarray(hkl, dtype=np.int64)
+    if not hkl.any():
+        raise ValueError('Miller index (0 0 0) does not define a plane')
+    hkl = hkl // gcd(*[int(i) for i in hkl])
+    G = np.eye(3) if metric is None else np.asarray(metric, dtype=float)
+    dot = lambda u, w: float(u @ G @ w)
+    U = _unimodular(hkl)
+    a3, a1, a2 = U[:, 0], U[:, 1], U[:, 2]
+    while True:
+        if dot(a1, a1) > dot(a2, a2):
+            a1, a2 = a2, a1
+        mu = int(round(dot(a1, a2) / dot(a1, a1)))
+        if mu == 0:
+            break
+        a2 = a2 - mu*a1
+    gram = np.array([[dot(a1, a1), dot(a1, a2)], [dot(a2, a1), dot(a2, a2)]])
+    c = np.rint(np.linalg.solve(gram, [dot(a1, a3), dot(a2, a3)])).astype(np.int64)
+    a3 = a3 - c[0]*a1 - c[1]*a2
+    P = np.array([a1, a2, a3], dtype=np.int64)
+    if round(np.linalg.det(P)) < 0:
+        P = P[[1, 0, 2]]
+    return P
+
+def lattice_points(P):
+    """ Integer translations n of the original lattice inside the cell spanned by the rows of P,
+    i.e. with n @ inv(P) in [0,1)^3. Tested with the integer adjugate, det P points
+    """
+    det = int(round(np.linalg.det(P)))
+    if det <= 0:
+        raise ValueError('Basis must be right-handed')
+    adj = np.rint(np.linalg.inv(P)*det).astype(np.int64)
+    corners = np.array(list(product([0, 1], repeat=3))) @ P
+    lo, hi = corners.min(axis=0), corners.max(axis=0)
+    n = np.indices(hi - lo + 1).reshape(3, -1).T + lo
+    t = n @ adj
+    return n[np.all((t >= 0) & (t < det), axis=1)]
+
+def transform_cell(cell, P, decimals=7):
+    """ Cell in the basis given by the rows of the integer matrix P, filled with every lattice
+    translation inside it and wrapped into [0,1)
+    """
+    n = lattice_points(P)
+    inv = np.linalg.inv(P)
+    xyz = (cell.coords[:, None, :] + n[None, :, :]) @ inv
+    xyz = sc.round_wrap(xyz.reshape(-1, 3), decimals, wrap=True)
+    return Cell(np.repeat(cell.codes, len(n)), xyz, cell.symbols, None)
+
+def oriented_cell(primitive, hkl, metric=None):
+    """ Primitive cell re-expressed in the surface_basis() of (hkl), with the same number of atoms.
+    SuperCell layers it along z (the third vector) to stack (hkl) planes
+    """
+    return transform_cell(primitive, surface_basis(hkl, metric))
+
+def slab_cell(primitive, hkl, layers=1, metric=None):
+    """ Layered slab of `layers` repeats of the oriented cell along the (hkl) normal, sorted z, x, y """
+    P = np.diag([1, 1, int(layers)]) @ surface_basis(hkl, metric)
+    return sc.layer_cell(transform_cell(primitive, P), [3, 1, 2])
+
+def miller_indices(max_index):
+    """ Distinct planes with |h|, |k|, |l| <= max_index, one of each +-(hkl) pair """
+    found = []
+    for hkl in product(range(-max_index, max_index+1), repeat=3):
+        if not any(hkl) or gcd(*hkl) != 1:
+            continue
+        if next(i for i in hkl if i) < 0:
+            continue
+        found.append(hkl)
+    return sorted(found, key=lambda h: (sum(map(abs, h)), [-i for i in h]))
+
+def d_spacing(hkl, metric=None):
+    """ Interplanar spacing of (hkl), in lattice length units when metric is the metric tensor """
+    G = np.eye(3) if metric is None else np.asarray(metric, dtype=float)
+    hkl = np.asarray(hkl, dtype=float)
+    return float(1/np.sqrt(hkl @ np.linalg.inv(G) @ hkl))
+
+def scan_surfaces(primitive, charges, max_index=1, layers=2, metric=None, tol=1e-3):
+    """ Slab of every plane from miller_indices(max_index) with its atoms and distinct layers per
+    period, d spacing and best termination at least one period thick (from
+    terminations.rank_terminations, None if a charge is missing)
+    """
+    found = []
+    for hkl in miller_indices(max_index):
+        slab = slab_cell(primitive, hkl, layers, metric)
+        period = slab.coords[:len(slab)//layers, 2]
+        n_layers = len(tm.layer_bounds(period, tol/layers)) - 1
+        best = tm.rank_terminations(slab, charges, 3, 1/layers, 1, tol/layers)
+        found.append(Surface(hkl, len(slab)//layers, n_layers, d_spacing(hkl, metric), best[0] if best else None))
+    return found
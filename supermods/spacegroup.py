@@ -0,0 +1,372 @@
+"""Space-group detection: candidate lattice rotations and translations are tested against the
+whole cell with a grid hash, and the operations are matched to the Wyckoff table
+"""
+
+from collections import namedtuple
+from itertools import product
+import numpy as np
+import supermods.Wyckoff as wyck
+import supermods.supercell as sc
+from supermods.cell import Cell
+from supermods.gridhash import GridHash, wrap
+
+# number is the ITA number (0 when not identified, always for slabs); rotations and translations are
+# the operations in the basis of the cell; equivalent is the first symmetry-equivalent atom of every
+# atom, unique the symmetry-unique atoms and wyckoff their labels ('' if not identified); symmetric
+# tells whether an operation maps the top of a slab onto its bottom (None for bulk cells)
+SpaceGroup = namedtuple('SpaceGroup', ['number', 'rotations', 'translations', 'equivalent', 'unique', 'wyckoff', 'symmetric'])
+_matrices = None
+_transforms = None
+_group_orders = None
+# Grid lookups per block in find_operations
+chunk = 1 << 20
+
+def _all_matrices():
+    """ Every 3x3 matrix with entries -1, 0, 1 and determinant +-1 """
+    global _matrices
+    if _matrices is None:
+        m = np.array(list(product((-1, 0, 1), repeat=9)), dtype=np.int64).reshape(-1, 3, 3)
+        det = np.rint(np.linalg.det(m)).astype(np.int64)
+        _matrices = (m[np.abs(det) == 1], det[np.abs(det) == 1])
+    return _matrices
+
+def _setting_transforms():
+    """ Unimodular setting changes with entries -1, 0, 1, signed axis permutations first and the
+    identity first of all
+    """
+    global _transforms
+    if _transforms is None:
+        m, det = _all_matrices()
+        m = m[det == 1]
+        nonzero = np.count_nonzero(m, axis=(1, 2))
+        identity = np.all(m == np.eye(3, dtype=np.int64), axis=(1, 2))
+        _transforms = m[np.lexsort([nonzero, ~identity])]
+    return _transforms
+
+def _orders():
+    """ {space group: (general multiplicity, number of centring vectors)} read from the Wyckoff
+    table without parsing any operators
+    """
+    global _group_orders
+    if _group_orders is None:
+        _group_orders = {}
+        with open(wyck.table) as data:
+            for line in data:
+                if not line.startswith('#'):
+                    fields = line.split()
+                    _group_orders[int(fields[0])] = (wyck.multiplicity(fields[-1].split('=')[0]), fields[1].count(';') + 1)
+    return _group_orders
+
+def lattice_rotations(metric=None, periodic=(True, True, True), tol=1e-2):
+    """ Integer rotations W (entries -1, 0, 1) that keep the metric, W.T @ G @ W = G within tol
+    relative to the lattice lengths, and do not mix non-periodic axes with the others. Without a
+    metric the cell is taken as orthogonal with equal lengths (signed axis permutations)
+    """
+    m, _ = _all_matrices()
+    G = np.eye(3) if metric is None else np.asarray(metric, dtype=float)
+    scale = np.sqrt(np.outer(np.diag(G), np.diag(G)))
+    keep = np.all(np.abs(np.einsum('kji,jl,klm->kim', m, G, m) - G) <= tol*scale, axis=(1, 2))
+    for a in np.flatnonzero(~np.asarray(periodic, dtype=bool)):
+        off = np.ones(3, dtype=bool)
+        off[a] = False
+        keep &= np.all(m[:, a, off] == 0, axis=1) & np.all(m[:, off, a] == 0, axis=1)
+    return m[keep]
+
+def _images(grid, W, t, xyz, codes):
+    """ Atom of grid at the image of every position under every operation (K,N), -1 where there is
+    none. The lookups run in blocks of chunk, so memory stays bounded for large cells
+    """
+    hits = np.full((len(W), len(xyz)), -1, dtype=int)
+    block = max(1, chunk // max(1, len(xyz)))
+    for i in range(0, len(W), block):
+        images = np.einsum('kij,nj->kni', W[i:i+block], xyz) + t[i:i+block, None, :]
+        hits[i:i+block] = grid.match(images.reshape(-1, 3), np.tile(codes, len(images))).reshape(len(images), len(xyz))
+    return hits
+
+def find_operations(cell, rotations, tol=1e-3, periodic=(True, True, True), samples=(1, 8, 64), grid=None):
+    """ Operations (W, t) among the given rotations that map cell onto itself within tol. The
+    candidate translations of each rotation take one atom of the rarest species onto every atom of
+    that species; the candidates are screened on growing samples of atoms and the survivors are
+    checked on the whole cell. Returns rotations (M,3,3), translations (M,3)
+    and the image of every atom under every operation (M,N)
+    """
+    periodic = np.asarray(periodic, dtype=bool)
+    xyz, codes = cell.coords, cell.codes
+    grid = grid or GridHash(xyz, codes, tol, periodic)
+    counts = np.bincount(codes, minlength=len(cell.symbols))
+    ref = np.flatnonzero(codes == np.argmin(np.where(counts > 0, counts, counts.max()+1)))
+    rotations = np.asarray(rotations, dtype=np.int64)
+    shifts = xyz[ref][None, :, :] - (rotations @ xyz[ref[0]])[:, None, :]
+    shifts = wrap(shifts.reshape(-1, 3), periodic).reshape(len(rotations), len(ref), 3)
+    W = np.repeat(rotations, len(ref), axis=0)
+    t = shifts.reshape(-1, 3)
+    # The first stages leave out ref[0], which every candidate maps onto an atom by construction
+    others = np.flatnonzero(np.arange(len(cell)) != ref[0])
+    stages = [others[np.unique(np.linspace(0, len(others)-1, min(size, len(others))).astype(int))] for size in samples]
+    for atoms in stages + [np.arange(len(cell))]:
+        hits = _images(grid, W, t, xyz[atoms], codes[atoms])
+        ok = np.all(hits >= 0, axis=1)
+        W, t, hits = W[ok], t[ok], hits[ok]
+    return W, t, hits
+
+def _codes(matrices):
+    """ Integer code of each matrix with entries -1, 0, 1, for set lookups """
+    return ((np.reshape(matrices, (-1, 9)) + 1) @ 3**np.arange(9)).astype(np.int64)
+
+def _closure(group):
+    """ Rotation group generated by the (K,3,3) matrices in group """
+    keys = {g.tobytes() for g in group}
+    members = list(group)
+    while True:
+        products = np.einsum('aij,bjk->abik', np.array(members), np.array(members)).reshape(-1, 3, 3)
+        new = [p for p in products if p.tobytes() not in keys]
+        if not new:
+            return np.array(members)
+        for p in new:
+            if p.tobytes() not in keys:
+                keys.add(p.tobytes())
+                members.append(p)
+
+def _generators(rotations):
+    """ Indices of rotations that generate all of them """
+    chosen, group = [], {np.eye(3, dtype=np.int64).tobytes()}
+    for i, r in enumerate(rotations):
+        if r.tobytes() not in group:
+            chosen.append(i)
+            group = {g.tobytes() for g in _closure(np.concatenate([rotations[chosen], np.eye(3, dtype=np.int64)[None]]))}
+    return chosen
+
+def _smith(A):
+    """ U, D, V with U @ A @ V = D diagonal (A integer m x n). The divisibility chain of the full
+    normal form is not needed to solve A p = b
+    """
+    A = np.array(A, dtype=np.int64)
+    m, n = A.shape
+    U, V = np.eye(m, dtype=np.int64), np.eye(n, dtype=np.int64)
+    for k in range(min(m, n)):
+        while True:
+            sub = np.abs(A[k:, k:])
+            if not sub.any():
+                return U, A, V
+            i, j = np.unravel_index(np.argmin(np.where(sub > 0, sub, sub.max()+1)), sub.shape)
+            A[[k, k+i]], U[[k, k+i]] = A[[k+i, k]], U[[k+i, k]]
+            A[:, [k, k+j]], V[:, [k, k+j]] = A[:, [k+j, k]], V[:, [k+j, k]]
+            for r in range(k+1, m):
+                q = A[r, k] // A[k, k]
+                A[r] -= q*A[k]
+                U[r] -= q*U[k]
+            for c in range(k+1, n):
+                q = A[k, c] // A[k, k]
+                A[:, c] -= q*A[:, k]
+                V[:, c] -= q*V[:, k]
+            if not A[k+1:, k].any() and not A[k, k+1:].any():
+                break
+    return U, A, V
+
+def _origin(smith, b, tol):
+    """ A solution p of A @ p = b modulo integers, None if there is none. smith is _smith(A) """
+    U, D, V = smith
+    c = U @ b
+    q = np.zeros(D.shape[1])
+    for i in range(len(c)):
+        d = D[i, i] if i < min(D.shape) else 0
+        if d:
+            q[i] = c[i] / d
+        elif abs(c[i] - np.round(c[i])) > tol:
+            return None
+    return V @ q
+
+def _standard_ops(space_group):
+    """ Rotations and translations of the general position with every centring vector added """
+    centring, sites = wyck.load(space_group)
+    R, w = sites[wyck.letters(space_group)[-1]]
+    return np.repeat(R, len(centring), axis=0), (w[:, None, :] + centring[None, :, :]).reshape(-1, 3), R, w, centring
+
+def identify(rotations, translations, tol=1e-3):
+    """ (space group, P, p) such that x = P @ x_std + p takes the ITA standard setting to the basis
+    of a cell with the given symmetry operations, found among the settings of _setting_transforms()
+    and any origin shift. (0, None, None) when no space group matches
+    """
+    pure = np.all(rotations == np.eye(3, dtype=np.int64), axis=(1, 2))
+    n_centring = int(pure.sum())
+    keys, first = np.unique(_codes(rotations), return_index=True)
+    found = np.zeros(3**9, dtype=bool)
+    found[keys] = True
+    order = len(keys)
+    rotation_codes = _codes(rotations)
+    transforms = _setting_transforms()
+    inverses = np.rint(np.linalg.inv(transforms)).astype(np.int64)
+    for space_group, (multiplicity, c) in _orders().items():
+        if c != n_centring or multiplicity != order*c:
+            continue
+        W_all, t_all, R, w, centring = _standard_ops(space_group)
+        # Settings where every standard rotation is one of the rotations found
+        mapped = transforms[:, None] @ R[None] @ inverses[:, None]
+        codes = _codes(np.clip(mapped, -1, 1)).reshape(len(transforms), len(R))
+        match = np.all(found[codes] & np.all(np.abs(mapped) <= 1, axis=(2, 3)), axis=1)
+        if not match.any():
+            continue
+        # Conjugation keeps a generating set, so the generators of R serve every setting
+        gens = _generators(R)
+        for P, P_inv, ops, op_codes in zip(transforms[match], inverses[match], mapped[match], codes[match]):
+            t_found = translations[first[np.searchsorted(keys, op_codes[gens])]]
+            smith = _smith((np.eye(3, dtype=np.int64) - ops[gens]).reshape(-1, 3))
+            # Every standard operation, repeated for its centring vectors, as a rotation code
+            same = np.repeat(op_codes, len(centring))[:, None] == rotation_codes[None, :]
+            for combo in product(range(len(centring)), repeat=len(gens)):
+                b = (t_found - (w[gens] + centring[list(combo)]) @ P.T).reshape(-1)
+                p = _origin(smith, b, tol)
+                if p is None:
+                    continue
+                # The cell is invariant under the found operations only, so every standard one
+                # has to be among them
+                t = t_all @ P.T + p - np.repeat(ops, len(centring), axis=0) @ p
+                d = t[:, None, :] - translations[None, :, :]
+                hit = same & np.all(np.abs(d - np.round(d)) <= tol, axis=2)
+                if np.all(hit.any(axis=1)):
+                    return space_group, P, wrap(p)[0]
+    return 0, None, None
+
+def wyckoff_labels(space_group, xyz, tol=1e-3):
+    """ Wyckoff label of each standard-setting position in xyz: the site symmetry gives the
+    multiplicity, and among letters of equal multiplicity the one whose orbit passes through the
+    position is taken
+    """
+    W_all, t_all, _, _, centring = _standard_ops(space_group)
+    order = len(W_all)
+    letters = wyck.letters(space_group)
+    shifts = np.array(list(product((-1, 0, 1), repeat=3)))
+    xyz = np.reshape(xyz, (-1, 3))
+    d = np.einsum('kij,nj->nki', W_all, xyz) + t_all - xyz[:, None, :]
+    fixed = np.sum(np.all(np.abs(d - np.round(d)) <= tol, axis=2), axis=1)
+    labels = np.full(len(xyz), '', dtype=object)
+    for count in np.unique(fixed):
+        atoms = np.flatnonzero(fixed == count)
+        candidates = [l for l in letters if wyck.multiplicity(l)*count == order]
+        if len(candidates) == 1:
+            labels[atoms] = candidates[0]
+            continue
+        for letter in candidates:
+            R, t = wyck.site_operators(space_group, letter)
+            # x - t - c + n = R @ v for some free parameters v, centring c and cell translation n
+            target = (xyz[atoms, None, None, None, :] - t[None, :, None, None, :] - centring[None, None, :, None, :]
+                + shifts[None, None, None, :, :])
+            v = np.einsum('kij,akcnj->akcni', np.linalg.pinv(R), target)
+            residual = np.einsum('kij,akcnj->akcni', R, v) - target
+            on = np.any(np.all(np.abs(residual) <= tol, axis=-1), axis=(1, 2, 3)) & (labels[atoms] == '')
+            labels[atoms[on]] = letter
+    return labels.tolist()
+
+def _subcell(cell, translations, periodic, tol):
+    """ Number of repeats of a smaller cell along each axis, from the pure translations found """
+    repeats = np.ones(3, dtype=int)
+    for a in np.flatnonzero(periodic):
+        off = np.delete(np.arange(3), a)
+        along = translations[np.all(np.abs(translations[:, off] - np.round(translations[:, off])) <= tol, axis=1), a]
+        along = along[along > tol]
+        if len(along) and abs(1/along.min() - round(1/along.min())) <= 1e-2:
+            repeats[a] = int(round(1/along.min()))
+    return repeats
+
+def _hermite(A):
+    """ Rows of an upper-triangular basis of the lattice spanned by the integer rows of A (rank 3) """
+    A = np.array(A, dtype=np.int64)
+    basis = []
+    for col in range(3):
+        while np.count_nonzero(A[:, col]) > 1:
+            live = np.flatnonzero(A[:, col])
+            pivot = live[np.argmin(np.abs(A[live, col]))]
+            others = live[live != pivot]
+            A[others] -= (A[others, col] // A[pivot, col])[:, None] * A[pivot]
+        pivot = np.flatnonzero(A[:, col])[0]
+        basis.append(A[pivot] * np.sign(A[pivot, col]))
+        A = np.delete(A, pivot, axis=0)
+    return np.array(basis)
+
+def _primitive(cell, translations, metric, tol):
+    """ (primitive cell, B, metric) of a periodic cell with the pure translations given. The rows of
+    B are the primitive vectors in the basis of cell, pairwise reduced with the metric (identity
+    when None); coordinates go to the primitive basis as x @ inv(B). None when the translations are
+    not fractions of their number
+    """
+    m = len(translations)
+    steps = np.rint(wrap(translations) * m).astype(np.int64)
+    if np.any(np.abs(steps / m - wrap(translations)) > tol):
+        return None
+    B = _hermite(np.concatenate([m * np.eye(3, dtype=np.int64), steps])) / m
+    G = np.eye(3) if metric is None else np.asarray(metric, dtype=float)
+    reduced = False
+    while not reduced:
+        reduced = True
+        for i, j in product(range(3), repeat=2):
+            q = np.round((B[i] @ G @ B[j]) / (B[j] @ G @ B[j]))
+            shorter = B[i] - q*B[j]
+            if i != j and q and shorter @ G @ shorter < B[i] @ G @ B[i] - 1e-12:
+                B[i], reduced = shorter, False
+    if np.linalg.det(B) < 0:
+        B = -B
+    xyz = wrap(cell.coords @ np.linalg.inv(B))
+    small, _ = sc.canonicalize(Cell(cell.codes, xyz, cell.symbols), tol)
+    return small, B, B @ G @ B.T
+
+def detect(cell, lattice=None, tol=1e-3, periodic=(True, True, True)):
+    """ SpaceGroup of cell in reduced coordinates of lattice (cell.lattice by default, an orthogonal
+    cell when there is none). Supercell repeats are found from the pure translations and the
+    search runs on the smallest cell, so a supercell reports the space group of its crystal. The
+    space group is identified for settings related to the ITA standard one by a setting change with
+    entries -1, 0, 1 and an origin shift (conventional cells). Slabs (a non-periodic axis) get
+    their layer operations and the symmetric flag, with number 0
+    """
+    cell = Cell.from_rows(cell)
+    lattice = cell.lattice if lattice is None else lattice
+    periodic = np.asarray(periodic, dtype=bool)
+    n = len(cell)
+    if not n:
+        return SpaceGroup(0, np.eye(3, dtype=np.int64)[None], np.zeros((1, 3)), np.zeros(0, dtype=int), np.zeros(0, dtype=int), [], None)
+    grid = GridHash(cell.coords, cell.codes, tol, periodic)
+    _, pure, _ = find_operations(cell, np.eye(3, dtype=np.int64)[None], tol, periodic, grid=grid)
+    repeats = _subcell(cell, pure, periodic, tol)
+    small = cell
+    if np.any(repeats > 1):
+        xyz = cell.coords*repeats
+        xyz[:, periodic] = xyz[:, periodic] % 1
+        small, _ = sc.canonicalize(Cell(cell.codes, xyz, cell.symbols), tol, periodic)
+    metric = None if lattice is None else lattice.metric / np.outer(repeats, repeats)
+    small_grid = GridHash(small.coords, small.codes, tol, periodic)
+    rotations, translations, images = find_operations(small, lattice_rotations(metric, periodic), tol, periodic, grid=small_grid)
+    orbit = images.min(axis=0)
+    # Every atom of cell lies on an atom of the small cell
+    xyz = cell.coords*repeats
+    xyz[:, periodic] = xyz[:, periodic] % 1
+    at = small_grid.match(xyz, cell.codes)
+    _, unique, inverse = np.unique(orbit[at], return_index=True, return_inverse=True)
+    equivalent = unique[inverse.reshape(-1)]
+    order = np.argsort(unique)
+    unique = unique[order]
+    number, labels, symmetric = 0, [''] * len(unique), None
+    if periodic.all():
+        number, P, p = identify(rotations, translations, tol)
+        site = xyz[unique]
+        centring = translations[np.all(rotations == np.eye(3, dtype=np.int64), axis=(1, 2))]
+        primitive = None if number or len(centring) < 2 else _primitive(small, centring, metric, tol)
+        # Centring the standard settings do not reach (e.g. a C-centred cell of a P1 crystal) is
+        # identified on the primitive cell
+        if primitive is not None:
+            prim, B, prim_metric = primitive
+            prim_rotations, prim_translations, _ = find_operations(prim, lattice_rotations(prim_metric), tol)
+            number, P, p = identify(prim_rotations, prim_translations, tol)
+            site = site @ np.linalg.inv(B)
+        if number:
+            P_inv = np.rint(np.linalg.inv(P)).astype(np.int64)
+            labels = wyckoff_labels(number, wrap((site - p) @ P_inv.T), tol)
+    else:
+        flips = rotations[:, ~periodic, ~periodic]
+        symmetric = bool(np.any(flips == -1))
+    return SpaceGroup(number, rotations, translations, equivalent, unique, labels, symmetric)
+
+def slab_symmetric(cell, axis, lattice=None, tol=1e-3):
+    """ True if an operation of the slab cell maps its top surface onto its bottom one along axis
+    (0: x, 1: y, 2: z), e.g. an inversion centre or a mirror plane parallel to the surface
+    """
+    periodic = [a != axis for a in range(3)]
+    return detect(cell, lattice, tol, periodic).symmetric
@@ -0,0 +1,55 @@
+"""Parsing of the primitive cells listed in cells.yaml"""
+
+import os, re
+import supermods.readers as readers
+import supermods.Wyckoff as wyck
+import supermods.supercell as sc
+from supermods.cell import Cell
+
+def structure_file(text):
+    """ Path of a cells.yaml entry that names a CIF, POSCAR or extended XYZ file, None otherwise """
+    text = str(text).strip()
+    if readers.format_for(text) and os.path.isfile(os.path.expanduser(text)):
+        return text
+    return None
+
+def split_structure(text):
+    """ Splits a cells.yaml entry into rows of [atom, letter, x, y, z] (Wyckoff positions) or
+    [atom, x, y, z] (cell coordinates). Returns the rows and 'wyckoff' or 'cell'. An entry naming
+    a structure file returns the Cell read from it and 'cell'
+    """
+    path = structure_file(text)
+    if path is not None:
+        return readers.read(path).cell, 'cell'
+    fields = [f for f in re.split(' |,|\n', str(text)) if f != '']
+    if True in [s.isalpha() for s in fields[1]]:
+        width, kind = 5, 'wyckoff'
+    else:
+        width, kind = 4, 'cell'
+    rows = [fields[i:i + width] for i in range(0, len(fields), width)]
+    return [[*data[:-3], *(float(v) for v in data[-3::])] for data in rows], kind
+
+def bilbao_link(space_group):
+    """ Bilbao Crystallographic Server page listing the Wyckoff positions of space_group """
+    return "https://www.cryst.ehu.es/cgi-bin/cryst/programs/nph-wp-list?gnum=" + str(space_group)
+
+def primitive_cell(rows, kind, space_group, tol=1e-3):
+    """ Primitive Cell from split_structure() rows, expanding Wyckoff positions (with the centring
+    vectors) for space_group. Coordinates are wrapped into [0,1) and duplicate sites within tol merged.
+    Returns the cell and the number of merged atoms
+    """
+    if kind == 'wyckoff':
+        cell = Cell.from_arrays(*wyck.expand(space_group, rows, tol))
+    else:
+        cell = Cell.from_rows(rows)
+    return sc.canonicalize(cell, tol)
+
+def load_structure(yaml_data, structure, tol=1e-3):
+    """ (name, space group), primitive Cell, kind and merged count of a 'Name SG' key of cells.yaml.
+    Structures are read from the 'Structures' section when there is one (Supercell_YAML.py input)
+    """
+    entries = yaml_data.get('Structures', yaml_data)
+    name, space_group = structure.split()[0], int(structure.split()[1])
+    rows, kind = split_structure(entries[structure])
+    primitive, merged = primitive_cell(rows, kind, space_group, tol)
+    return (name, space_group), primitive, kind, merged
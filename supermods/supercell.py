@@ -0,0 +1,227 @@
+"""Array-based supercell engine shared by SuperGUI_cluster.py and Supercell_YAML.py"""
+
+import heapq
+import numpy as np
+from supermods.cell import Cell
+from supermods.gridhash import GridHash, wrap as wrap_coords
+
+def translation_grid(X, Y, Z):
+    """ Reduced translations of every image in an X x Y x Z supercell, shape (X*Y*Z, 3)
+    Images are ordered with Z varying fastest, matching SuperCell.constructCell
+    """
+    dims = np.array([X, Y, Z], dtype=float)
+    idx = np.indices((X, Y, Z)).reshape(3, -1).T
+    return idx / dims
+
+def round_wrap(xyz, decimals=7, wrap=False):
+    """ Rounds coordinates to decimals and, with wrap, folds them into [0,1) afterwards so that
+    a value rounded up to 1 ends up at 0
+    """
+    xyz = np.round(xyz, decimals)
+    if wrap:
+        xyz = np.round(xyz - np.floor(xyz), decimals) % 1.0
+    return xyz
+
+def construct(species, coords, dims, shifts, decimals=7, wrap=False):
+    """ Broadcasts the primitive basis against the X x Y x Z translation grid
+    species: sequence of atomic symbols, coords: (P,3) reduced primitive coordinates
+    Returns the species array and an (N,3) coordinate array in constructCell order
+    (primitive atom, then X, Y and Z images). With wrap, shifted coordinates are folded into [0,1)
+    """
+    X, Y, Z = (int(d) for d in dims)
+    basis = np.asarray(coords, dtype=float).reshape(-1, 3) / np.array([X, Y, Z], dtype=float)
+    xyz = (basis[:, None, :] + translation_grid(X, Y, Z)[None, :, :]) + np.asarray(shifts, dtype=float)
+    xyz = round_wrap(xyz.reshape(-1, 3), decimals, wrap)
+    return np.repeat(np.asarray(species), X*Y*Z), xyz
+
+def construct_cell(primitive, dims, shifts, decimals=7, wrap=False):
+    """ construct() for a primitive Cell. Species codes are repeated, no per-atom objects are built.
+    Atom ids are the construct indices, which resize_layered and reshift_layered rely on
+    """
+    codes, xyz = construct(primitive.codes, primitive.coords, dims, shifts, decimals, wrap)
+    return Cell(codes, xyz, primitive.symbols, primitive.lattice, np.arange(len(codes)))
+
+def canonicalize(cell, tol=1e-3, periodic=(True, True, True), decimals=7):
+    """ Wraps coordinates into [0,1) along the periodic axes and merges atoms of the same species
+    within tol of each other (minimum image), keeping the first of each set. Duplicates are found
+    with a GridHash, so the pass is linear in the number of atoms.
+    Returns the canonical cell and the number of merged atoms
+    """
+    xyz = wrap_coords(np.round(wrap_coords(cell.coords, periodic), decimals), periodic)
+    canonical = Cell(cell.codes, xyz, cell.symbols, cell.lattice, cell._ids)
+    pairs = GridHash(xyz, cell.codes, tol, periodic).pairs()
+    if not len(pairs):
+        return canonical, 0
+    keep = np.ones(len(cell), dtype=bool)
+    keep[pairs[:, 1]] = False
+    return canonical.take(keep), int(len(cell) - keep.sum())
+
+def layer_order(xyz, sort_keys):
+    """ Stable permutation sorting xyz by the sort priority (1: x, 2: y, 3: z), as in layerCell """
+    return np.lexsort([xyz[:, k-1] for k in reversed(sort_keys)])
+
+def layer_cell(cell, sort_keys):
+    """ Cell sorted by the sort priority """
+    return cell.take(layer_order(cell.coords, sort_keys))
+
+def species_order(cell, axis):
+    """ Stable permutation sorting by atomic symbol, then by the coordinate on axis (1: x, 2: y, 3: z) """
+    rank = np.argsort(np.argsort(cell.symbols)) if cell.symbols else np.zeros(0, dtype=int)
+    return np.lexsort([cell.coords[:, axis-1], rank[cell.codes]])
+
+def order_columns(xyz, ids, sort_keys):
+    """ Columns that compare like layerCell order: the sort priority coordinates, then the construct index """
+    return [xyz[:, k-1] for k in sort_keys] + [np.asarray(ids)]
+
+def _in_order(cols):
+    """ True when the rows of the columns are strictly increasing in lexicographic order """
+    ok = cols[-1][1:] > cols[-1][:-1]
+    for c in reversed(cols[:-1]):
+        ok = (c[1:] > c[:-1]) | ((c[1:] == c[:-1]) & ok)
+    return bool(ok.all())
+
+def _byte_keys(cols, decimals):
+    """ Rows of order_columns() as byte strings with the same order, for searchsorted. Coordinates are
+    already rounded to decimals, so scaling them to integers keeps their order and ties
+    """
+    keys = np.empty((len(cols[0]), len(cols)), dtype='>u8')
+    for c, col in enumerate(cols[:-1]):
+        keys[:, c] = np.rint(col*10**decimals).astype(np.int64) + 2**62
+    keys[:, -1] = cols[-1]
+    return keys.view('S%d' %(8*len(cols))).ravel()
+
+def _axis_index(ids, dims, a):
+    """ Image index along axis a of the atoms with construct indices ids """
+    return (ids // int(np.prod(dims[a+1:]))) % dims[a]
+
+def _axis_coords(primitive, dims, shifts, ids, a, decimals, wrap):
+    """ Coordinate a of the atoms with construct indices ids, computed exactly as in construct() """
+    p = ids // int(np.prod(dims))
+    col = (primitive.coords[p, a] / float(dims[a]) + _axis_index(ids, dims, a) / float(dims[a])) + float(shifts[a])
+    return round_wrap(col, decimals, wrap)
+
+def _relayer(cell, sort_keys):
+    """ cell with its order kept when it still sorts the coordinates, sorted again otherwise """
+    cols = order_columns(cell.coords, cell.ids, sort_keys)
+    if len(cell) > 1 and not _in_order(cols):
+        cell = cell.take(np.lexsort(cols[::-1]))
+    return cell
+
+def resize_layered(layered, primitive, dims, axis, n, shifts, sort_keys, decimals=7, wrap=False):
+    """ layer_cell(construct_cell(primitive, dims with n images on axis (0: x, 1: y, 2: z), shifts))
+    from layered, the layered cell for dims. Layered atoms keep their order, only their coordinate
+    on axis is rescaled. The translations beyond the old size are generated, sorted on their own and
+    merged into the existing order; images beyond a smaller size are dropped
+    """
+    dims = [int(d) for d in dims]
+    new_dims = list(dims)
+    new_dims[axis] = n = int(n)
+    stride = int(np.prod(dims[axis+1:]))
+    ids = np.asarray(layered.ids, dtype=np.int64)
+    k = _axis_index(ids, dims, axis)
+    keep = k < n
+    ids, k = ids[keep], k[keep]
+    ids = ((ids // (stride*dims[axis]))*n + k)*stride + ids % stride
+    xyz = layered.coords[keep]
+    xyz[:, axis] = _axis_coords(primitive, new_dims, shifts, ids, axis, decimals, wrap)
+    old = _relayer(Cell(layered.codes[keep], xyz, primitive.symbols, primitive.lattice, ids), sort_keys)
+    if n <= dims[axis]:
+        return old
+    # Construct indices of the images added along axis
+    box = [len(primitive)] + new_dims
+    box[axis+1] = n - dims[axis]
+    index = list(np.indices(box).reshape(4, -1))
+    index[axis+1] = index[axis+1] + dims[axis]
+    added = np.ravel_multi_index(index, [len(primitive)] + new_dims)
+    xyz = np.stack([_axis_coords(primitive, new_dims, shifts, added, a, decimals, wrap) for a in range(3)], axis=1)
+    order = np.lexsort(order_columns(xyz, added, sort_keys)[::-1])
+    fresh = Cell(primitive.codes[index[0]][order], xyz[order], primitive.symbols, primitive.lattice, added[order])
+    if not len(old) or _in_order(order_columns(np.concatenate([old.coords[-1:], fresh.coords[:1]]),
+            np.concatenate([old.ids[-1:], fresh.ids[:1]]), sort_keys)):
+        # Growing along the primary sort axis without wrapping puts every new image after the old ones
+        return old.concat(fresh, fresh.ids)
+    # Merge the two sorted runs: added atom j lands after the old atoms with smaller keys
+    old_keys = _byte_keys(order_columns(old.coords, old.ids, sort_keys), decimals)
+    keys = _byte_keys(order_columns(fresh.coords, fresh.ids, sort_keys), decimals)
+    slots = np.searchsorted(old_keys, keys) + np.arange(len(order))
+    taken = np.zeros(len(old) + len(order), dtype=bool)
+    taken[slots] = True
+    merged = []
+    for kept, new in ((old.codes, fresh.codes), (old.coords, fresh.coords), (old.ids, fresh.ids)):
+        out = np.empty((len(taken),) + kept.shape[1:], dtype=kept.dtype)
+        out[~taken], out[slots] = kept, new
+        merged.append(out)
+    return Cell(*merged[:2], primitive.symbols, primitive.lattice, merged[2])
+
+def reshift_layered(layered, primitive, dims, shifts, new_shifts, sort_keys, decimals=7, wrap=False):
+    """ layer_cell(construct_cell(primitive, dims, new_shifts)) from layered, the layered cell for shifts.
+    Only the coordinates on axes whose shift changed are recomputed, in one vectorized pass, and the
+    permutation is kept when it still sorts the cell
+    """
+    dims = [int(d) for d in dims]
+    ids = np.asarray(layered.ids, dtype=np.int64)
+    xyz = layered.coords.copy()
+    for a in range(3):
+        if float(shifts[a]) != float(new_shifts[a]):
+            xyz[:, a] = _axis_coords(primitive, dims, new_shifts, ids, a, decimals, wrap)
+    return _relayer(Cell(layered.codes, xyz, primitive.symbols, primitive.lattice, ids), sort_keys)
+
+def iter_layers(species, coords, dims, shifts, sort_keys, decimals=7, wrap=False):
+    """ Yields (atom, x, y, z) tuples in layerCell order without building the full supercell
+    Images along the primary sort axis are generated lazily. Each image is sorted on its own
+    and merged into the output once the merge front reaches its lowest coordinate, so memory
+    follows the images that overlap the current layer rather than the whole cell.
+    With wrap, atoms folded back into [0,1) on the primary axis join the image whose range they
+    land in, so the merge order still matches construct(..., wrap=True) followed by layerCell
+    """
+    dims = [int(d) for d in dims]
+    axis = sort_keys[0]-1
+    n_img = dims[axis]
+    species = np.asarray(species)
+    basis = np.asarray(coords, dtype=float).reshape(-1, 3) / np.array(dims, dtype=float)
+    shifts = np.asarray(shifts, dtype=float)
+    plane = [range(d) if a != axis else [0] for a, d in enumerate(dims)]
+    plane = np.indices([len(r) for r in plane]).reshape(3, -1).T
+    step = np.zeros(3, dtype=int)
+    step[axis] = 1
+    cstep = int(np.ravel_multi_index(step, dims)) if n_img > 1 else 0
+    # Primary coordinate of every (primitive atom, image) pair. The in-plane images share it, so this
+    # (P, n_img) table decides which pairs make up each lazily built group and where the group starts
+    k_img = np.arange(n_img)
+    raw = np.round(basis[:, None, axis] + k_img[None, :] / n_img + shifts[axis], decimals)
+    primary = round_wrap(raw, decimals, wrap)
+    group = np.broadcast_to(k_img, raw.shape) - (np.floor(raw).astype(int)*n_img if wrap else 0)
+    atoms, images = np.nonzero(np.ones_like(raw, dtype=bool))
+    group, primary = group.ravel(), primary.ravel()
+    order = np.lexsort([atoms, group])
+    bounds = np.flatnonzero(np.diff(group[order])) + 1
+    groups = np.split(order, bounds) if len(order) else []
+    starts = [float(primary[g].min()) for g in groups]
+    queue = sorted(range(len(groups)), key=lambda g: starts[g])
+    def image(members):
+        p, k = atoms[members], images[members]
+        shift = (plane[None, :, :] + (k[:, None]*step)[:, None, :]) / np.array(dims, dtype=float)
+        xyz = round_wrap((basis[p][:, None, :] + shift + shifts).reshape(-1, 3), decimals, wrap)
+        # Construct index of every atom, used to break ties exactly like the stable sort
+        cidx = (p[:, None]*dims[0] + plane[None, :, 0])*dims[1] + plane[None, :, 1]
+        cidx = ((cidx*dims[2] + plane[None, :, 2]) + (k*cstep)[:, None]).ravel()
+        order = np.lexsort([cidx] + [xyz[:, s-1] for s in reversed(sort_keys)])
+        rows = zip(np.repeat(species[p], len(plane))[order].tolist(), *xyz[order].T.tolist())
+        return zip(rows, cidx[order].tolist())
+    heap = []
+    def push(g, it):
+        for row, i in it:
+            heapq.heappush(heap, (tuple(row[s] for s in sort_keys), i, g, row, it))
+            return
+    n = 0
+    while heap or n < len(queue):
+        while n < len(queue) and (not heap or heap[0][0][0] >= starts[queue[n]]):
+            push(queue[n], image(groups[queue[n]]))
+            n += 1
+        _, _, g, row, it = heapq.heappop(heap)
+        yield row
+        push(g, it)
+
+def count(primitive, dims):
+    """ Number of atoms in the supercell built from primitive """
+    return len(primitive)*int(np.prod([int(d) for d in dims]))
@@ -0,0 +1,82 @@
+"""Symmetry searches on Cell objects using tolerance-aware grid hashing"""
+
+from collections import namedtuple
+import numpy as np
+from supermods.gridhash import GridHash, wrap
+
+Inversion = namedtuple('Inversion', ['centres', 'pairs', 'partners'])
+
+def _reference(cell):
+    """ Atoms of the rarest species. Any symmetry operation maps the first of them onto one of them """
+    counts = np.bincount(cell.codes, minlength=len(cell.symbols))
+    rare = np.argmin(np.where(counts > 0, counts, counts.max()+1))
+    return np.flatnonzero(cell.codes == rare)
+
+def _closure(group, g, tol, periodic):
+    """ Translation group generated by the translations in group and g """
+    members = group
+    coset = group
+    while True:
+        coset = wrap(coset + g, periodic)
+        # Cosets are either already in the group or entirely new
+        if np.all(GridHash(members, tol=tol, periodic=periodic).match(coset) >= 0):
+            return members
+        members = np.concatenate([members, coset])
+
+def inversion_partners(cell, centre, tol=1e-3, periodic=(True, True, True), grid=None):
+    """ Index of the image of every atom under inversion through centre, -1 where there is none """
+    grid = grid or GridHash(cell.coords, cell.codes, tol, periodic)
+    return grid.match(2*np.asarray(centre) - cell.coords, cell.codes)
+
+def find_inversion(cell, tol=1e-3, periodic=(True, True, True), sample=32):
+    """ Every inversion centre of cell within tol (reduced units) and the atom pairs it relates
+    Along periodic axes a centre is only defined modulo 1/2, so centres are reported in [0, 1/2).
+    Candidates come from one reference atom of the rarest species and are screened on a sample
+    of atoms. Two centres differ by half a translation of the cell, so once one centre is checked
+    against the whole cell the others only need the translation group, which is grown from the
+    few translations that have to be checked in full.
+    Returns Inversion(centres (K,3), pairs (P,2) with i <= j under the first centre,
+    partners (N,) image of every atom under the first centre or -1)
+    """
+    n_atoms = len(cell)
+    periodic = np.asarray(periodic, dtype=bool)
+    empty = Inversion(np.empty((0, 3)), np.empty((0, 2), dtype=int), np.full(n_atoms, -1, dtype=int))
+    if not n_atoms:
+        return empty
+    xyz, codes = cell.coords, cell.codes
+    grid = GridHash(xyz, codes, tol, periodic)
+    ref = _reference(cell)
+    centres = (xyz[ref[0]] + xyz[ref]) / 2
+    centres[:, periodic] = np.mod(centres[:, periodic], 0.5)
+    keys = np.round(centres / tol).astype(np.int64)
+    keys[:, periodic] = np.mod(keys[:, periodic], int(round(0.5/tol)))
+    centres = centres[np.sort(np.unique(keys, axis=0, return_index=True)[1])]
+    # Centres closest to the middle of the cell along the non-periodic axes come first
+    middle = np.where(periodic, 0, (xyz.min(axis=0) + xyz.max(axis=0)) / 2)
+    centres = centres[np.lexsort([*centres.T[::-1], np.linalg.norm((centres - middle)[:, ~periodic], axis=1)])]
+    atoms = np.unique(np.linspace(0, n_atoms-1, min(sample, n_atoms)).astype(int))
+    images = 2*centres[:, None, :] - xyz[atoms][None, :, :]
+    hits = grid.match(images.reshape(-1, 3), np.tile(codes[atoms], len(centres)))
+    pending = centres[np.all(hits.reshape(len(centres), -1) >= 0, axis=1)]
+    found, partners = [], None
+    group = np.zeros((1, 3))
+    while len(pending):
+        centre, pending = pending[0], pending[1:]
+        mapped = inversion_partners(cell, centre, grid=grid)
+        if np.any(mapped < 0):
+            continue
+        found.append(centre)
+        if partners is None:
+            partners = mapped
+            continue
+        group = _closure(group, wrap(2*(centre - found[0]), periodic), tol, periodic)
+        # Every pending centre half a group translation away from the first one is a centre too
+        known = GridHash(group, tol=tol, periodic=periodic).match(wrap(2*(pending - found[0]), periodic)) >= 0
+        found.extend(pending[known])
+        pending = pending[~known]
+    if partners is None:
+        return empty
+    found = np.array(found)
+    idx = np.arange(n_atoms)
+    pairs = np.stack([idx, partners], axis=1)[idx <= partners]
+    return Inversion(found, pairs, partners)
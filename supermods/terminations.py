@@ -0,0 +1,60 @@
+"""Net charge and dipole of every cleave window of a layered cell from prefix sums"""
+
+from collections import namedtuple
+import numpy as np
+
+Termination = namedtuple('Termination', ['first', 'last', 'n_atoms', 'thickness', 'net_charge', 'dipole'])
+
+def atom_charges(cell, charges):
+    """ Charge of every atom from the Charges section of cells.yaml, None if a species has no charge """
+    if any(charges.get(cell.symbols[c]) is None for c in np.unique(cell.codes)):
+        return None
+    table = np.array([float(charges.get(s) or 0) for s in cell.symbols])
+    return table[cell.codes] if len(cell.symbols) else np.zeros(0)
+
+def layer_bounds(coords, tol=1e-3):
+    """ Indices where a new layer starts along the sorted coordinates, plus len(coords) """
+    steps = np.flatnonzero(np.diff(coords) > tol) + 1
+    return np.concatenate([[0], steps, [len(coords)]])
+
+def windows(cell, charges, axis, min_thickness=0.0, tol=1e-3, length=1.0):
+    """ Every window of whole layers of the layered cell along axis (1: x, 2: y, 3: z) whose atom
+    centres span at least min_thickness. Prefix sums of the charges and of the charge-weighted
+    coordinates give the net charge and the dipole about the window midpoint in O(1) per window,
+    evaluated for all ends of one start at once. length scales coordinates (e.g. to Angstrom).
+    Returns first/last atom indices (1-based, inclusive), thickness, net charge and dipole arrays,
+    or None if a species has no charge
+    """
+    q = atom_charges(cell, charges)
+    if q is None:
+        return None
+    x = cell.coords[:, axis-1]*length
+    Q = np.concatenate([[0.0], np.cumsum(q)])
+    M = np.concatenate([[0.0], np.cumsum(q*x)])
+    bounds = layer_bounds(cell.coords[:, axis-1], tol)
+    first, last, thick, net, dip = [], [], [], [], []
+    for n, i in enumerate(bounds[:-1]):
+        j = bounds[n+1:]
+        span = x[j-1] - x[i]
+        j, span = j[span >= min_thickness - 1e-12], span[span >= min_thickness - 1e-12]
+        charge = Q[j] - Q[i]
+        first.append(np.full(len(j), i+1))
+        last.append(j)
+        thick.append(span)
+        net.append(charge)
+        dip.append((M[j] - M[i]) - charge*(x[i] + x[j-1])/2)
+    if not first:
+        return [np.zeros(0)]*5
+    return [np.concatenate(a) for a in (first, last, thick, net, dip)]
+
+def rank_terminations(cell, charges, axis, min_thickness=0.0, top=10, tol=1e-3, length=1.0):
+    """ Windows from windows() ordered neutral first, then by |dipole| and thickness.
+    Returns at most top Terminations, None if a species has no charge
+    """
+    found = windows(cell, charges, axis, min_thickness, tol, length)
+    if found is None:
+        return None
+    first, last, thick, net, dip = found
+    order = np.lexsort([np.round(thick, 9), np.round(np.abs(dip), 9), np.abs(net) > 1e-6])[:top]
+    return [Termination(int(first[k]), int(last[k]), int(last[k]-first[k]+1), float(thick[k]),
+        float(net[k]), float(dip[k])) for k in order]
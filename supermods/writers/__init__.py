@@ -0,0 +1,51 @@
+"""Registry of structure file writers. Format modules are imported on first use and provide
+write(out, cell, lattice=None, comment='') working on whole coordinate arrays
+"""
+
+import os
+from importlib import import_module
+
+registry = {}
+elements = ('H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se '
+    'Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er '
+    'Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No '
+    'Lr Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og').split()
+
+def register(name, module, patterns):
+    """ Adds a format. patterns are file extensions ('.xsf') or names contained in the file name ('POSCAR') """
+    registry[name] = (module, tuple(patterns))
+
+register('poscar', 'supermods.writers.poscar', ('POSCAR', 'CONTCAR', '.vasp', '.poscar'))
+register('xsf', 'supermods.writers.xsf', ('.xsf',))
+register('extxyz', 'supermods.writers.extxyz', ('.xyz', '.extxyz'))
+register('abinit', 'supermods.writers.abinit', ('.abi', '.abinit'))
+
+def atomic_numbers(symbols):
+    """ Atomic number of every symbol """
+    try:
+        return [elements.index(s.capitalize()) + 1 for s in symbols]
+    except ValueError:
+        raise ValueError('Unknown element in %s' %list(symbols)) from None
+
+def format_for(path):
+    """ Registered format of a file name, None if no pattern matches """
+    name = os.path.basename(path)
+    for fmt, (_, patterns) in registry.items():
+        if any(name.lower().endswith(p) if p.startswith('.') else p in name for p in patterns):
+            return fmt
+    return None
+
+def writer(fmt):
+    if fmt not in registry:
+        raise ValueError('Unknown format %s, expected one of %s' %(fmt, ', '.join(registry)))
+    return import_module(registry[fmt][0])
+
+def write(path, cell, lattice=None, fmt=None, comment=''):
+    """ Writes cell to path in fmt, or the format matching the file name """
+    fmt = fmt or format_for(path)
+    if fmt is None:
+        raise ValueError('No format registered for %s' %path)
+    module = writer(fmt)
+    with open(os.path.expanduser(path), 'w') as out:
+        module.write(out, cell, lattice, comment)
+    return path
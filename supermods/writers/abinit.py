@@ -0,0 +1,25 @@
+"""ABINIT structure variables: natom, ntypat, typat, znucl, xred and, with a lattice, acell/rprim"""
+
+import numpy as np
+import supermods.output as printer
+from supermods.writers import atomic_numbers
+
+per_line = 20
+
+def write(out, cell, lattice=None, comment=''):
+    if comment:
+        out.write(''.join('# %s\n' %line for line in comment.splitlines()))
+    codes = np.unique(cell.codes)
+    typat = np.searchsorted(codes, cell.codes) + 1
+    out.write('natom %d\nntypat %d\n' %(len(cell), len(codes)))
+    out.write('znucl %s\n' %' '.join(map(str, atomic_numbers([cell.symbols[c] for c in codes.tolist()]))))
+    out.write('typat\n')
+    full = len(typat) - len(typat) % per_line
+    printer.emit(printer.format_rows(' %d'*per_line + '\n', list(typat[:full].reshape(-1, per_line).T)), out)
+    if full < len(typat):
+        out.write(''.join(' %d' %t for t in typat[full:].tolist()) + '\n')
+    if lattice is not None:
+        out.write('acell 3*1.0 angstrom\nrprim\n')
+        printer.emit(printer.format_rows('  %15.9f %15.9f %15.9f\n', list(lattice.matrix.T)), out)
+    out.write('xred\n')
+    printer.emit(printer.format_rows('  %12.9f  %12.9f  %12.9f\n', list(cell.coords.T)), out)
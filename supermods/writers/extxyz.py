@@ -0,0 +1,11 @@
+"""Extended XYZ with the lattice in the comment line and Cartesian positions in Angstrom"""
+
+import supermods.output as printer
+
+def write(out, cell, lattice=None, comment=''):
+    if lattice is None:
+        raise ValueError('Extended XYZ needs the lattice vectors')
+    vectors = ' '.join('%.9f' %v for v in lattice.matrix.ravel().tolist())
+    out.write('%d\nLattice="%s" Properties=species:S:1:pos:R:3 pbc="T T T"' %(len(cell), vectors))
+    out.write(' comment="%s"\n' %comment.replace('"', "'").replace('\n', ' ') if comment else '\n')
+    printer.emit(printer.format_rows('%-2s %15.9f %15.9f %15.9f\n', [cell.species, *lattice.to_cartesian(cell.coords).T]), out)
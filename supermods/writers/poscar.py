@@ -0,0 +1,16 @@
+"""VASP POSCAR in direct (reduced) coordinates, atoms grouped by species"""
+
+import numpy as np
+import supermods.output as printer
+
+def write(out, cell, lattice=None, comment=''):
+    if lattice is None:
+        raise ValueError('POSCAR needs the lattice vectors')
+    order = np.argsort(cell.codes, kind='stable')
+    codes, counts = np.unique(cell.codes, return_counts=True)
+    out.write('%s\n1.0\n' %(comment.replace('\n', ' ') or 'Generated by SuperGUI'))
+    printer.emit(printer.format_rows('  %21.16f %21.16f %21.16f\n', list(lattice.matrix.T)), out)
+    out.write('  ' + ' '.join(cell.symbols[c] for c in codes.tolist()) + '\n')
+    out.write('  ' + ' '.join(map(str, counts.tolist())) + '\n')
+    out.write('Direct\n')
+    printer.emit(printer.format_rows('  %19.16f %19.16f %19.16f\n', list(cell.coords[order].T)), out)
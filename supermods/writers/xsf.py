@@ -0,0 +1,16 @@
+"""XCrySDen XSF crystal with Cartesian positions in Angstrom"""
+
+import numpy as np
+import supermods.output as printer
+from supermods.writers import atomic_numbers
+
+def write(out, cell, lattice=None, comment=''):
+    if lattice is None:
+        raise ValueError('XSF needs the lattice vectors')
+    if comment:
+        out.write(''.join('# %s\n' %line for line in comment.splitlines()))
+    out.write('CRYSTAL\nPRIMVEC\n')
+    printer.emit(printer.format_rows('  %15.9f %15.9f %15.9f\n', list(lattice.matrix.T)), out)
+    out.write('PRIMCOORD\n%d 1\n' %len(cell))
+    numbers = np.array(atomic_numbers(cell.symbols) or [0], dtype=int)[cell.codes]
+    printer.emit(printer.format_rows('%3d %15.9f %15.9f %15.9f\n', [numbers, *lattice.to_cartesian(cell.coords).T]), out)
@@ -0,0 +1,77 @@
+"""CIF atom sites expanded by a symmetry operation loop or by the declared space group"""
+
+import numpy as np
+import pytest
+import supermods.readers as readers
+
+header = """data_{name}
+_symmetry_space_group_name_H-M '{symbol}'
+_symmetry_Int_Tables_number {number}
+_cell_length_a 5.6402(3)
+_cell_length_b 5.6402
+_cell_length_c 5.6402
+_cell_angle_alpha 90
+_cell_angle_beta {beta}
+_cell_angle_gamma 90
+"""
+# P 1 21/c 1, unique axis b
+p21c = """loop_
+_symmetry_equiv_pos_site_id
+_symmetry_equiv_pos_as_xyz
+1 'x, y, z'
+2 '-x, y+1/2, -z+1/2'
+3 '-x, -y, -z'
+4 'x, -y+1/2, z+1/2'
+"""
+sites = """loop_
+_atom_site_label
+_atom_site_type_symbol
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+_atom_site_occupancy
+{}
+"""
+
+def write(tmp_path, name, text):
+    path = tmp_path / (name + '.cif')
+    path.write_text(text)
+    return readers.read(str(path))
+
+def positions(cell):
+    """ Sorted (species, x, y, z) rows, for comparing cells regardless of atom order """
+    return sorted(zip(cell.species.tolist(), *np.round(cell.coords, 6).T.tolist()))
+
+def test_symmetry_loop(tmp_path):
+    text = header.format(name='P21c', symbol='P 1 21/c 1', number=14, beta=98.5) + p21c + sites.format(
+        'Pb1 Pb2+ 0.2500 0.5820 0.2460 1\nO1 O2- 0 0 0 1')
+    structure = write(tmp_path, 'P21c', text)
+    assert structure.space_group == 14 and structure.name == 'P21c'
+    # Standard uncertainties in brackets are dropped
+    assert structure.lattice.parameters == pytest.approx((5.6402, 5.6402, 5.6402, 90, 98.5, 90))
+    # A general site gives 4 atoms, a site on an inversion centre 2
+    assert structure.cell.species.tolist().count('Pb') == 4
+    assert positions(structure.cell)[:2] == [('O', 0.0, 0.0, 0.0), ('O', 0.0, 0.5, 0.5)]
+    # Without the loop the operations of space group 14 give the same cell
+    plain = write(tmp_path, 'P21c_plain', header.format(name='P21c', symbol='P 1 21/c 1', number=14, beta=98.5)
+        + sites.format('Pb1 Pb2+ 0.2500 0.5820 0.2460 1\nO1 O2- 0 0 0 1'))
+    assert positions(plain.cell) == positions(structure.cell)
+
+def test_centred_group_without_loop(tmp_path):
+    text = header.format(name='NaCl', symbol='F m -3 m', number=225, beta=90) + sites.format(
+        'Na1 Na 0 0 0 1\nCl1 Cl 0.5 0.5 0.5 1')
+    cell = write(tmp_path, 'NaCl', text).cell
+    assert len(cell) == 8
+    assert [row for row in positions(cell) if row[0] == 'Na'] == [('Na', 0.0, 0.0, 0.0), ('Na', 0.0, 0.5, 0.5),
+        ('Na', 0.5, 0.0, 0.5), ('Na', 0.5, 0.5, 0.0)]
+
+def test_no_space_group(tmp_path):
+    # Neither a loop nor a space group number: the sites are taken as given
+    text = header.format(name='P1', symbol='P 1', number='?', beta=90).replace('_symmetry_Int_Tables_number ?\n', '')
+    cell = write(tmp_path, 'P1', text + sites.format('Na1 Na 0.1 0.2 0.3 1\nCl1 Cl 0.6 0.7 0.8 1')).cell
+    assert positions(cell) == [('Cl', 0.6, 0.7, 0.8), ('Na', 0.1, 0.2, 0.3)]
+
+def test_unknown_space_group(tmp_path):
+    text = header.format(name='Bad', symbol='?', number=231, beta=90) + sites.format('Na1 Na 0 0 0 1')
+    with pytest.raises(ValueError):
+        write(tmp_path, 'Bad', text)
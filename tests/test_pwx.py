@@ -0,0 +1,71 @@
+"""pw.x inputs written from a template by supermods.pwx and read back with its parser"""
+
+import os
+import numpy as np
+import pytest
+import supermods.pwx as pwx
+from supermods.cell import Cell
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+kaolinite = os.path.join(root, 'kaol.bulk.wfc', 'kaol.bands.in')
+
+def test_kaolinite_round_trip(tmp_path):
+    source = pwx.read_input(kaolinite)
+    path = str(tmp_path / 'kaol.in')
+    assert pwx.write_inputs(kaolinite, [(path, source.cell, source.lattice)]) == [path]
+    written = pwx.read_input(path)
+    assert written.cell.species.tolist() == source.cell.species.tolist()
+    # Positions are written with 9 decimals, as in the template
+    assert np.allclose(written.cell.coords, source.cell.coords, atol=1e-9)
+    assert np.allclose(written.lattice.matrix, source.lattice.matrix, atol=1e-8)
+    assert np.array_equal(written.if_pos, source.if_pos)
+    assert written.units == {'ATOMIC_POSITIONS': 'crystal', 'CELL_PARAMETERS': 'angstrom'}
+    # The cell is given by CELL_PARAMETERS, every other namelist entry is copied
+    assert written.namelists['SYSTEM'].pop('ibrav') == 0
+    assert written.namelists == {name: {k: v for k, v in values.items() if not pwx.cell_keys.match(k) and k != 'ibrav'}
+        for name, values in source.namelists.items()}
+    template, copy = pwx.Template.read(kaolinite), pwx.Template.read(path)
+    assert copy.cards['K_POINTS'] == template.cards['K_POINTS']
+    # Species lines come from the template, in the order of the cell's species codes
+    assert sorted(copy.cards['ATOMIC_SPECIES'][1]) == sorted(line.strip() for line in template.cards['ATOMIC_SPECIES'][1])
+
+def test_element_masses(tmp_path):
+    path = str(tmp_path / 'SrO.in')
+    pwx.write_inputs(kaolinite, [(path, Cell.from_rows([['Sr', 0, 0, 0], ['O', 0.5, 0.5, 0.5]]), None)])
+    species = pwx.Template.read(path).cards['ATOMIC_SPECIES'][1]
+    assert sorted(species) == ['O    15.9999  o_pbe_v1.2.uspp.F.UPF', 'Sr  {}  Sr.UPF'.format(pwx.masses['Sr'])]
+
+def test_unknown_species_fails_before_writing(tmp_path):
+    path = tmp_path / 'Xx.in'
+    with pytest.raises(ValueError, match='Xx'):
+        pwx.write_inputs(kaolinite, [(str(path), Cell.from_rows([['Xx', 0, 0, 0]]), None)])
+    assert not path.exists()
+
+def truncated(tmp_path, rows, keep=None):
+    """ kaol.bands.in cut after the first rows of ATOMIC_POSITIONS, the last one cut to its first
+    keep fields. Returns the path and the line number of the ATOMIC_POSITIONS header
+    """
+    with open(kaolinite) as source:
+        lines = source.read().splitlines()
+    header = next(i for i, line in enumerate(lines) if line.startswith('ATOMIC_POSITIONS'))
+    lines = lines[:header+1+rows]
+    if keep is not None:
+        lines[-1] = ' '.join(lines[-1].split()[:keep])
+    path = tmp_path / 'kaol.in'
+    path.write_text('\n'.join(lines))
+    return str(path), header+1
+
+@pytest.mark.parametrize('rows', [0, 1, 10, 33])
+def test_truncated_positions(tmp_path, rows):
+    path, header = truncated(tmp_path, rows)
+    with pytest.raises(pwx.ParseError, match='ATOMIC_POSITIONS has %d rows, nat = 34' %rows) as error:
+        pwx.read_input(path)
+    assert error.value.line == header and error.value.path == path
+
+def test_truncated_row(tmp_path):
+    path, header = truncated(tmp_path, 34, keep=3)
+    with pytest.raises(pwx.ParseError, match='got 3 fields') as error:
+        pwx.read_input(path)
+    assert error.value.line == header + 34
+    # A ParseError is a ValueError, which from_file and the readers already handle
+    assert isinstance(error.value, ValueError)
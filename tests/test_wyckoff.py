@@ -0,0 +1,48 @@
+"""Consistency of the generated Wyckoff table in supermods/data/wyckoff.dat"""
+
+import os
+import numpy as np
+import pytest
+import yaml
+import supermods.Wyckoff as wyck
+import supermods.structures as structures
+
+cells_yaml = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'cells.yaml')
+# Free parameters away from every special position
+generic = (0.1213, 0.3479, 0.6571)
+# Primitive cell sizes of the cells.yaml structures before the table was generated
+baseline = {'PbCO3 14': 20, 'PbO 129': 4, 'PbO 51': 12, 'PbO 57': 8, 'PbCO3 62': 20}
+
+def general_operations(space_group):
+    """ Rotations and translations of the general position with every centring vector added """
+    R, t = wyck.site_operators(space_group, wyck.letters(space_group)[-1])
+    centring = wyck.centring(space_group)
+    return np.repeat(R, len(centring), axis=0), (t[:, None, :] + centring[None, :, :]).reshape(-1, 3)
+
+@pytest.mark.parametrize('space_group', range(1, 231))
+def test_general_position_is_a_group(space_group):
+    W, w = general_operations(space_group)
+    assert len(W) == wyck.multiplicity(wyck.letters(space_group)[-1])
+    # Every product (W1, w1)(W2, w2) = (W1 W2, W1 w2 + w1) is an operation modulo cell translations
+    products = np.einsum('aij,bjk->abik', W, W).reshape(-1, 3, 3)
+    shifts = (np.einsum('aij,bj->abi', W, w) + w[:, None, :]).reshape(-1, 3)
+    codes = lambda m: (np.reshape(m, (-1, 9)) + 1) @ 3**np.arange(9)
+    d = shifts[:, None, :] - w[None, :, :]
+    found = (codes(products)[:, None] == codes(W)[None, :]) & np.all(np.abs(d - np.round(d)) < 1e-6, axis=2)
+    assert np.all(found.any(axis=1))
+    # and no two operations coincide
+    d = w[:, None, :] - w[None, :, :]
+    same = (codes(W)[:, None] == codes(W)[None, :]) & np.all(np.abs(d - np.round(d)) < 1e-6, axis=2)
+    assert np.array_equal(same, np.eye(len(W), dtype=bool))
+
+@pytest.mark.parametrize('space_group', range(1, 231))
+def test_orbits_match_multiplicities(space_group):
+    for letter in wyck.letters(space_group):
+        _, xyz = wyck.expand(space_group, [['X', letter, *generic]])
+        assert len(xyz) == wyck.multiplicity(letter), (space_group, letter)
+
+@pytest.mark.parametrize('name', sorted(baseline))
+def test_cells_yaml_structures(name):
+    with open(cells_yaml) as data:
+        yaml_data = yaml.safe_load(data)
+    assert len(structures.load_structure(yaml_data, name)[1]) == baseline[name]